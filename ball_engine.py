@@ -0,0 +1,648 @@
+"""球引擎模組.
+
+以 NumPy 陣列（struct-of-arrays）集中保存所有球的位置、速度與發射狀態，
+把移動、牆壁反彈、底板反彈與出界移除改成整批運算，取代逐顆呼叫 `Ball` 方法。
+`BallView` 讓既有程式仍能以 `Ball` 介面讀寫單顆球。
+還沒發射的球都停在底板上同一個位置，不放進陣列，只記一個數量；
+發射時才真正在陣列中建立一顆球。
+繪製時所有球共用一張預先畫好的小圖，由位置陣列直接組成一次 `Surface.blits`。
+"""
+
+import numpy as np
+
+from collision import first_brick_contact, sweep_circle_rect
+from config import *
+from game_objects import Ball
+from render_cache import make_ball_sprite
+
+
+def _brick_bounds(bricks):
+    """回傳整個磚塊區域的外框 (left, top, right, bottom).
+
+    Args:
+        bricks (list or BrickField): 磚塊清單或磚塊場地（不可為空）
+
+    Returns:
+        tuple: 外框
+    """
+    bounds = getattr(bricks, "bounds", None)
+    if bounds is None:
+        bounds = (
+            min(brick.x for brick in bricks),
+            min(brick.y for brick in bricks),
+            max(brick.x + brick.width for brick in bricks),
+            max(brick.y + brick.height for brick in bricks),
+        )
+    return bounds
+
+
+class BallView(Ball):
+    """指向 `BallEngine` 中某一顆球的輕量檢視.
+
+    所有屬性讀寫都直接對應到引擎的陣列，因此可以沿用 `Ball` 的方法
+    （例如 `check_brick_collision`、`draw`）。引擎壓縮陣列後索引會改變，
+    所以檢視只適合在同一幀內短暫使用。
+
+    Attributes:
+        engine (BallEngine): 所屬的球引擎
+        index (int): 球在引擎陣列中的索引
+    """
+
+    __slots__ = ("engine", "index")
+
+    def __init__(self, engine, index):
+        """建立球的檢視.
+
+        Args:
+            engine (BallEngine): 所屬的球引擎
+            index (int): 球在引擎陣列中的索引
+        """
+        self.engine = engine
+        self.index = index
+
+    @property
+    def radius(self):
+        """int: 球的半徑."""
+        return self.engine.radius
+
+    @property
+    def color(self):
+        """tuple: 球的 RGB 顏色值."""
+        return self.engine.color
+
+    @property
+    def x(self):
+        """float: x 座標（中心）."""
+        return float(self.engine.x[self.index])
+
+    @x.setter
+    def x(self, value):
+        self.engine.x[self.index] = value
+
+    @property
+    def y(self):
+        """float: y 座標（中心）."""
+        return float(self.engine.y[self.index])
+
+    @y.setter
+    def y(self, value):
+        self.engine.y[self.index] = value
+
+    @property
+    def vx(self):
+        """float: x 方向速度."""
+        return float(self.engine.vx[self.index])
+
+    @vx.setter
+    def vx(self, value):
+        self.engine.vx[self.index] = value
+
+    @property
+    def vy(self):
+        """float: y 方向速度."""
+        return float(self.engine.vy[self.index])
+
+    @vy.setter
+    def vy(self, value):
+        self.engine.vy[self.index] = value
+
+    @property
+    def launched(self):
+        """bool: 是否已發射."""
+        return bool(self.engine.launched[self.index])
+
+    @launched.setter
+    def launched(self, value):
+        self.engine.launched[self.index] = value
+
+
+class BallEngine:
+    """以連續陣列保存所有球狀態的批次物理引擎.
+
+    每顆球的運算順序與 `Ball` 逐顆更新時相同：移動、牆壁碰撞、磚塊碰撞、
+    底板碰撞，最後移除出界的球，因此結果與原本的逐顆物理一致。
+
+    Attributes:
+        radius (int): 所有球共用的半徑
+        color (tuple): 所有球共用的 RGB 顏色值
+        count (int): 陣列中（已發射）的球數
+        idle_count (int): 停在底板上、尚未發射的球數
+        idle_x (float): 未發射的球所在的 x 座標
+        idle_y (float): 未發射的球所在的 y 座標
+        x (numpy.ndarray): x 座標陣列
+        y (numpy.ndarray): y 座標陣列
+        vx (numpy.ndarray): x 方向速度陣列
+        vy (numpy.ndarray): y 方向速度陣列
+        launched (numpy.ndarray): 是否已發射的布林陣列
+        prev_x (numpy.ndarray): 上一次模擬步驟開始時的 x 座標（繪圖插值用）
+        prev_y (numpy.ndarray): 上一次模擬步驟開始時的 y 座標（繪圖插值用）
+    """
+
+    # 每顆球一格、需要一起搬移的所有陣列
+    ARRAY_NAMES = ("x", "y", "vx", "vy", "launched", "prev_x", "prev_y")
+
+    def __init__(
+        self, radius=BALL_RADIUS, color=BALL_COLOR, capacity=BALL_ENGINE_CAPACITY
+    ):
+        """初始化球引擎.
+
+        Args:
+            radius (int, optional): 球的半徑. Defaults to BALL_RADIUS.
+            color (tuple, optional): 球的顏色. Defaults to BALL_COLOR.
+            capacity (int, optional): 陣列初始容量. Defaults to BALL_ENGINE_CAPACITY.
+        """
+        self.radius = radius
+        self.color = color
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.vx = np.zeros(capacity, dtype=np.float64)
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.launched = np.zeros(capacity, dtype=bool)
+        self.prev_x = np.zeros(capacity, dtype=np.float64)
+        self.prev_y = np.zeros(capacity, dtype=np.float64)
+        self.idle_count = 0
+        self.idle_x = 0.0
+        self.idle_y = 0.0
+        self._idle_prev = (0.0, 0.0)
+        self._sprite = None
+        self._sprite_radius = None
+
+    def __len__(self):
+        """回傳目前球的總數（包含尚未發射的球）."""
+        return self.count + self.idle_count
+
+    def __iter__(self):
+        """依序產生陣列中每顆球的 `BallView`（不含尚未發射的球）."""
+        for i in range(self.count):
+            yield BallView(self, i)
+
+    def __getitem__(self, index):
+        """取得指定索引的 `BallView`.
+
+        Args:
+            index (int): 球的索引
+
+        Returns:
+            BallView: 球的檢視
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("ball index out of range")
+        return BallView(self, index)
+
+    def _grow(self, needed):
+        """擴大陣列容量直到至少能放下 needed 顆球.
+
+        Args:
+            needed (int): 需要的最小容量
+        """
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        # 容量每次加倍，讓大量加球時的搬移次數維持很少
+        while capacity < needed:
+            capacity *= 2
+        for name in self.ARRAY_NAMES:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: self.count] = old[: self.count]
+            setattr(self, name, new)
+
+    def add(self, x, y, vx=0.0, vy=0.0, launched=False):
+        """新增一顆球.
+
+        未發射的球只會加進待發射的數量（見 `add_idle`），不佔陣列空間。
+
+        Args:
+            x (float): x 座標
+            y (float): y 座標
+            vx (float, optional): x 方向速度. Defaults to 0.0.
+            vy (float, optional): y 方向速度. Defaults to 0.0.
+            launched (bool, optional): 是否已發射. Defaults to False.
+
+        Returns:
+            int: 新球的索引，未發射的球則回傳 -1
+        """
+        if not launched:
+            self.add_idle(1, x, y)
+            return -1
+        self._grow(self.count + 1)
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.launched[i] = launched
+        self.prev_x[i] = x
+        self.prev_y[i] = y
+        self.count += 1
+        return i
+
+    def append(self, ball):
+        """把既有的 `Ball` 物件狀態複製進引擎.
+
+        Args:
+            ball (Ball): 要加入的球
+        """
+        self.add(ball.x, ball.y, ball.vx, ball.vy, ball.launched)
+
+    def clear(self):
+        """移除所有球（保留已配置的陣列容量）."""
+        self.count = 0
+        self.idle_count = 0
+
+    def add_idle(self, amount, x, y):
+        """增加停在底板上、尚未發射的球.
+
+        Args:
+            amount (int): 增加的球數
+            x (float): 球所在的 x 座標
+            y (float): 球所在的 y 座標
+        """
+        if self.idle_count == 0:
+            self._idle_prev = (x, y)
+        self.idle_count += amount
+        self.idle_x = x
+        self.idle_y = y
+
+    def unlaunched_count(self):
+        """回傳尚未發射的球數.
+
+        Returns:
+            int: 未發射的球數
+        """
+        return self.idle_count
+
+    def launch_idle(self, vx, vy):
+        """發射一顆待發射的球：在它目前的位置建立一顆已發射的球.
+
+        Args:
+            vx (float): x 方向速度
+            vy (float): y 方向速度
+
+        Returns:
+            int: 新球的索引，沒有待發射的球時回傳 -1
+        """
+        if self.idle_count == 0:
+            return -1
+        self.idle_count -= 1
+        return self.add(self.idle_x, self.idle_y, vx, vy, launched=True)
+
+    def save_previous(self):
+        """記下目前位置，作為這一步模擬前的位置（繪圖時用來插值）."""
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self._idle_prev = (self.idle_x, self.idle_y)
+
+    def move_with_paddle(self, paddle):
+        """讓未發射的球停在底板上方中央.
+
+        Args:
+            paddle: 底板物件
+        """
+        self.idle_x = paddle.x + paddle.width / 2
+        self.idle_y = paddle.y - self.radius - 1
+
+    def step(self):
+        """根據速度一次移動所有已發射的球."""
+        n = self.count
+        moving = self.launched[:n]
+        self.x[:n][moving] += self.vx[:n][moving]
+        self.y[:n][moving] += self.vy[:n][moving]
+
+    def check_wall_collision(self, width, height):
+        """整批檢查已發射的球與視窗邊界的碰撞.
+
+        Args:
+            width (int): 視窗寬度
+            height (int): 視窗高度
+        """
+        n = self.count
+        r = self.radius
+        x = self.x[:n]
+        y = self.y[:n]
+        vx = self.vx[:n]
+        vy = self.vy[:n]
+        moving = self.launched[:n]
+
+        # 左右牆：先處理左牆，沒撞左牆的才檢查右牆（和逐顆版本的 elif 一樣）
+        left = moving & (x - r <= 0)
+        right = moving & ~left & (x + r >= width)
+        x[left] = r
+        x[right] = width - r
+        bounced = left | right
+        vx[bounced] = -vx[bounced]
+
+        # 上牆
+        top = moving & (y - r <= 0)
+        y[top] = r
+        vy[top] = -vy[top]
+
+    def check_brick_collision(self, bricks, on_hit, rng=None):
+        """檢查球和磚塊的碰撞.
+
+        只有位在磚塊區域附近的已發射球才需要檢查；附近的球至少有
+        `BRICK_BATCH_MIN_BALLS` 顆、磚塊場地又能整批判斷重疊時，先用
+        `BrickField.overlapping` 一次找出真的碰到磚塊的球，只有這些球
+        才逐顆處理（球很少時整批運算的固定成本比逐顆檢查還高）。每顆球的碰撞
+        結果會依索引順序立即交給 on_hit 處理，讓隨機數的使用順序和逐顆更新時相同。
+
+        Args:
+            bricks (list or BrickField): 磚塊清單或磚塊場地
+            on_hit (callable): 以被命中的磚塊清單呼叫的回呼函式
+            rng (random.Random, optional): 決定是否額外命中的亂數產生器.
+                Defaults to 模組層級的 random.
+        """
+        n = self.count
+        if n == 0 or not bricks:
+            return
+        r = self.radius
+        # 整個磚塊區域的外框，外框外的球不可能碰到任何磚塊
+        bounds = _brick_bounds(bricks)
+        left = bounds[0] - r
+        top = bounds[1] - r
+        right = bounds[2] + r
+        bottom = bounds[3] + r
+        x = self.x[:n]
+        y = self.y[:n]
+        near = (
+            self.launched[:n] & (x >= left) & (x <= right) & (y >= top) & (y <= bottom)
+        )
+        indices = np.flatnonzero(near)
+        overlapping = getattr(bricks, "overlapping", None)
+        if overlapping is not None and len(indices) >= BRICK_BATCH_MIN_BALLS:
+            # 前面的球只會打掉磚塊，不會讓後面的球多出新的重疊，
+            # 所以一開始沒碰到磚塊的球整幀都不必再檢查
+            indices = indices[overlapping(x[indices], y[indices], r)]
+        # 所有球共用同一個檢視，只換索引，不必每顆球配置一個新物件
+        view = BallView(self, 0)
+        for i in indices.tolist():
+            view.index = i
+            hit_bricks = view.check_brick_collision(bricks, rng)
+            if hit_bricks:
+                on_hit(hit_bricks)
+
+    def check_paddle_collision(self, paddle):
+        """整批檢查已發射的球與底板的碰撞.
+
+        Args:
+            paddle: 底板物件
+        """
+        n = self.count
+        r = self.radius
+        x = self.x[:n]
+        y = self.y[:n]
+        vy = self.vy[:n]
+        top = paddle.y
+        hit = (
+            self.launched[:n]
+            & (x + r >= paddle.x)
+            & (x - r <= paddle.x + paddle.width)
+            & (y + r >= top)
+            & (y - r <= top + paddle.height)
+            & (vy > 0)
+        )
+        if not hit.any():
+            return
+        y[hit] = top - r - 1
+        vy[hit] = -np.abs(vy[hit])
+        # 根據碰撞位置調整水平速度，讓玩家能控制反彈角度
+        half_width = paddle.width / 2
+        offset = (x[hit] - (paddle.x + half_width)) / half_width
+        self.vx[:n][hit] += offset * 2
+
+    def sweep(self, width, bricks, paddle, on_hit, rng=None):
+        """以連續碰撞移動所有已發射的球，並處理磚塊、底板與左右上牆的碰撞.
+
+        取代 `step`、`check_wall_collision`、`check_brick_collision` 與
+        `check_paddle_collision`。
+        路徑外框碰不到磚塊區域、底板與牆壁的球直接整批移動；其餘的球逐顆沿著這一步
+        的路徑找出最早碰到的磚塊、底板或牆壁，移到接觸點反彈後再用剩下的時間
+        繼續移動，一步最多處理 `SWEPT_MAX_CONTACTS` 次接觸。球速再快也不會穿過
+        磚塊或底板，不必把一步拆成多個小步。底板在這一步內視為靜止。
+        接觸次數用完時，剩下的路徑只移到下一個接觸點為止：牆壁直接反彈，磚塊與
+        底板留到下一步處理，所以不必再呼叫 `check_wall_collision`。
+
+        Args:
+            width (int): 視窗寬度
+            bricks (list or BrickField): 磚塊清單或磚塊場地
+            paddle: 底板物件
+            on_hit (callable): 以被命中的磚塊清單呼叫的回呼函式
+            rng (random.Random, optional): 決定是否額外命中的亂數產生器.
+                Defaults to 模組層級的 random.
+        """
+        n = self.count
+        if n == 0:
+            return
+        r = self.radius
+        x = self.x[:n]
+        y = self.y[:n]
+        end_x = x + self.vx[:n]
+        end_y = y + self.vy[:n]
+        low_x = np.minimum(x, end_x) - r
+        high_x = np.maximum(x, end_x) + r
+        low_y = np.minimum(y, end_y) - r
+        high_y = np.maximum(y, end_y) + r
+
+        # 路徑外框碰得到磚塊區域、底板或牆壁的球才需要逐顆處理
+        near = (low_x <= 0) | (high_x >= width) | (low_y <= 0)
+        near |= (
+            (high_x >= paddle.x)
+            & (low_x <= paddle.x + paddle.width)
+            & (high_y >= paddle.y)
+            & (low_y <= paddle.y + paddle.height)
+        )
+        if bricks:
+            left, top, right, bottom = _brick_bounds(bricks)
+            near |= (
+                (high_x >= left)
+                & (low_x <= right)
+                & (high_y >= top)
+                & (low_y <= bottom)
+            )
+        moving = self.launched[:n]
+        near &= moving
+        free = moving & ~near
+        x[free] = end_x[free]
+        y[free] = end_y[free]
+        for i in np.flatnonzero(near).tolist():
+            self._sweep_ball(i, width, bricks, paddle, on_hit, rng)
+
+    def _sweep_ball(self, i, width, bricks, paddle, on_hit, rng):
+        """沿著這一步的路徑移動一顆球，依時間先後處理路上碰到的東西.
+
+        Args:
+            i (int): 球的索引
+            width (int): 視窗寬度
+            bricks (list or BrickField): 磚塊清單或磚塊場地
+            paddle: 底板物件
+            on_hit (callable): 以被命中的磚塊清單呼叫的回呼函式
+            rng (random.Random): 決定是否額外命中的亂數產生器
+        """
+        r = self.radius
+        x = float(self.x[i])
+        y = float(self.y[i])
+        vx = float(self.vx[i])
+        vy = float(self.vy[i])
+        paddle_right = paddle.x + paddle.width
+        paddle_bottom = paddle.y + paddle.height
+        half_width = paddle.width / 2
+        remaining = 1.0
+        contacts_left = SWEPT_MAX_CONTACTS
+        while True:
+            dx = vx * remaining
+            dy = vy * remaining
+            # 每種接觸為 (時間, 優先順序, 種類, 資料)；同時碰到時依原本的檢查
+            # 順序：牆壁、磚塊、底板
+            contacts = []
+            if dx < 0 and x + dx <= r:
+                contacts.append((max(0.0, (r - x) / dx), 0, "wall_x", None))
+            elif dx > 0 and x + dx >= width - r:
+                contacts.append((max(0.0, (width - r - x) / dx), 0, "wall_x", None))
+            if dy < 0 and y + dy <= r:
+                contacts.append((max(0.0, (r - y) / dy), 0, "wall_y", None))
+            if bricks:
+                contact = first_brick_contact(bricks, x, y, dx, dy, r)
+                if contact is not None:
+                    contacts.append((contact[0], 1, "brick", contact[1:]))
+            # 和原本一樣只在球往下掉時處理底板
+            if vy > 0:
+                contact = sweep_circle_rect(
+                    x, y, dx, dy, r, paddle.x, paddle.y, paddle_right, paddle_bottom
+                )
+                if contact is not None:
+                    contacts.append((contact[0], 2, "paddle", None))
+            if not contacts:
+                x += dx
+                y += dy
+                break
+
+            t, _, kind, data = min(contacts, key=lambda contact: contact[:2])
+            x += dx * t
+            y += dy * t
+            if kind == "wall_x":
+                vx = -vx
+            elif kind == "wall_y":
+                vy = -vy
+            elif contacts_left == 0:
+                # 這一步的接觸次數用完：停在磚塊或底板的接觸點，不穿過去也不丟掉
+                # 到那裡為止的移動；這次接觸在下一步從時間 0 開始處理
+                break
+            elif kind == "brick":
+                flip_x, brick = data
+                # 簡單反彈：根據接觸的面反轉 vx 或 vy
+                if flip_x:
+                    vx = -vx
+                else:
+                    vy = -vy
+                on_hit(Ball.hit_brick(bricks, brick, rng))
+            else:
+                y = paddle.y - r - 1
+                vy = -abs(vy)
+                # 根據碰撞位置調整水平速度，讓玩家能控制反彈角度
+                vx += (x - (paddle.x + half_width)) / half_width * 2
+            if contacts_left == 0:
+                # 牆壁的反彈沒有其他作用，接觸次數用完時照樣反彈，但不再往前移動
+                break
+            contacts_left -= 1
+            remaining *= 1 - t
+            if remaining <= 0:
+                break
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+
+    def remove_out_of_bounds(self, width, height):
+        """移除所有已離開視窗的已發射球，並把剩下的球往前壓縮.
+
+        Args:
+            width (int): 視窗寬度
+            height (int): 視窗高度
+
+        Returns:
+            int: 被移除的球數
+        """
+        n = self.count
+        r = self.radius
+        x = self.x[:n]
+        y = self.y[:n]
+        gone = self.launched[:n] & (
+            (x + r < 0) | (x - r > width) | (y - r > height) | (y + r < 0)
+        )
+        removed = int(np.count_nonzero(gone))
+        if removed == 0:
+            return 0
+        # 保留剩下的球並維持原本順序
+        keep = ~gone
+        remaining = n - removed
+        for name in self.ARRAY_NAMES:
+            array = getattr(self, name)
+            array[:remaining] = array[:n][keep]
+        self.count = remaining
+        return removed
+
+    def draw(self, surface, merge=BALL_DRAW_MERGE, alpha=1.0, scale=1.0):
+        """用一次 `Surface.blits` 繪製所有球.
+
+        所有球大小顏色都一樣，所以共用同一張預先畫好的小圖，
+        畫出來的像素和逐顆呼叫 `Ball.draw` 相同。未發射的球全部疊在
+        同一個位置，只畫一顆。
+
+        Args:
+            surface: pygame surface 物件
+            merge (bool, optional): 是否把落在同一個像素位置的球只畫一次.
+                Defaults to BALL_DRAW_MERGE.
+            alpha (float, optional): 插值比例，0 為上一步的位置、1 為目前位置.
+                Defaults to 1.0.
+            scale (float, optional): 內部繪圖比例，球的位置與半徑都依比例縮小.
+                Defaults to 1.0.
+
+        Returns:
+            list: 每次貼圖畫到的 pygame.Rect 區域
+        """
+        n = self.count
+        if n == 0 and self.idle_count == 0:
+            return []
+        radius = self.radius
+        if scale != 1.0:
+            radius = max(1, round(radius * scale))
+        if self._sprite_radius != radius:
+            self._sprite = make_ball_sprite(radius, self.color)
+            self._sprite_radius = radius
+        x = self.x[:n]
+        y = self.y[:n]
+        idle_x = self.idle_x
+        idle_y = self.idle_y
+        if alpha < 1.0:
+            # 畫面落在兩個模擬步驟之間時，畫在兩步之間的位置讓動作更平順
+            prev_x = self.prev_x[:n]
+            prev_y = self.prev_y[:n]
+            x = prev_x + (x - prev_x) * alpha
+            y = prev_y + (y - prev_y) * alpha
+            idle_prev_x, idle_prev_y = self._idle_prev
+            idle_x = idle_prev_x + (idle_x - idle_prev_x) * alpha
+            idle_y = idle_prev_y + (idle_y - idle_prev_y) * alpha
+        if scale != 1.0:
+            x = x * scale
+            y = y * scale
+            idle_x *= scale
+            idle_y *= scale
+        # 和 Ball.draw 一樣先把中心座標取整數，再換算成小圖左上角
+        left = x.astype(np.int64) - radius
+        top = y.astype(np.int64) - radius
+        if merge:
+            # 位置完全相同的球畫出來也一樣，只要畫一次
+            packed = np.unique((left << 32) + (top & 0xFFFFFFFF))
+            left = packed >> 32
+            top = (packed & 0xFFFFFFFF).astype(np.int32)
+        sprite = self._sprite
+        blit_list = [
+            (sprite, position) for position in zip(left.tolist(), top.tolist())
+        ]
+        if self.idle_count:
+            blit_list.append((sprite, (int(idle_x) - radius, int(idle_y) - radius)))
+        return surface.blits(blit_list)
@@ -0,0 +1,449 @@
+"""批次模擬模組.
+
+把大量無頭遊戲分配到多個行程同時執行，用來調整 `BALL_SPEED`、
+`BALLS_ADD_INTERVAL`、`LAUNCH_DELAY` 等參數。每個工作單位用一個遊戲物件
+連續玩 `BATCH_GAMES_PER_TASK` 局，每局結束就把一筆精簡的結果送回主行程，
+主行程邊收邊彙整成表格（也可以同時寫成 CSV）。
+
+每局開始前都會換成這一局自己的亂數種子（`--seed` 加上這一局在同一組設定中的
+序號），結果中的 seed 欄位就是那一局的種子：自動控制的局可以用
+`python main.py --headless --seed <seed>` 單獨重現（需搭配相同的 `--level`）。
+
+各個模組都以 `from config import *` 取得設定，因此覆寫設定時要改掉每個已
+載入模組裡的同名全域變數；已經綁定成函式預設參數的值（例如
+`create_bricks` 的行列數）不會受影響。
+
+同一組種子會套用到每一組設定，不同設定之間的比較是成對的。
+
+使用方法:
+    python batch_runner.py --games 1000
+    python batch_runner.py --games 500 --sweep BALL_SPEED=4,6,8 --set LAUNCH_DELAY=50
+    python batch_runner.py --policy sweep --workers 4 --csv results.csv
+"""
+
+import argparse
+import ast
+import csv
+import importlib
+import itertools
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+import config
+from config import *
+
+# 每局結果的欄位（工作行程以 tuple 依這個順序送回）
+RESULT_FIELDS = (
+    "config",
+    "seed",
+    "outcome",
+    "score",
+    "frames",
+    "bricks_left",
+    "total_balls",
+)
+OUTCOME_LOSE, OUTCOME_WIN, OUTCOME_TIMEOUT = range(3)
+OUTCOME_NAMES = ("lose", "win", "timeout")
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 工作行程第一次覆寫前的原始設定值，切換設定時用來還原
+_original_values = {}
+
+
+def autopilot_policy(game):
+    """自動駕駛策略：讓底板去接最接近底板、正在往下掉的球.
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+
+    Returns:
+        tuple: 假的滑鼠位置 (x, y)
+    """
+    from utils import autopilot_mouse_pos
+
+    return autopilot_mouse_pos(game.paddle, game.balls)
+
+
+def sweep_policy(game):
+    """腳本策略：不看球，讓底板以固定週期在視窗左右來回掃動.
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+
+    Returns:
+        tuple: 假的滑鼠位置 (x, y)
+    """
+    # 以這一局開始後的步數計算，每一局都從同一個相位開始，不受前面幾局影響
+    frames = game.frame_count - game.game_start_frame
+    phase = 2 * math.pi * frames / BATCH_SWEEP_PERIOD
+    return (int(WINDOW_WIDTH / 2 * (1 + math.sin(phase))), game.paddle.y)
+
+
+POLICIES = {"autopilot": autopilot_policy, "sweep": sweep_policy}
+
+
+def parse_override(text):
+    """解析 `NAME=VALUE` 形式的設定覆寫.
+
+    Args:
+        text (str): 命令列上的覆寫字串
+
+    Returns:
+        tuple: (設定名稱, 值)；值能當成 Python 字面值時會轉型，否則保留字串
+
+    Raises:
+        ValueError: 格式錯誤或 config 沒有這個設定
+    """
+    name, separator, value = text.partition("=")
+    name = name.strip()
+    if not separator or not name:
+        raise ValueError(f"設定覆寫的格式應為 NAME=VALUE：{text}")
+    if not name.isupper() or not hasattr(config, name):
+        raise ValueError(f"config 沒有 {name} 這個設定")
+    try:
+        return name, ast.literal_eval(value.strip())
+    except (ValueError, SyntaxError):
+        return name, value.strip()
+
+
+def apply_overrides(overrides):
+    """把設定覆寫套用到所有已載入的遊戲模組，其他設定還原成原始值.
+
+    Args:
+        overrides (dict): 設定名稱對應到新的值
+    """
+    for name in set(_original_values) | set(overrides):
+        if name not in _original_values:
+            _original_values[name] = getattr(config, name)
+        value = overrides.get(name, _original_values[name])
+        for module in list(sys.modules.values()):
+            path = getattr(module, "__file__", None)
+            if (
+                path is not None
+                and os.path.dirname(os.path.abspath(path)) == _PACKAGE_DIR
+                and name in vars(module)
+            ):
+                setattr(module, name, value)
+
+
+def build_configs(fixed, sweeps):
+    """由固定覆寫與掃描清單展開所有設定組合.
+
+    Args:
+        fixed (dict): 每組設定都套用的覆寫
+        sweeps (list): (設定名稱, 值清單) 的清單
+
+    Returns:
+        list: 每組設定的覆寫 dict
+    """
+    names = [name for name, _ in sweeps]
+    configs = []
+    for values in itertools.product(*(values for _, values in sweeps)):
+        overrides = dict(fixed)
+        overrides.update(zip(names, values))
+        configs.append(overrides)
+    return configs
+
+
+def build_tasks(configs, games, seed, policy, level, max_frames):
+    """把每組設定要玩的局數切成工作單位.
+
+    Args:
+        configs (list): 每組設定的覆寫 dict
+        games (int): 每組設定要玩的局數
+        seed (int): 每組設定第一局的亂數種子，之後每局加 1
+        policy (str): 控制底板的策略名稱
+        level (str): 關卡檔路徑，None 表示預設版面
+        max_frames (int): 每局最多模擬幾步
+
+    Returns:
+        list: 工作單位
+    """
+    tasks = []
+    for config_index, overrides in enumerate(configs):
+        for start in range(0, games, BATCH_GAMES_PER_TASK):
+            count = min(BATCH_GAMES_PER_TASK, games - start)
+            tasks.append(
+                (
+                    config_index,
+                    overrides,
+                    seed + start,
+                    count,
+                    policy,
+                    level,
+                    max_frames,
+                )
+            )
+    return tasks
+
+
+def _init_worker():
+    """工作行程初始化：沒有螢幕也能建立無頭遊戲，並先載入遊戲模組."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    # SDL 預設會攔截 SIGTERM，行程池結束時就無法終止工作行程
+    os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+    importlib.import_module("game_logic")
+
+
+def run_task(task):
+    """在工作行程中連續玩幾局，回傳每局的精簡結果.
+
+    第 n 局（從 0 開始）以 seed + n 為種子，並從模擬時間 0 開始，每局都和以該種子
+    新建的遊戲相同。
+
+    Args:
+        task (tuple): build_tasks 產生的工作單位
+
+    Returns:
+        list: 每局一個依 RESULT_FIELDS 排列的 tuple
+    """
+    config_index, overrides, seed, games, policy, level, max_frames = task
+    from game_logic import BrickBreakerGame
+    from sim_clock import SimulationClock
+
+    apply_overrides(overrides)
+    game = BrickBreakerGame(
+        headless=True, seed=seed, level=level, policy=POLICIES[policy]
+    )
+    results = []
+    while len(results) < games:
+        played = game.games_played
+        game.step()
+        if game.games_played != played:
+            last = game.last_game
+            outcome = OUTCOME_WIN if last["result"] == "You Win!" else OUTCOME_LOSE
+            results.append(
+                (
+                    config_index,
+                    game.seed,
+                    outcome,
+                    last["score"],
+                    last["frames"],
+                    last["bricks_left"],
+                    last["total_balls"],
+                )
+            )
+        elif game.frame_count - game.game_start_frame >= max_frames:
+            # 太久沒有結束：記成逾時並直接開下一局
+            results.append(
+                (
+                    config_index,
+                    game.seed,
+                    OUTCOME_TIMEOUT,
+                    game.score,
+                    max_frames,
+                    game.bricks.live_count,
+                    game.total_balls,
+                )
+            )
+        else:
+            continue
+        # 下一局換成自己的種子、從時間 0 開始（毫秒取整數，起點不同時發球時間
+        # 會差一步），和以這個種子新建的遊戲完全相同
+        game.time_source = SimulationClock()
+        game.reset_game(seed=seed + len(results))
+    return results
+
+
+def run_batch(tasks, workers, on_result=None):
+    """以行程池執行所有工作單位，邊收到結果邊回呼.
+
+    Args:
+        tasks (list): 工作單位
+        workers (int): 工作行程數；1 時直接在目前行程執行
+        on_result (callable, optional): 每收到一局結果就以該 tuple 呼叫.
+            Defaults to None.
+
+    Returns:
+        numpy.ndarray: 所有結果，形狀為 (局數, len(RESULT_FIELDS))
+    """
+    results = []
+    total = sum(task[3] for task in tasks)
+    start = last_report = time.perf_counter()
+
+    def collect(batch):
+        nonlocal last_report
+        for result in batch:
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+        now = time.perf_counter()
+        if now - last_report >= BATCH_REPORT_INTERVAL:
+            rate = len(results) / (now - start)
+            print(
+                f"完成 {len(results)}/{total} 局（{rate:.1f} 局/秒）", file=sys.stderr
+            )
+            last_report = now
+
+    if workers == 1:
+        _init_worker()
+        for task in tasks:
+            collect(run_task(task))
+    else:
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            for batch in pool.imap_unordered(run_task, tasks):
+                collect(batch)
+    return np.array(results, dtype=np.int64).reshape(-1, len(RESULT_FIELDS))
+
+
+def summarize(results, configs):
+    """把每局結果依設定彙整.
+
+    Args:
+        results (numpy.ndarray): run_batch 的結果
+        configs (list): 每組設定的覆寫 dict
+
+    Returns:
+        list: 每組設定一個 dict，包含局數、勝率、逾時數與平均分數等
+    """
+    columns = {name: i for i, name in enumerate(RESULT_FIELDS)}
+    rows = []
+    for config_index, overrides in enumerate(configs):
+        games = results[results[:, columns["config"]] == config_index]
+        count = len(games)
+        outcome = games[:, columns["outcome"]]
+        frames = games[:, columns["frames"]]
+
+        def mean(name):
+            return float(games[:, columns[name]].mean()) if count else 0.0
+
+        rows.append(
+            {
+                "config": overrides,
+                "games": count,
+                "win_rate": float(np.mean(outcome == OUTCOME_WIN)) if count else 0.0,
+                "timeouts": int(np.count_nonzero(outcome == OUTCOME_TIMEOUT)),
+                "mean_score": mean("score"),
+                "mean_seconds": mean("frames") / SIMULATION_HZ,
+                "p90_seconds": (
+                    float(np.percentile(frames, 90)) / SIMULATION_HZ if count else 0.0
+                ),
+                "mean_bricks_left": mean("bricks_left"),
+            }
+        )
+    return rows
+
+
+def print_table(rows):
+    """以表格印出 summarize 的結果.
+
+    Args:
+        rows (list): summarize 的結果
+    """
+    labels = [
+        ", ".join(f"{name}={value}" for name, value in row["config"].items())
+        or "(default)"
+        for row in rows
+    ]
+    width = max([len("config")] + [len(label) for label in labels]) + 2
+    header = (
+        f"{'config':<{width}}{'games':>7}{'win%':>7}{'timeout':>8}"
+        f"{'score':>9}{'time s':>8}{'p90 s':>8}{'bricks':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for label, row in zip(labels, rows):
+        print(
+            f"{label:<{width}}{row['games']:>7}{row['win_rate'] * 100:>7.1f}"
+            f"{row['timeouts']:>8}{row['mean_score']:>9.1f}"
+            f"{row['mean_seconds']:>8.1f}{row['p90_seconds']:>8.1f}"
+            f"{row['mean_bricks_left']:>8.1f}"
+        )
+    print("（time 為遊戲時間，bricks 為結束時剩下的磚塊數）")
+
+
+def main():
+    """命令列入口：展開設定、執行批次模擬並印出彙整表格."""
+    parser = argparse.ArgumentParser(description="敲磚塊遊戲批次模擬")
+    parser.add_argument("--games", type=int, default=100, help="每組設定玩幾局")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="工作行程數（預設為 CPU 核心數）",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="第一個亂數種子")
+    parser.add_argument(
+        "--policy", choices=sorted(POLICIES), default="autopilot", help="底板控制策略"
+    )
+    parser.add_argument("--level", help="使用的關卡檔")
+    parser.add_argument(
+        "--max-frames", type=int, default=BATCH_MAX_FRAMES, help="每局最多模擬幾步"
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="覆寫設定（可重複指定）",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2,...",
+        help="對設定的每個值各跑一組（可重複指定，會展開所有組合）",
+    )
+    parser.add_argument("--csv", help="把每局結果寫成 CSV 檔")
+    args = parser.parse_args()
+
+    try:
+        fixed = dict(parse_override(text) for text in args.set)
+        sweeps = []
+        for text in args.sweep:
+            name, _, values = text.partition("=")
+            sweeps.append(
+                (
+                    name.strip(),
+                    [
+                        parse_override(f"{name}={value}")[1]
+                        for value in values.split(",")
+                    ],
+                )
+            )
+    except ValueError as error:
+        parser.error(str(error))
+
+    configs = build_configs(fixed, sweeps)
+    tasks = build_tasks(
+        configs, args.games, args.seed, args.policy, args.level, args.max_frames
+    )
+    total = args.games * len(configs)
+    print(
+        f"{len(configs)} 組設定 × {args.games} 局，共 {total} 局，"
+        f"{args.workers} 個工作行程",
+        file=sys.stderr,
+    )
+
+    csv_file = writer = None
+    if args.csv:
+        csv_file = open(args.csv, "w", newline="", encoding="utf-8")
+        writer = csv.writer(csv_file)
+        writer.writerow(RESULT_FIELDS)
+    start = time.perf_counter()
+    try:
+        results = run_batch(
+            tasks, args.workers, None if writer is None else writer.writerow
+        )
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+    elapsed = time.perf_counter() - start
+
+    print_table(summarize(results, configs))
+    frames = int(results[:, RESULT_FIELDS.index("frames")].sum())
+    print(
+        f"\n{len(results)} 局、{frames} 步，耗時 {elapsed:.2f} 秒"
+        f"（{len(results) / elapsed:.1f} 局/秒，{frames / elapsed:.0f} 步/秒）"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+"""效能測試模組.
+
+以無頭模式執行固定的測試情境，量測每一幀各階段（`_update_balls`、
+`_update_explosions`、`check_game_state`、`render`）花費的時間與記憶體配置，
+並輸出可以在不同 commit 之間比較的 JSON 結果。
+
+每個情境都使用固定的亂數種子，同一台機器上重複執行會得到相同的遊戲過程。
+
+使用方法:
+    python benchmark.py                              # 執行全部情境
+    python benchmark.py --scenario balls_1k --frames 300
+    python benchmark.py --json after.json --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pygame
+
+from config import *
+from ball_engine import BallEngine
+from game_logic import BrickBreakerGame
+from game_objects import Ball, Brick, Explosion
+from utils import create_bricks
+
+# 每個情境的設定：
+#   balls                維持在場上的已發射球數
+#   bricks               傳給 create_bricks 的參數（None 表示預設 50 塊磚）
+#   initial_explosions   開始前先產生的爆炸數
+#   explosions_per_frame 每幀額外產生的爆炸數
+SCENARIOS = {
+    "balls_10": {"balls": 10},
+    "balls_1k": {"balls": 1000},
+    "balls_10k": {"balls": 10000},
+    "bricks_5000": {
+        "balls": 1000,
+        "bricks": {"rows": 50, "cols": 100, "width": 6, "height": 4, "padding": 2},
+    },
+    "explosion_burst": {
+        "balls": 10,
+        "initial_explosions": 200,
+        "explosions_per_frame": 20,
+    },
+}
+
+# 要分別量測時間的遊戲方法與它們在結果中的名稱
+PHASES = {
+    "_update_balls": "update_balls",
+    "_update_explosions": "update_explosions",
+    "check_game_state": "check_game_state",
+    "render": "render",
+}
+
+
+def _timed(method, samples):
+    """包裝一個方法，讓每次呼叫花費的秒數記到 samples.
+
+    Args:
+        method (callable): 要量測的方法
+        samples (list): 存放耗時的清單
+
+    Returns:
+        callable: 包裝後的方法
+    """
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = method(*args, **kwargs)
+        samples.append(time.perf_counter() - start)
+        return result
+
+    return wrapper
+
+
+def _spawn_balls(game, target, rng):
+    """補足場上的已發射球，讓每一幀的負載維持一致.
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+        target (int): 目標球數
+        rng (random.Random): 產生球位置與方向的亂數
+    """
+    balls = game.balls
+    # 球數不夠時一直補，直到達到目標
+    while len(balls) < target:
+        angle = rng.uniform(-2.6, -0.5)
+        balls.add(
+            rng.uniform(BALL_RADIUS, WINDOW_WIDTH - BALL_RADIUS),
+            rng.uniform(WINDOW_HEIGHT / 3, PADDLE_Y - BALL_RADIUS),
+            BALL_SPEED * np.cos(angle),
+            BALL_SPEED * np.sin(angle),
+            launched=True,
+        )
+
+
+def _spawn_explosions(game, count, rng):
+    """在磚塊區域隨機產生爆炸.
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+        count (int): 爆炸數量
+        rng (random.Random): 產生位置與顏色的亂數
+    """
+    for _ in range(count):
+        Explosion(
+            rng.uniform(0, WINDOW_WIDTH),
+            rng.uniform(BRICK_OFFSET_Y, WINDOW_HEIGHT / 2),
+            (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)),
+            pool=game.particles,
+            current_time=game.time_source.get_ticks(),
+        )
+
+
+def _stats(samples):
+    """計算一組耗時的平均、p95 與 p99（毫秒）.
+
+    Args:
+        samples (list): 以秒為單位的耗時
+
+    Returns:
+        dict: mean_ms、p95_ms、p99_ms
+    """
+    if not samples:
+        return {"mean_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    values = np.asarray(samples) * 1000
+    return {
+        "mean_ms": float(values.mean()),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+    }
+
+
+def run_scenario(name, frames=300, warmup=30, alloc_frames=20, seed=12345):
+    """執行一個測試情境.
+
+    先跑 warmup 幀暖身，再量測 frames 幀的各階段耗時；最後另外開啟
+    tracemalloc 跑 alloc_frames 幀量測記憶體配置（追蹤本身很慢，所以
+    不和計時混在一起）。
+
+    Args:
+        name (str): 情境名稱（SCENARIOS 的鍵）
+        frames (int, optional): 計時的幀數. Defaults to 300.
+        warmup (int, optional): 暖身幀數. Defaults to 30.
+        alloc_frames (int, optional): 量測記憶體配置的幀數. Defaults to 20.
+        seed (int, optional): 亂數種子. Defaults to 12345.
+
+    Returns:
+        dict: 各階段與整幀的 mean_ms/p95_ms/p99_ms，以及每幀的記憶體配置
+    """
+    scenario = SCENARIOS[name]
+    random.seed(seed)
+    np.random.seed(seed)
+    rng = random.Random(seed)
+
+    game = BrickBreakerGame(headless=True)
+    brick_layout = scenario.get("bricks") or {}
+
+    def fresh_bricks():
+        # 換上一組全新的磚塊，讓測試負載不會因為磚塊被打光而改變
+        game.bricks = create_bricks(**brick_layout)
+        game.renderer.reset(game.bricks)
+
+    # 磚塊打光時不重開遊戲，而是在下一幀開始前補上新磚塊
+    finished = []
+    game._end_game = finished.append
+    fresh_bricks()
+
+    samples = {phase: [] for phase in PHASES.values()}
+    for method, phase in PHASES.items():
+        setattr(game, method, _timed(getattr(game, method), samples[phase]))
+    frame_samples = []
+
+    _spawn_explosions(game, scenario.get("initial_explosions", 0), rng)
+
+    def play_frame():
+        if finished:
+            finished.clear()
+            fresh_bricks()
+        _spawn_balls(game, scenario["balls"], rng)
+        _spawn_explosions(game, scenario.get("explosions_per_frame", 0), rng)
+        start = time.perf_counter()
+        game.step()
+        game.render()
+        return time.perf_counter() - start
+
+    # 暖身：讓快取、陣列容量都穩定下來
+    for _ in range(warmup):
+        play_frame()
+    for phase_samples in samples.values():
+        phase_samples.clear()
+
+    for _ in range(frames):
+        frame_samples.append(play_frame())
+
+    result = {phase: _stats(values) for phase, values in samples.items()}
+    result["frame"] = _stats(frame_samples)
+
+    # 記憶體配置：每幀的配置高峰與淨增加的記憶體區塊數
+    peaks = []
+    blocks = []
+    tracemalloc.start()
+    for _ in range(alloc_frames):
+        tracemalloc.reset_peak()
+        current_before = tracemalloc.get_traced_memory()[0]
+        blocks_before = sys.getallocatedblocks()
+        play_frame()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current_before)
+        blocks.append(sys.getallocatedblocks() - blocks_before)
+    tracemalloc.stop()
+    result["alloc_peak_kib_per_frame"] = float(np.mean(peaks)) / 1024
+    result["alloc_blocks_net_per_frame"] = float(np.mean(blocks))
+    result["balls"] = len(game.balls)
+    result["particles"] = len(game.particles)
+    return result
+
+
+def _traced_bytes(build):
+    """量測呼叫 build 之後新配置、仍被保留的記憶體.
+
+    Args:
+        build (callable): 建立物件的函式，回傳值會保留到量測結束
+
+    Returns:
+        int: 新增的記憶體位元組數
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used
+
+
+def measure_memory(count=10000):
+    """比較 count 顆球（和磚塊）以個別物件或陣列保存時，每個各佔多少記憶體.
+
+    Args:
+        count (int, optional): 球與磚塊的數量. Defaults to 10000.
+
+    Returns:
+        dict: 每顆球、每塊磚的位元組數
+    """
+    rng = random.Random(0)
+    positions = [
+        (rng.uniform(0, WINDOW_WIDTH), rng.uniform(0, 300)) for _ in range(count)
+    ]
+
+    def ball_objects():
+        balls = [Ball(BALL_RADIUS, BALL_COLOR, x, y, True) for x, y in positions]
+        for ball in balls:
+            ball.set_velocity(rng.uniform(-5, 5), -BALL_SPEED)
+        return balls
+
+    def ball_engine():
+        engine = BallEngine(capacity=count)
+        for x, y in positions:
+            engine.add(x, y, rng.uniform(-5, 5), -BALL_SPEED, launched=True)
+        return engine
+
+    def brick_objects():
+        return [
+            Brick(BRICK_WIDTH, BRICK_HEIGHT, int(x), int(y), (200, 50, 50))
+            for x, y in positions
+        ]
+
+    field = create_bricks(rows=100, cols=count // 100, width=4, height=2, padding=1)
+    brick_arrays = sum(
+        getattr(field, name).nbytes
+        for name in ("x", "y", "width", "height", "color", "hit")
+    )
+    return {
+        "count": count,
+        "ball_object_bytes": _traced_bytes(ball_objects) / count,
+        "ball_engine_bytes": _traced_bytes(ball_engine) / count,
+        "brick_object_bytes": _traced_bytes(brick_objects) / count,
+        "brick_field_bytes": brick_arrays / len(field),
+    }
+
+
+def _metadata(seed, frames):
+    """收集這次測試的環境資訊.
+
+    Args:
+        seed (int): 亂數種子
+        frames (int): 每個情境計時的幀數
+
+    Returns:
+        dict: 環境資訊
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        # 不在 git 專案裡（或沒有安裝 git）時就不記錄 commit
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "seed": seed,
+        "frames": frames,
+    }
+
+
+def compare(current, baseline, threshold):
+    """比較兩次測試結果，找出變慢超過門檻的項目.
+
+    Args:
+        current (dict): 這次的結果
+        baseline (dict): 作為基準的舊結果
+        threshold (float): 允許變慢的比例，例如 0.1 代表 10%
+
+    Returns:
+        list: 每個退步項目的說明文字
+    """
+    regressions = []
+    for name, result in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        for phase in list(PHASES.values()) + ["frame"]:
+            for metric in ("mean_ms", "p95_ms"):
+                before = old.get(phase, {}).get(metric)
+                after = result[phase][metric]
+                # 太短的時間量測誤差很大，低於 0.05 毫秒的不比較
+                if not before or before < 0.05:
+                    continue
+                change = after / before - 1
+                if change > threshold:
+                    regressions.append(
+                        f"{name}.{phase}.{metric}: {before:.3f} -> {after:.3f} ms "
+                        f"(+{change * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def print_table(results):
+    """以表格印出各情境的結果.
+
+    Args:
+        results (dict): run_scenario 結果，以情境名稱為鍵
+    """
+    header = f"{'scenario':<16}{'phase':<19}{'mean':>9}{'p95':>9}{'p99':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        for phase in list(PHASES.values()) + ["frame"]:
+            stats = result[phase]
+            print(
+                f"{name:<16}{phase:<19}{stats['mean_ms']:>9.3f}"
+                f"{stats['p95_ms']:>9.3f}{stats['p99_ms']:>9.3f}"
+            )
+        print(
+            f"{name:<16}{'alloc/frame':<19}"
+            f"{result['alloc_peak_kib_per_frame']:>8.1f}K"
+            f"{result['alloc_blocks_net_per_frame']:>+9.0f} blocks"
+        )
+    print("（時間單位：毫秒）")
+
+
+def print_memory(memory):
+    """印出 measure_memory 的結果.
+
+    Args:
+        memory (dict): measure_memory 的結果
+    """
+    print(f"\n{memory['count']} 個物件時每個佔用的記憶體（位元組）:")
+    print(f"  Ball 物件    {memory['ball_object_bytes']:>8.1f}")
+    print(f"  BallEngine   {memory['ball_engine_bytes']:>8.1f}")
+    print(f"  Brick 物件   {memory['brick_object_bytes']:>8.1f}")
+    print(f"  BrickField   {memory['brick_field_bytes']:>8.1f}")
+
+
+def main():
+    """命令列入口：執行情境、輸出結果並與基準比較."""
+    parser = argparse.ArgumentParser(description="敲磚塊遊戲效能測試")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="只執行指定情境（可重複指定），預設執行全部",
+    )
+    parser.add_argument("--frames", type=int, default=300, help="每個情境計時的幀數")
+    parser.add_argument("--warmup", type=int, default=30, help="暖身幀數")
+    parser.add_argument("--seed", type=int, default=12345, help="亂數種子")
+    parser.add_argument("--json", help="把結果寫成 JSON 檔")
+    parser.add_argument("--compare", help="與這個 JSON 基準檔比較")
+    parser.add_argument(
+        "--threshold", type=float, default=0.15, help="判定退步的變慢比例"
+    )
+    args = parser.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+    for name in names:
+        print(f"執行情境 {name} ...", file=sys.stderr)
+        results[name] = run_scenario(
+            name, frames=args.frames, warmup=args.warmup, seed=args.seed
+        )
+    output = {
+        "meta": _metadata(args.seed, args.frames),
+        "scenarios": results,
+        "memory": measure_memory(),
+    }
+
+    print_table(results)
+    print_memory(output["memory"])
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(output, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(output, baseline, args.threshold)
+        if regressions:
+            print("\n效能退步:")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("\n沒有超過門檻的效能退步")
+
+
+if __name__ == "__main__":
+    main()
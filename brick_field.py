@@ -0,0 +1,422 @@
+"""磚塊場地模組.
+
+`BrickField` 以 NumPy 陣列集中保存整組磚塊的位置、大小、顏色與命中狀態
+（一個布林陣列，順序和 `create_bricks` 的行列排列相同），並另外維護存活
+磚塊的數量與編號清單，判斷勝利或重畫磚塊時不必掃描已被打掉的磚塊。
+`BrickView` 讓既有程式仍能以 `Brick` 介面讀寫單塊磚。
+
+碰撞檢查時只需要查詢均勻格子空間索引中球附近還存活的磚塊；被打掉的磚塊
+會立刻從索引移除。另外以 `NeighborTable` 預先算好磚塊中心的最近鄰，供多重
+命中時快速挑選最近的存活磚塊。
+"""
+
+import numpy as np
+
+from config import *
+from game_objects import Brick
+from spatial_index import NeighborTable, UniformGrid
+
+
+class BrickView(Brick):
+    """指向 `BrickField` 中某一塊磚的輕量檢視.
+
+    所有屬性讀寫都直接對應到場地的陣列，因此可以沿用 `Brick` 的方法
+    （例如 `draw`）。磚塊不會被移動或刪除，所以檢視可以一直保留使用。
+
+    Attributes:
+        field (BrickField): 所屬的磚塊場地
+        index (int): 磚塊在場地陣列中的索引
+    """
+
+    __slots__ = ("field", "index")
+
+    def __init__(self, field, index):
+        """建立磚塊的檢視.
+
+        Args:
+            field (BrickField): 所屬的磚塊場地
+            index (int): 磚塊的索引
+        """
+        self.field = field
+        self.index = index
+
+    @property
+    def width(self):
+        """寬度."""
+        return int(self.field.width[self.index])
+
+    @property
+    def height(self):
+        """高度."""
+        return int(self.field.height[self.index])
+
+    @property
+    def x(self):
+        """x 座標（左上角）."""
+        return int(self.field.x[self.index])
+
+    @property
+    def y(self):
+        """y 座標（左上角）."""
+        return int(self.field.y[self.index])
+
+    @property
+    def color(self):
+        """RGB 顏色值."""
+        r, g, b = self.field.color[self.index].tolist()
+        return (r, g, b)
+
+    @property
+    def hit(self):
+        """是否已被打到."""
+        return bool(self.field.hit[self.index])
+
+    @hit.setter
+    def hit(self, value):
+        self.field.set_hit(self.index, value)
+
+
+class BrickField:
+    """一組以陣列保存的磚塊與其空間索引.
+
+    可以像清單一樣迭代、取長度與索引存取（取得 `BrickView`），因此原本
+    接受磚塊清單的程式不需要修改。
+
+    Attributes:
+        x (numpy.ndarray): 每塊磚左上角的 x 座標
+        y (numpy.ndarray): 每塊磚左上角的 y 座標
+        width (numpy.ndarray): 每塊磚的寬度
+        height (numpy.ndarray): 每塊磚的高度
+        color (numpy.ndarray): 每塊磚的 RGB 顏色，形狀為 (N, 3)
+        hit (numpy.ndarray): 每塊磚是否已被打到的布林陣列
+        shape (tuple): 磚塊排列的 (rows, cols)，不是格狀排列時為 None
+        live_count (int): 存活的磚塊數
+        initial_hit (numpy.ndarray): 建立時的命中狀態，`reset` 會回到這個狀態
+        live (numpy.ndarray): 前 live_count 格是存活磚塊的索引（順序不固定）
+        changes (int): 命中狀態被改變的累計次數（沒變時可以沿用之前的快照）
+        grid (UniformGrid): 存活磚塊的空間索引
+        neighbors (NeighborTable): 磚塊中心的最近鄰表
+        bounds (tuple): 全部磚塊的外框 (left, top, right, bottom)
+    """
+
+    def __init__(
+        self,
+        x,
+        y,
+        width,
+        height,
+        color,
+        hit=None,
+        shape=None,
+        cell_width=BRICK_WIDTH + BRICK_PADDING,
+        cell_height=BRICK_HEIGHT + BRICK_PADDING,
+        grid=None,
+        neighbor_table=None,
+    ):
+        """建立磚塊場地並建好空間索引.
+
+        格子大小預設等於 `create_bricks` 排列磚塊的間距，所以一般情況下
+        每塊磚剛好落在一個格子裡。位置、大小與顏色陣列不會被複製，可以直接
+        傳入關卡檔的記憶體映射檢視；只有命中狀態會另外配置可寫入的陣列。
+
+        Args:
+            x (array-like): 每塊磚左上角的 x 座標
+            y (array-like): 每塊磚左上角的 y 座標
+            width (array-like or int): 磚塊寬度
+            height (array-like or int): 磚塊高度
+            color (array-like): 每塊磚的 RGB 顏色
+            hit (array-like, optional): 每塊磚是否已被打到. Defaults to 全部存活.
+            shape (tuple, optional): 磚塊排列的 (rows, cols). Defaults to None.
+            cell_width (float, optional): 格子寬度. Defaults to 磚塊橫向間距.
+            cell_height (float, optional): 格子高度. Defaults to 磚塊縱向間距.
+            grid (UniformGrid, optional): 已建好、只含存活磚塊的空間索引.
+                Defaults to 現在建立.
+            neighbor_table (numpy.ndarray, optional): 已算好的磚塊最近鄰表.
+                Defaults to 現在計算.
+        """
+        self.x = np.asarray(x).reshape(-1)
+        count = len(self.x)
+        self.y = np.asarray(y).reshape(-1)
+        self.width = np.broadcast_to(np.asarray(width), count)
+        self.height = np.broadcast_to(np.asarray(height), count)
+        self.color = np.asarray(color, dtype=np.uint8).reshape(count, 3)
+        if hit is None:
+            self.hit = np.zeros(count, dtype=bool)
+        else:
+            self.hit = np.array(hit, dtype=bool).reshape(-1)
+        # 重開一局時要回到的命中狀態（關卡可以一開始就有被打掉的位置）
+        self.initial_hit = self.hit.copy()
+        self.changes = 0
+        self.shape = shape
+        self._views = [None] * count
+
+        # 前 live_count 格是存活磚塊的索引；_live_pos 記每塊磚在其中的位置
+        # （-1 表示已被打掉）
+        live = np.flatnonzero(~self.hit)
+        self.live_count = len(live)
+        self.live = np.empty(count, dtype=np.int64)
+        self.live[: self.live_count] = live
+        self._live_pos = np.full(count, -1, dtype=np.int64)
+        self._live_pos[live] = np.arange(self.live_count)
+
+        right_edge = self.x + self.width
+        bottom_edge = self.y + self.height
+        if count:
+            left = int(self.x.min())
+            top = int(self.y.min())
+            right = int(right_edge.max())
+            bottom = int(bottom_edge.max())
+        else:
+            left = top = right = bottom = 0
+        self.bounds = (left, top, right, bottom)
+
+        cols = int((right - left) // cell_width) + 1
+        rows = int((bottom - top) // cell_height) + 1
+        if grid is None:
+            grid = UniformGrid.from_rects(
+                left,
+                top,
+                cell_width,
+                cell_height,
+                cols,
+                rows,
+                live,
+                (self.x[live], self.y[live], right_edge[live], bottom_edge[live]),
+            )
+        elif (grid.cols, grid.rows) != (cols, rows):
+            raise ValueError(
+                f"空間索引大小不符：需要 {cols}x{rows}，收到 {grid.cols}x{grid.rows}"
+            )
+        self.grid = grid
+        # 另外以全部磚塊（包含已被打掉的）建一份不會變動的 CSR 格子內容，
+        # 整批檢查重疊時用命中狀態過濾，不必跟著空間索引增刪
+        all_cells = UniformGrid.from_rects(
+            left,
+            top,
+            cell_width,
+            cell_height,
+            cols,
+            rows,
+            np.arange(count),
+            (self.x, self.y, right_edge, bottom_edge),
+        ).cells
+        self._cell_starts = all_cells.starts
+        self._cell_items = all_cells.items
+
+        centers = np.column_stack((self.x + self.width / 2, self.y + self.height / 2))
+        self.neighbors = NeighborTable(
+            centers, cell_width, cell_height, BRICK_NEIGHBOR_COUNT, neighbor_table
+        )
+        for i in np.flatnonzero(self.hit).tolist():
+            self.neighbors.discard(i)
+
+    @classmethod
+    def from_bricks(
+        cls,
+        bricks,
+        cell_width=BRICK_WIDTH + BRICK_PADDING,
+        cell_height=BRICK_HEIGHT + BRICK_PADDING,
+    ):
+        """由 `Brick` 物件清單建立磚塊場地.
+
+        Args:
+            bricks (list): 磚塊清單
+            cell_width (float, optional): 格子寬度. Defaults to 磚塊橫向間距.
+            cell_height (float, optional): 格子高度. Defaults to 磚塊縱向間距.
+
+        Returns:
+            BrickField: 磚塊場地
+        """
+        bricks = list(bricks)
+        return cls(
+            [brick.x for brick in bricks],
+            [brick.y for brick in bricks],
+            [brick.width for brick in bricks],
+            [brick.height for brick in bricks],
+            [brick.color for brick in bricks],
+            hit=[brick.hit for brick in bricks],
+            cell_width=cell_width,
+            cell_height=cell_height,
+        )
+
+    def __len__(self):
+        """回傳磚塊總數（包含已被打掉的）."""
+        return len(self.x)
+
+    def __iter__(self):
+        """依建立順序迭代所有磚塊."""
+        for i in range(len(self.x)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        """取得指定索引的磚塊檢視（同一塊磚永遠回傳同一個檢視）."""
+        view = self._views[index]
+        if view is None:
+            if index < 0:
+                index += len(self.x)
+            view = self._views[index] = BrickView(self, index)
+        return view
+
+    def reset(self):
+        """回到建立時的命中狀態，重開一局時重複使用同一個場地."""
+        for i in np.flatnonzero(self.hit != self.initial_hit).tolist():
+            self.set_hit(i, bool(self.initial_hit[i]))
+
+    def live_bricks(self):
+        """迭代所有存活的磚塊（順序不固定），不會碰到已被打掉的磚塊."""
+        for i in self.live[: self.live_count].tolist():
+            yield self[i]
+
+    def draw(self, surface, scale=1.0):
+        """直接由陣列畫出所有存活的磚塊，不必為每塊磚建立檢視.
+
+        Args:
+            surface: pygame surface 物件
+            scale (float, optional): 內部繪圖比例，換算方式和 `scale_rect` 相同.
+                Defaults to 1.0.
+        """
+        live = self.live[: self.live_count]
+        x = self.x[live]
+        y = self.y[live]
+        width = self.width[live]
+        height = self.height[live]
+        if scale != 1.0:
+            # 左上角與右下角分別換算，相鄰的磚塊縮小後仍然剛好相接
+            left = (x * scale).astype(np.int64)
+            top = (y * scale).astype(np.int64)
+            width = ((x + width) * scale).astype(np.int64) - left
+            height = ((y + height) * scale).astype(np.int64) - top
+            x, y = left, top
+        rects = zip(x.tolist(), y.tolist(), width.tolist(), height.tolist())
+        for color, rect in zip(map(tuple, self.color[live].tolist()), rects):
+            surface.fill(color, rect)
+
+    def _rect(self, index):
+        """回傳磚塊的邊界 (left, top, right, bottom)."""
+        x = int(self.x[index])
+        y = int(self.y[index])
+        return x, y, x + int(self.width[index]), y + int(self.height[index])
+
+    def set_hit(self, index, hit=True):
+        """設定磚塊的命中狀態，同時更新存活數量、存活清單與空間索引.
+
+        Args:
+            index (int): 磚塊的索引
+            hit (bool, optional): 是否已被打到. Defaults to True.
+        """
+        if bool(self.hit[index]) == bool(hit):
+            return
+        self.hit[index] = hit
+        self.changes += 1
+        if hit:
+            # 和最後一個存活磚塊交換後移除，不必搬動其他元素
+            position = self._live_pos[index]
+            self.live_count -= 1
+            last = self.live[self.live_count]
+            self.live[position] = last
+            self._live_pos[last] = position
+            self._live_pos[index] = -1
+            self.grid.remove(index, *self._rect(index))
+            self.neighbors.discard(index)
+        else:
+            self.live[self.live_count] = index
+            self._live_pos[index] = self.live_count
+            self.live_count += 1
+            self.grid.insert(index, *self._rect(index))
+            self.neighbors.restore(index)
+
+    def candidates(self, x, y, radius):
+        """找出可能和圓形重疊的存活磚塊.
+
+        Args:
+            x (float): 圓心 x 座標
+            y (float): 圓心 y 座標
+            radius (float): 半徑
+
+        Returns:
+            list: 依建立順序排列的候選磚塊
+        """
+        indices = self.grid.query(x - radius, y - radius, x + radius, y + radius)
+        return [self[i] for i in indices]
+
+    def overlapping(self, x, y, radius):
+        """一次找出哪些圓形和至少一塊存活磚塊重疊.
+
+        結果和逐一用 `candidates` 取出附近磚塊、再以最近點距離判斷重疊相同，
+        只是全部以 NumPy 陣列運算完成：先把每個圓外框覆蓋到的格子展開，
+        再展開成格子裡的磚塊，最後一起計算距離。
+
+        Args:
+            x (numpy.ndarray): 每個圓心的 x 座標
+            y (numpy.ndarray): 每個圓心的 y 座標
+            radius (float): 所有圓共用的半徑
+
+        Returns:
+            numpy.ndarray: 每個圓是否和存活磚塊重疊的布林陣列
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        grid = self.grid
+        # 和 UniformGrid.cell_range 相同的算式，只是一次算完所有圓的外框
+        col0 = np.maximum(np.floor((x - radius - grid.origin_x) / grid.cell_width), 0)
+        col1 = np.minimum(
+            np.floor((x + radius - grid.origin_x) / grid.cell_width), grid.cols - 1
+        )
+        row0 = np.maximum(np.floor((y - radius - grid.origin_y) / grid.cell_height), 0)
+        row1 = np.minimum(
+            np.floor((y + radius - grid.origin_y) / grid.cell_height), grid.rows - 1
+        )
+        span_cols = np.maximum(col1 - col0 + 1, 0).astype(np.int64)
+        span_rows = np.maximum(row1 - row0 + 1, 0).astype(np.int64)
+        spans = span_cols * span_rows
+
+        # 把每個圓展開成它覆蓋到的每一個格子
+        owner = np.repeat(np.arange(len(x)), spans)
+        offset = np.arange(len(owner)) - np.repeat(np.cumsum(spans) - spans, spans)
+        col = col0.astype(np.int64)[owner] + offset % span_cols[owner]
+        row = row0.astype(np.int64)[owner] + offset // span_cols[owner]
+        cell = row * grid.cols + col
+
+        # 再把每個格子展開成格子裡的磚塊，只留下還存活的
+        first = self._cell_starts[cell]
+        counts = self._cell_starts[cell + 1] - first
+        owner = np.repeat(owner, counts)
+        position = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+        index = self._cell_items[np.repeat(first, counts) + position]
+        live = ~self.hit[index]
+        owner = owner[live]
+        index = index[live]
+
+        # 圓心到磚塊矩形最近點的距離不超過半徑就是重疊
+        left = self.x[index].astype(np.float64)
+        top = self.y[index].astype(np.float64)
+        right = left + self.width[index]
+        bottom = top + self.height[index]
+        dx = x[owner] - np.clip(x[owner], left, right)
+        dy = y[owner] - np.clip(y[owner], top, bottom)
+        touching = dx * dx + dy * dy <= radius * radius
+        result = np.zeros(len(x), dtype=bool)
+        result[owner[touching]] = True
+        return result
+
+    def mark_hit(self, brick):
+        """把磚塊標記為已被打到，並從空間索引中移除.
+
+        Args:
+            brick (BrickView): 被打到的磚塊
+        """
+        self.set_hit(brick.index, True)
+
+    def nearest_live(self, brick):
+        """找出中心離指定磚塊最近的存活磚塊.
+
+        距離相同時取建立順序較前面的磚塊，和掃描整個清單的結果一樣。
+
+        Args:
+            brick (BrickView): 基準磚塊
+
+        Returns:
+            BrickView: 最近的存活磚塊，沒有時回傳 None
+        """
+        index = self.neighbors.nearest(brick.index)
+        return self[index] if index >= 0 else None
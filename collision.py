@@ -0,0 +1,198 @@
+"""連續碰撞偵測模組.
+
+原本的碰撞只檢查球在每一步結束時的位置，球一步移動的距離超過磚塊或底板
+的厚度（加上球的直徑）時會直接穿過去。這裡改成沿著球這一步的路徑求出
+第一次接觸的時間（time of impact）：圓形和矩形的接觸等同於圓心和「矩形
+向外擴張半徑的圓角矩形」相交，先以擴張後的矩形做射線與平板（slab）測試，
+落在四個角落時再改和角落的圓求交。
+
+磚塊場地有空間索引時，沿著路徑每次前進最多一個格子的距離，只查詢這一段
+路徑經過的格子；找到的接觸點落在目前這一段之內時，後面的格子一定不會有
+更早的接觸，可以直接停止。
+"""
+
+import math
+
+
+def sweep_circle_rect(x, y, dx, dy, radius, left, top, right, bottom):
+    """求出移動中的圓第一次碰到矩形的時間.
+
+    一開始就已經重疊時視為在時間 0 碰到，反彈方向和 `Ball.check_brick_collision`
+    一樣由圓心到矩形最近點的方向決定。
+
+    Args:
+        x (float): 圓心起點 x 座標
+        y (float): 圓心起點 y 座標
+        dx (float): 這段路徑的 x 位移
+        dy (float): 這段路徑的 y 位移
+        radius (float): 圓的半徑
+        left (float): 矩形左邊界
+        top (float): 矩形上邊界
+        right (float): 矩形右邊界
+        bottom (float): 矩形下邊界
+
+    Returns:
+        tuple: (t, flip_x)，t 為 0 到 1 之間的接觸時間（佔整段路徑的比例），
+            flip_x 為 True 時碰到的是左右兩側（反轉 vx），否則反轉 vy；
+            這段路徑不會碰到時回傳 None
+    """
+    # 起點已經重疊
+    nearest_x = max(left, min(x, right))
+    nearest_y = max(top, min(y, bottom))
+    offset_x = x - nearest_x
+    offset_y = y - nearest_y
+    if offset_x * offset_x + offset_y * offset_y <= radius * radius:
+        return 0.0, abs(offset_x) > abs(offset_y)
+
+    # 射線和擴張半徑後的矩形做平板測試
+    if dx == 0:
+        if not left - radius <= x <= right + radius:
+            return None
+        tx0, tx1 = -math.inf, math.inf
+    else:
+        tx0 = (left - radius - x) / dx
+        tx1 = (right + radius - x) / dx
+        if tx0 > tx1:
+            tx0, tx1 = tx1, tx0
+    if dy == 0:
+        if not top - radius <= y <= bottom + radius:
+            return None
+        ty0, ty1 = -math.inf, math.inf
+    else:
+        ty0 = (top - radius - y) / dy
+        ty1 = (bottom + radius - y) / dy
+        if ty0 > ty1:
+            ty0, ty1 = ty1, ty0
+    t_enter = max(tx0, ty0)
+    t_exit = min(tx1, ty1)
+    if t_enter > t_exit or t_exit < 0 or t_enter > 1:
+        return None
+    t_enter = max(t_enter, 0.0)
+
+    # 進入點在角落區域時，真正的邊界是以矩形頂點為圓心的圓弧
+    cx = x + dx * t_enter
+    cy = y + dy * t_enter
+    corner_x = left if cx < left else right if cx > right else None
+    corner_y = top if cy < top else bottom if cy > bottom else None
+    if corner_x is not None and corner_y is not None:
+        t = _sweep_point_circle(x - corner_x, y - corner_y, dx, dy, radius)
+        if t is None:
+            return None
+        hit_x = x + dx * t - corner_x
+        hit_y = y + dy * t - corner_y
+        return t, abs(hit_x) > abs(hit_y)
+    # 最後才進入的平板就是碰到的那一面
+    return t_enter, tx0 >= ty0
+
+
+def _sweep_point_circle(fx, fy, dx, dy, radius):
+    """求出從 (fx, fy) 出發的射線第一次進入原點為圓心的圓的時間.
+
+    Args:
+        fx (float): 起點相對圓心的 x 座標（起點必須在圓外）
+        fy (float): 起點相對圓心的 y 座標
+        dx (float): 這段路徑的 x 位移
+        dy (float): 這段路徑的 y 位移
+        radius (float): 圓的半徑
+
+    Returns:
+        float: 0 到 1 之間的接觸時間，不會碰到時回傳 None
+    """
+    a = dx * dx + dy * dy
+    if a == 0:
+        return None
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - radius * radius
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / (2 * a)
+    if 0 <= t <= 1:
+        return t
+    return None
+
+
+def first_brick_contact(bricks, x, y, dx, dy, radius):
+    """找出球沿著這段路徑第一個碰到的存活磚塊.
+
+    Args:
+        bricks (list or BrickField): 磚塊清單或磚塊場地
+        x (float): 圓心起點 x 座標
+        y (float): 圓心起點 y 座標
+        dx (float): 這段路徑的 x 位移
+        dy (float): 這段路徑的 y 位移
+        radius (float): 球的半徑
+
+    Returns:
+        tuple: (t, flip_x, brick)，同時碰到時取建立順序較前面的磚塊；
+            不會碰到任何磚塊時回傳 None
+    """
+    grid = getattr(bricks, "grid", None)
+    if grid is None:
+        return _earliest_contact(bricks, x, y, dx, dy, radius, None)
+
+    # 沿著路徑每次最多前進一個格子，只查詢這一段經過的格子
+    step = min(grid.cell_width, grid.cell_height)
+    segments = max(1, math.ceil(math.hypot(dx, dy) / step))
+    best = None
+    seen = set()
+    for k in range(segments):
+        t0 = k / segments
+        t1 = (k + 1) / segments
+        x0 = x + dx * t0
+        y0 = y + dy * t0
+        x1 = x + dx * t1
+        y1 = y + dy * t1
+        indices = grid.query(
+            min(x0, x1) - radius,
+            min(y0, y1) - radius,
+            max(x0, x1) + radius,
+            max(y0, y1) + radius,
+        )
+        candidates = [bricks[i] for i in indices if i not in seen]
+        seen.update(indices)
+        contact = _earliest_contact(candidates, x, y, dx, dy, radius, best)
+        if contact is not None:
+            best = contact
+        # 之後的格子只會有更晚的接觸
+        if best is not None and best[0] <= t1:
+            break
+    return best
+
+
+def _earliest_contact(candidates, x, y, dx, dy, radius, best):
+    """在候選磚塊中找出比 best 更早的接觸.
+
+    Args:
+        candidates (iterable): 候選磚塊
+        x (float): 圓心起點 x 座標
+        y (float): 圓心起點 y 座標
+        dx (float): 這段路徑的 x 位移
+        dy (float): 這段路徑的 y 位移
+        radius (float): 球的半徑
+        best (tuple): 目前最早的 (t, flip_x, brick)，沒有時為 None
+
+    Returns:
+        tuple: 比 best 更早的 (t, flip_x, brick)，沒有時回傳 None
+    """
+    found = None
+    earliest = best
+    for brick in candidates:
+        if brick.hit:
+            continue
+        contact = sweep_circle_rect(
+            x,
+            y,
+            dx,
+            dy,
+            radius,
+            brick.x,
+            brick.y,
+            brick.x + brick.width,
+            brick.y + brick.height,
+        )
+        if contact is None:
+            continue
+        if earliest is None or contact[0] < earliest[0]:
+            found = earliest = (contact[0], contact[1], brick)
+    return found
@@ -24,6 +24,7 @@ BRICK_WIDTH = 60
 BRICK_HEIGHT = 20
 BRICK_PADDING = 5  # 磚塊間隔
 BRICK_OFFSET_Y = 60  # 上方邊距
+BRICK_NEIGHBOR_COUNT = 8  # 每塊磚預先記錄的最近鄰磚塊數量（用於多重命中）
 
 # 底板設定
 PADDLE_WIDTH = BRICK_WIDTH * 2  # 底板寬度
@@ -39,17 +40,127 @@ BALL_SPEED = 10  # 球的基本速度
 INITIAL_BALL_COUNT = 5  # 初始球數量
 BALLS_ADD_INTERVAL = 1000  # 每秒增加球的間隔 (毫秒)
 BALLS_ADD_COUNT = 5  # 每次增加的球數量
+BALL_ENGINE_CAPACITY = 256  # 球引擎陣列的初始容量（不足時自動加倍）
+BRICK_BATCH_MIN_BALLS = 24  # 附近至少幾顆球才整批判斷和磚塊重疊
+BALL_DRAW_MERGE = False  # 繪製時把落在同一個像素位置的球合併成一次貼圖
+SWEPT_COLLISION = False  # 沿路徑求接觸時間的連續碰撞（球速很快時也不會穿過磚塊）
+SWEPT_MAX_CONTACTS = 4  # 連續碰撞時每顆球每一步最多處理幾次接觸
 
 # 發射設定
 LAUNCH_DELAY = 300  # 每顆球間隔發射時間 (毫秒)
 
+# 爆炸粒子設定
+EXPLOSION_PARTICLE_COUNT = 15  # 每次爆炸的粒子數量
+EXPLOSION_DURATION = 800  # 爆炸持續時間 (毫秒)
+PARTICLE_GRAVITY = 0.2  # 每幀加到粒子 y 速度的重力
+PARTICLE_DRAG = 0.98  # 每幀粒子速度保留的比例（阻力）
+PARTICLE_POOL_CAPACITY = 4096  # 粒子池最多同時存在的粒子數
+PARTICLE_OVERFLOW_POLICY = "replace_oldest"  # 池滿時的處理："replace_oldest"/"drop_new"
+PARTICLE_COLOR_STEP = 32  # 粒子顏色分級的間距（越大快取的小圖越少）
+PARTICLE_ALPHA_STEP = 16  # 粒子透明度分級的間距
+SPRITE_CACHE_SIZE = 4096  # 粒子小圖快取最多保存的數量（每張最多約 0.6 KB）
+
+# 繪圖設定
+DIRTY_RECT_MERGE_LIMIT = 64  # 同一批髒矩形超過此數量時合併成一個外框
+DIRTY_RECT_FULL_UPDATE_LIMIT = 256  # 髒矩形總數超過此數量時直接更新整個畫面
+RENDER_SCALE = 1.0  # 內部繪圖比例：小於 1 時先畫在較小的畫布上，再一次放大到視窗
+RENDER_SCALES = (1.0, 0.75, 0.5)  # F4 依序切換的內部繪圖比例
+RENDER_SMOOTH_SCALE = False  # 放大時是否使用較平滑（但較慢）的 smoothscale
+RENDER_SCALE_MARGIN = 2  # 縮放後的髒矩形向外多更新的像素數
+
 # 遊戲設定
 FPS = 60  # 每秒畫面數
+SIMULATION_HZ = 60  # 每秒物理模擬步數（與畫面幀率分開）
+MAX_CATCHUP_STEPS = 5  # 每個畫面最多補跑的模擬步數，避免越跑越慢的惡性循環
 SCORE_PER_BRICK = 100  # 每個磚塊的分數
+HEADLESS_REPORT_INTERVAL = 1.0  # 無頭模擬時每隔幾秒（真實時間）印出模擬速度
+
+# 畫質自動調整設定：畫面來不及在每幀時間預算（1000 / FPS 毫秒）內完成時，
+# 依序降到下一個等級；有餘裕時再升回來。每個等級：
+#   particle_count  每次爆炸實際顯示的粒子數（最高等級全部顯示，其餘依比例減少）
+#   alpha_particles 粒子是否以半透明淡出（False 時畫成不透明的圓點，貼圖較快）
+#   hud_interval    分數與球數文字每幾幀才重新產生一次
+QUALITY_TIERS = (
+    {
+        "particle_count": EXPLOSION_PARTICLE_COUNT,
+        "alpha_particles": True,
+        "hud_interval": 1,
+    },
+    {
+        "particle_count": max(1, EXPLOSION_PARTICLE_COUNT * 2 // 3),
+        "alpha_particles": True,
+        "hud_interval": 2,
+    },
+    {
+        "particle_count": max(1, EXPLOSION_PARTICLE_COUNT * 2 // 5),
+        "alpha_particles": False,
+        "hud_interval": 4,
+    },
+    {
+        "particle_count": max(1, EXPLOSION_PARTICLE_COUNT // 5),
+        "alpha_particles": False,
+        "hud_interval": 8,
+    },
+)
+QUALITY_ENABLED = True  # 視窗模式是否自動調整畫質（無頭模式固定使用最高等級）
+QUALITY_EMA_WEIGHT = 0.1  # 幀時間指數移動平均中最新一幀的權重
+QUALITY_DOWNGRADE_RATIO = 1.0  # 平均幀時間超過預算的這個比例時降低畫質
+QUALITY_UPGRADE_RATIO = 0.6  # 平均幀時間低於預算的這個比例時提高畫質
+QUALITY_HOLD_FRAMES = 90  # 調整後至少經過幾幀才會再調整，避免來回切換
+
+# 效能分析設定（F3 開關）
+PROFILER_BUFFER_SIZE = 600  # 環狀緩衝區保存的幀數（60 FPS 時約 10 秒）
+PROFILER_GRAPH_POS = (170, 10)  # 畫面上效能圖表的左上角（分數顯示的右邊）
+PROFILER_GRAPH_SIZE = (240, 36)  # 效能圖表的寬高（每一欄像素是一幀）
+PROFILER_GRAPH_MAX_MS = 33.3  # 圖表頂端代表的毫秒數
+PROFILER_PHASE_COLORS = ((80, 160, 255), GREEN, RED, YELLOW)  # 各階段在圖表中的顏色
+PROFILER_DUMP_PATH = "profile.csv"  # 結束時匯出的檔案（副檔名 .json 則匯出 JSON）
+PROFILER_FONT_SIZE = 18  # 效能圖表說明文字的字型大小
 
 # 字型設定
 FONT_SIZE = 28
 LARGE_FONT_SIZE = 48
+TEXT_CACHE_SIZE = 64  # 每個文字快取最多保存的字串圖數量（另外保存用到的單字圖）
+
+# 錄製與重播設定
+REPLAY_FLUSH_FRAMES = 600  # 錄製輸入時每累積幾幀寫入檔案一次
+
+# 快照設定（Backspace 倒轉、F5 快速存檔、F9 快速讀檔）
+SNAPSHOT_INTERVAL = 30  # 每隔幾個模擬步驟自動存一份快照到環狀緩衝區
+SNAPSHOT_RING_BYTES = 16 * 1024 * 1024  # 環狀緩衝區的固定大小（位元組）
+
+# 批次模擬設定
+BATCH_GAMES_PER_TASK = 10  # 每個工作單位連續玩幾局（同一個遊戲物件自動重開）
+BATCH_MAX_FRAMES = 36000  # 每局最多模擬幾步，超過視為逾時（60 Hz 下 10 分鐘）
+BATCH_SWEEP_PERIOD = 240  # 掃描策略的底板來回一次的步數
+BATCH_REPORT_INTERVAL = 2.0  # 每隔幾秒（真實時間）印出進度
+
+# 雙行程模式設定（--split）
+SPLIT_BALL_CAPACITY = 65536  # 共享畫面中最多能放幾顆已發射的球（超過的不會畫出來）
+SPLIT_JOIN_TIMEOUT = 2.0  # 結束時等待模擬行程自行結束的秒數，超過就強制終止
+
+# 多場遊戲主機設定（session_host.py）
+SESSION_INPUT_QUEUE = 64  # 每場遊戲的輸入佇列上限，滿了就暫停讀取那個連線（背壓）
+SESSION_INPUTS_PER_TICK = 8  # 每場遊戲每一步最多處理幾筆輸入
+SESSION_FRAME_INTERVAL = 2  # 每隔幾個 tick 送一次畫面給薄客戶端
+SESSION_WRITE_LIMIT = 256 * 1024  # 客戶端未送出的資料超過這麼多位元組時略過畫面
+SESSION_REPORT_INTERVAL = 2.0  # 每隔幾秒（真實時間）印出主機狀態
+SESSION_PARTICLE_CAPACITY = 64  # 主機上每場遊戲的粒子池容量（粒子不會送給客戶端）
+
+# 浸泡測試設定（soak_test.py）
+SOAK_SIMULATED_HOURS = 2.0  # 預設模擬幾小時的遊戲時間
+SOAK_SAMPLE_SECONDS = 120.0  # 每隔幾秒遊戲時間取樣一次記憶體、物件數與各階段耗時
+SOAK_WARMUP_SAMPLES = 2  # 前幾次取樣視為暖身（快取與配置尚未穩定），不納入漂移分析
+SOAK_MIN_SAMPLES = 4  # 暖身之後至少要有幾次取樣才能分析漂移
+SOAK_TRACEMALLOC_DEPTH = 1  # tracemalloc 每筆配置保存的呼叫堆疊層數
+SOAK_TOP_ALLOCATORS = 10  # 每次取樣記錄、報告列出的配置來源數
+SOAK_GROWTH_THRESHOLD = 0.10  # 後段平均比前段平均多出這個比例時視為成長
+SOAK_SUPERLINEAR_RATIO = 2.0  # 後半段斜率超過前半段的這個倍數時視為超線性成長
+SOAK_MIN_PHASE_GROWTH_MS = 0.05  # 階段耗時至少要增加這麼多毫秒才算漂移
+SOAK_TREND_T = 3.0  # 迴歸斜率的 t 值超過此值才算真的在成長（而不是取樣雜訊）
+
+END_SCREEN_FPS = 30  # 結束畫面每秒最多處理幾次（等待事件時不佔用 CPU）
+END_SCREEN_OVERLAY_ALPHA = 180  # 結束畫面黑色遮罩的不透明度
 
 # SDL 視窗位置設定
 SDL_VIDEO_CENTERED = "1"
@@ -6,38 +6,177 @@
 import os
 import random
 import sys
+import time
 
 import pygame
 
 from config import *
-from game_objects import Ball, Explosion
+from game_objects import Explosion
+from level_format import load_level
+from profiler import (
+    PHASE_CHECK,
+    PHASE_EVENTS,
+    PHASE_RENDER,
+    PHASE_UPDATE,
+    FrameProfiler,
+)
+from quality import QualityGovernor
+from render_cache import TextCache
+from renderer import Renderer
+from replay import InputRecorder, InputReplay
+from sim_clock import SimulationClock
+from snapshot import SnapshotRing, load_snapshot, save_snapshot
 from utils import *
 
 
 class BrickBreakerGame:
-    """敲磚塊遊戲主要類別."""
+    """敲磚塊遊戲主要類別.
+
+    一般模式會開啟視窗並以 `FPS` 控制畫面幀率；物理則以固定的
+    `SIMULATION_HZ` 步長模擬，與畫面幀率無關。無頭（headless）模式不開視窗、
+    不讀取鍵盤滑鼠，改由自動駕駛控制底板，並用可注入的模擬時鐘讓遊戲
+    跑得比真實時間快，適合在伺服器或 CI 上做物理壓力測試。
+
+    Attributes:
+        headless (bool): 是否為無頭模式
+        time_source: 遊戲使用的時間來源（`SystemClock` 或 `SimulationClock`）
+        frame_count (int): 已模擬的幀數
+        games_played (int): 已結束的局數（無頭模式會自動重開）
+        seed (int): 遊戲亂數種子
+        rng (random.Random): 遊戲中所有亂數的來源
+        last_game (dict): 最近一局的結果（result、score、frames、
+            bricks_left、total_balls），還沒有結束的局時為 None
+        profiler (FrameProfiler): 各階段耗時的效能分析器（按 F3 開關）
+        quality (QualityGovernor): 依幀時間自動調整畫質（只在視窗模式啟用）
+        snapshots (SnapshotRing): 倒轉用的自動快照（無頭模式為 None）
+        quick_save (bytes): F5 快速存檔的快照，還沒有存檔時為 None
+    """
+
+    def __init__(
+        self,
+        headless=False,
+        time_source=None,
+        profile=False,
+        level=None,
+        seed=None,
+        record=None,
+        replay=None,
+        policy=None,
+        remote=None,
+        rewind=None,
+        particle_capacity=PARTICLE_POOL_CAPACITY,
+    ):
+        """初始化遊戲.
+
+        Args:
+            headless (bool, optional): 是否不開視窗、以最快速度模擬. Defaults to False.
+            time_source (optional): 時間來源，需有 get_ticks() 與 advance().
+                Defaults to 每個模擬步驟前進固定毫秒數的 `SimulationClock`.
+            profile (bool, optional): 是否一開始就開啟效能分析. Defaults to False.
+            level (str, optional): 關卡檔路徑. Defaults to 使用預設的格狀版面.
+            seed (int, optional): 遊戲亂數種子. Defaults to 由 random 模組產生.
+            record (str, optional): 把每一步的輸入錄製到這個檔案. Defaults to 不錄製.
+            replay (str, optional): 以無頭模式重播這個錄製檔（會使用錄製時的
+                種子，並忽略 headless 與 seed）. Defaults to 不重播.
+            policy (callable, optional): 無頭模式控制底板的策略，以遊戲物件呼叫、
+                回傳假的滑鼠位置. Defaults to 自動駕駛.
+            remote (RemoteInput, optional): 由其他行程或連線送來的玩家輸入（雙行程
+                模式的模擬行程與多場遊戲主機使用）；指定時不會自動發射，一局結束後
+                也不會自動重開.
+                Defaults to None.
+            rewind (bool, optional): 是否定期存快照供倒轉使用. Defaults to 有玩家
+                時才存（視窗模式或有遠端輸入）.
+            particle_capacity (int, optional): 爆炸粒子池的容量.
+                Defaults to PARTICLE_POOL_CAPACITY.
+        """
+        # 重播時輸入來自錄製檔，亂數種子也要和錄製時相同
+        self.replay = None if replay is None else InputReplay(replay)
+        if self.replay is not None:
+            headless = True
+            seed = self.replay.seed
+        elif seed is None:
+            seed = random.getrandbits(63)
+        # 遊戲中所有亂數（發射角度、額外命中、爆炸粒子）都來自這個產生器
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.recorder = None if record is None else InputRecorder(record, seed)
+        self._launch_requested = False
+        self._restart_pending = False
+        self.policy = policy
+        self.remote = remote
+        # 最近一局結束時的結果（還沒有結束的局時為 None）
+        self.last_game = None
+        # 定期自動存的快照（倒轉用）與快速存檔（沒有玩家的無頭模式不需要）
+        if rewind is None:
+            rewind = not headless or remote is not None
+        self.snapshots = SnapshotRing() if rewind else None
+        self.quick_save = None
+
+        self.headless = headless
+        if time_source is None:
+            time_source = SimulationClock()
+        self.time_source = time_source
+        self.frame_count = 0
+        self.games_played = 0
+        self.profiler = FrameProfiler(enabled=profile)
+
+        if headless:
+            # 沒有螢幕的機器上也能初始化 pygame
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
 
-    def __init__(self):
-        """初始化遊戲."""
         # 初始化 pygame
         pygame.init()
 
         # 在建立視窗前嘗試將視窗置中
         os.environ.setdefault("SDL_VIDEO_CENTERED", SDL_VIDEO_CENTERED)
 
-        # 建立遊戲視窗和時鐘
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption(WINDOW_TITLE)
+        # 建立遊戲視窗和時鐘；無頭模式只畫在記憶體中的畫面上，而且要等第一次
+        # 繪圖時才配置（只模擬不繪圖的場次不必每場都佔一張整個視窗大的畫面）
+        self._screen = None
+        if not headless:
+            self._screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+            pygame.display.set_caption(WINDOW_TITLE)
         self.clock = pygame.time.Clock()
 
-        # 建立字型
+        # 建立字型；分數與球數的文字圖由快取拼接，數值沒變時沿用上次的圖
         self.default_font = pygame.font.SysFont(None, FONT_SIZE)
-
-        # 初始化遊戲狀態
+        self.hud_text = TextCache(self.default_font, WHITE)
+        self._hud_values = None
+        self._hud_surfaces = None
+        self._hud_age = 0
+
+        # 遊戲結束時顯示的結束畫面（None 表示正在遊戲中）
+        self.end_screen = None
+
+        # 畫面來不及時自動降低畫質（無頭模式固定最高畫質，結果才能重現）
+        self.quality = QualityGovernor(enabled=QUALITY_ENABLED and not headless)
+
+        # 所有爆炸共用的粒子池
+        self.particles = create_particle_pool(particle_capacity)
+
+        # 以背景快取和髒矩形更新畫面的繪圖器；無頭模式和畫面一樣等到第一次
+        # 繪圖時才建立
+        self._renderer = None
+        if not headless:
+            self._renderer = Renderer(self._screen, [])
+
+        # 初始化遊戲狀態（第一局時還沒有可以重複使用的球；指定關卡時先載入
+        # 關卡的磚塊場地，之後每局都重設後沿用）
+        self.bricks = None if level is None else load_level(level)
+        self.balls = None
         self.reset_game()
 
-    def reset_game(self):
-        """重置遊戲狀態."""
+    def reset_game(self, seed=None):
+        """重置遊戲狀態.
+
+        第二局開始會沿用上一局的磚塊場地與球引擎（重設狀態後繼續使用）。
+
+        Args:
+            seed (int, optional): 這一局改用的亂數種子. Defaults to 沿用目前的亂數產生器.
+        """
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
         (
             self.bricks,
             self.paddle,
@@ -47,13 +186,64 @@ class BrickBreakerGame:
             self.last_add_time,
             self.balls_to_launch,
             self.launch_timer,
-        ) = init_game()
+        ) = init_game(self.time_source.get_ticks(), self.bricks, self.balls)
+
+        # 這一局從第幾步開始
+        self.game_start_frame = self.frame_count
+
+        # 清空爆炸粒子（粒子池本身留著重複使用）
+        self.particles.clear()
+
+        # 重新畫好磚塊背景（還沒有繪圖器時，建立時就會畫好）
+        if self._renderer is not None:
+            self._renderer.reset(self.bricks)
 
-        # 初始化爆炸效果列表
-        self.explosions = []
+    @property
+    def screen(self):
+        """pygame.Surface: 遊戲畫面；無頭模式第一次用到時才建立."""
+        if self._screen is None:
+            self._screen = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        return self._screen
+
+    @property
+    def renderer(self):
+        """Renderer: 繪圖器；無頭模式第一次用到時才建立並畫好目前的磚塊背景."""
+        if self._renderer is None:
+            self._renderer = Renderer(self.screen, self.bricks, present=False)
+        return self._renderer
+
+    @property
+    def has_renderer(self):
+        """bool: 繪圖器是否已經建立（無頭模式還沒繪圖過時為 False）."""
+        return self._renderer is not None
 
     def handle_events(self):
-        """處理遊戲事件."""
+        """處理遊戲事件.
+
+        重播時依錄製檔發射；有遠端輸入時處理其他行程送來的事件；無頭模式
+        沒有視窗事件，改成球隊列空了就自動發射。
+        """
+        if self.replay is not None:
+            frame = self.frame_count
+            if frame < len(self.replay) and self.replay.launch[frame]:
+                self._prepare_launch()
+            return
+        if self.remote is not None:
+            for event in self.remote.take_events():
+                if event == "launch" and self.balls_to_launch == 0:
+                    self._prepare_launch()
+                elif event == "rewind":
+                    self.rewind()
+                elif event == "quick_save":
+                    self.quick_save = save_snapshot(self)
+                elif event == "quick_load":
+                    self.quick_load()
+            return
+        if self.headless:
+            if self.balls_to_launch == 0:
+                self._prepare_launch()
+            return
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 sys.exit()
@@ -62,32 +252,88 @@ class BrickBreakerGame:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and self.balls_to_launch == 0:
                     self._prepare_launch()
+                # F3 開關效能分析圖表
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                # F4 切換內部繪圖比例
+                if event.key == pygame.K_F4:
+                    self.cycle_render_scale()
+                # Backspace 倒轉、F5 快速存檔、F9 快速讀檔
+                if event.key == pygame.K_BACKSPACE:
+                    self.rewind()
+                elif event.key == pygame.K_F5:
+                    self.quick_save = save_snapshot(self)
+                elif event.key == pygame.K_F9:
+                    self.quick_load()
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1 and self.balls_to_launch == 0:
                     self._prepare_launch()
 
+    def set_render_scale(self, scale):
+        """改變內部繪圖比例，下一幀起生效.
+
+        Args:
+            scale (float): 內部繪圖比例（0 到 1 之間，1 表示直接畫在視窗上）
+        """
+        self.renderer.set_scale(scale, self.bricks)
+
+    def cycle_render_scale(self):
+        """切換到 `RENDER_SCALES` 裡的下一個內部繪圖比例."""
+        scale = self.renderer.scale
+        if scale in RENDER_SCALES:
+            index = (RENDER_SCALES.index(scale) + 1) % len(RENDER_SCALES)
+        else:
+            index = 0
+        self.set_render_scale(RENDER_SCALES[index])
+
+    def rewind(self):
+        """倒轉到上一份自動快照；連續倒轉會回到更早的快照.
+
+        錄製中不能倒轉（錄製檔必須是一條連續的時間軸）。
+
+        Returns:
+            bool: 是否倒轉成功
+        """
+        if self.recorder is not None or self.snapshots is None:
+            return False
+        if self.snapshots.rewind(self) is None:
+            return False
+        self._launch_requested = False
+        self._restart_pending = False
+        return True
+
+    def quick_load(self):
+        """還原到快速存檔（F5）時的狀態；錄製中不能讀檔.
+
+        Returns:
+            bool: 是否讀檔成功
+        """
+        if self.recorder is not None or self.quick_save is None:
+            return False
+        load_snapshot(self, self.quick_save)
+        self._launch_requested = False
+        self._restart_pending = False
+        return True
+
     def _prepare_launch(self):
         """準備發射球."""
-        unlaunched_balls = [b for b in self.balls if not b.launched]
-        self.balls_to_launch = min(5, len(unlaunched_balls))
-        self.launch_timer = pygame.time.get_ticks()
+        self._launch_requested = True
+        self.balls_to_launch = min(5, self.balls.unlaunched_count())
+        self.launch_timer = self.time_source.get_ticks()
 
     def update_game_logic(self):
         """更新遊戲邏輯."""
-        current_time = pygame.time.get_ticks()
+        current_time = self.time_source.get_ticks()
 
         # 每秒增加5顆球
         if current_time - self.last_add_time >= BALLS_ADD_INTERVAL:
-            for i in range(BALLS_ADD_COUNT):
-                new_ball = Ball(
-                    BALL_RADIUS,
-                    BALL_COLOR,
-                    self.paddle.x + self.paddle.width / 2,
-                    self.paddle.y - BALL_RADIUS - 1,
-                    launched=False,
-                )
-                self.balls.append(new_ball)
+            # 新球先停在底板上，只增加待發射的數量，發射時才建立
+            self.balls.add_idle(
+                BALLS_ADD_COUNT,
+                self.paddle.x + self.paddle.width / 2,
+                self.paddle.y - BALL_RADIUS - 1,
+            )
             self.total_balls += BALLS_ADD_COUNT
             self.last_add_time = current_time
 
@@ -97,8 +343,7 @@ class BrickBreakerGame:
                 self._launch_next_ball(current_time)
 
         # 更新底板位置
-        keys = pygame.key.get_pressed()
-        mouse_pos = pygame.mouse.get_pos()
+        keys, mouse_pos = self._read_input()
         update_paddle_position(self.paddle, keys, mouse_pos)
 
         # 處理所有球的邏輯
@@ -107,139 +352,382 @@ class BrickBreakerGame:
         # 更新爆炸效果
         self._update_explosions()
 
+    def _read_input(self):
+        """讀取這一幀的底板控制輸入.
+
+        重播時把錄製的底板位置換算成滑鼠位置；有遠端輸入時使用其他行程送來
+        的輸入；無頭模式沒有鍵盤滑鼠，
+        由自動駕駛產生一個假的滑鼠位置。
+
+        Returns:
+            tuple: (按鍵狀態, 滑鼠位置)
+        """
+        paddle = self.paddle
+        if self.replay is not None:
+            frame = self.frame_count
+            if frame < len(self.replay):
+                x = int(self.replay.paddle_x[frame])
+            else:
+                x = paddle.x
+            return NO_KEYS, (x + paddle.width // 2, paddle.y)
+        if self.remote is not None:
+            return self.remote.keys, self.remote.mouse_pos
+        if self.headless:
+            if self.policy is not None:
+                return NO_KEYS, self.policy(self)
+            return NO_KEYS, autopilot_mouse_pos(paddle, self.balls)
+        # 物理一律使用視窗座標，內部繪圖比例只影響畫面，滑鼠位置不必換算
+        return pygame.key.get_pressed(), pygame.mouse.get_pos()
+
     def _launch_next_ball(self, current_time):
         """發射下一顆球.
 
         Args:
             current_time (int): 目前時間戳記
         """
-        for ball in self.balls:
-            if not ball.launched:
-                ball.launched = True
-                # 添加一些隨機性讓球不會完全重疊
-                ball.set_velocity(BALL_SPEED * 0.5 + random.uniform(-1, 1), -BALL_SPEED)
-                self.balls_to_launch -= 1
-                self.launch_timer = current_time
-                break
+        if self.balls.unlaunched_count() > 0:
+            # 添加一些隨機性讓球不會完全重疊
+            self.balls.launch_idle(
+                BALL_SPEED * 0.5 + self.rng.uniform(-1, 1), -BALL_SPEED
+            )
+            self.balls_to_launch -= 1
+            self.launch_timer = current_time
 
     def _update_balls(self):
-        """更新所有球的狀態."""
-        balls_to_remove = []
+        """更新所有球的狀態.
 
-        for i, ball in enumerate(self.balls):
-            if not ball.launched:
-                # 未發射時球跟隨底板
-                ball.move_with_paddle(self.paddle)
-            else:
-                ball.update()
-                # 檢查與視窗牆壁碰撞
-                ball.check_wall_collision(WINDOW_WIDTH, WINDOW_HEIGHT)
-                # 檢查與磚塊碰撞，現在可能一次命中多個磚塊
-                hit_bricks = ball.check_brick_collision(self.bricks)
-                if hit_bricks:
-                    for hit_brick in hit_bricks:
-                        self.score += SCORE_PER_BRICK
-                        # 創建爆炸效果在磚塊中心位置
-                        explosion_x = hit_brick.x + hit_brick.width / 2
-                        explosion_y = hit_brick.y + hit_brick.height / 2
-                        explosion = Explosion(explosion_x, explosion_y, hit_brick.color)
-                        self.explosions.append(explosion)
-                # 檢查與底板碰撞
-                ball.check_paddle_collision(self.paddle)
-
-                # 檢查球是否已離開視窗
-                if self._is_ball_out_of_bounds(ball):
-                    balls_to_remove.append(i)
+        所有球以 `BallEngine` 整批處理，順序與逐顆更新相同：
+        移動、牆壁碰撞、磚塊碰撞、底板碰撞，最後移除離開視窗的球。
+        開啟 `SWEPT_COLLISION` 時改成沿著路徑處理牆壁、磚塊與底板的連續碰撞。
+        """
+        # 記下這一步之前的位置，繪圖時用來插值
+        self.balls.save_previous()
+
+        # 未發射時球跟隨底板
+        self.balls.move_with_paddle(self.paddle)
+
+        if SWEPT_COLLISION:
+            # 連續碰撞：沿著路徑依序處理牆壁、磚塊與底板（牆壁不用再另外檢查）
+            self.balls.sweep(
+                WINDOW_WIDTH, self.bricks, self.paddle, self._on_bricks_hit, self.rng
+            )
+        else:
+            self.balls.step()
+            # 檢查與視窗牆壁碰撞
+            self.balls.check_wall_collision(WINDOW_WIDTH, WINDOW_HEIGHT)
+            # 檢查與磚塊碰撞，現在可能一次命中多個磚塊
+            self.balls.check_brick_collision(self.bricks, self._on_bricks_hit, self.rng)
+            # 檢查與底板碰撞
+            self.balls.check_paddle_collision(self.paddle)
 
         # 移除離開視窗的球
-        for i in reversed(balls_to_remove):
-            self.balls.pop(i)
+        self.balls.remove_out_of_bounds(WINDOW_WIDTH, WINDOW_HEIGHT)
 
-    def _update_explosions(self):
-        """更新爆炸效果."""
-        explosions_to_remove = []
+    def _on_bricks_hit(self, hit_bricks):
+        """處理一顆球命中的磚塊：加分並建立爆炸效果.
 
-        for i, explosion in enumerate(self.explosions):
-            explosion.update()
-            if explosion.is_finished():
-                explosions_to_remove.append(i)
+        Args:
+            hit_bricks (list): 被命中的磚塊清單
+        """
+        for hit_brick in hit_bricks:
+            self.score += SCORE_PER_BRICK
+            # 把磚塊從背景快取中擦掉（還沒繪圖過時沒有背景快取）
+            if self._renderer is not None:
+                self._renderer.invalidate_brick(hit_brick)
+            # 創建爆炸效果在磚塊中心位置
+            explosion_x = hit_brick.x + hit_brick.width / 2
+            explosion_y = hit_brick.y + hit_brick.height / 2
+            Explosion(
+                explosion_x,
+                explosion_y,
+                hit_brick.color,
+                pool=self.particles,
+                current_time=self.time_source.get_ticks(),
+                visible_count=self.quality.tier["particle_count"],
+                rng=self.rng,
+            )
 
-        # 移除已結束的爆炸效果
-        for i in reversed(explosions_to_remove):
-            self.explosions.pop(i)
+    def _update_explosions(self):
+        """更新爆炸效果（粒子池會自動回收已結束的粒子）."""
+        self.particles.update(self.time_source.get_ticks())
 
-    def _is_ball_out_of_bounds(self, ball):
-        """檢查球是否離開視窗範圍.
+    def check_game_state(self):
+        """檢查遊戲狀態（勝利或失敗）.
 
-        Args:
-            ball: 球物件
+        一般模式會顯示結束畫面讓玩家選擇；無頭模式直接記錄並重開一局。
 
         Returns:
-            bool: 球是否離開視窗範圍
+            str: 這一幀結束的局的訊息（"Game Over" 或 "You Win!"），沒有則為 None
         """
-        return (
-            ball.x + ball.radius < 0
-            or ball.x - ball.radius > WINDOW_WIDTH
-            or ball.y - ball.radius > WINDOW_HEIGHT
-            or ball.y + ball.radius < 0
-        )
-
-    def check_game_state(self):
-        """檢查遊戲狀態（勝利或失敗）."""
+        result = None
         # 檢查是否所有球都已離開且沒有未發射的球
         if len(self.balls) == 0:
-            choice = show_end_screen(self.screen, "Game Over", self.score)
-            if choice == "restart":
-                self.reset_game()
-            else:
-                sys.exit()
+            result = "Game Over"
+            self._end_game(result)
 
         # 檢查是否已經清除所有磚塊 -> 贏
-        if all(brick.hit for brick in self.bricks):
-            choice = show_end_screen(self.screen, "You Win!", self.score)
-            if choice == "restart":
-                self.reset_game()
-            else:
-                sys.exit()
+        elif self.bricks.live_count == 0:
+            result = "You Win!"
+            self._end_game(result)
+        return result
 
-    def render(self):
-        """渲染遊戲畫面."""
-        # 填充背景顏色
-        self.screen.fill(BLACK)
+    def _end_game(self, message):
+        """結束目前這一局.
 
-        # 繪製所有磚塊
-        for brick in self.bricks:
-            brick.draw(self.screen)
+        Args:
+            message (str): 結束訊息
+        """
+        self.games_played += 1
+        self.last_game = {
+            "result": message,
+            "score": self.score,
+            "frames": self.frame_count + 1 - self.game_start_frame,
+            "bricks_left": self.bricks.live_count,
+            "total_balls": self.total_balls,
+        }
+        # 無頭模式沒有人可以選擇，直接重開；和視窗模式按下重新開始一樣，
+        # 等這一步的時間推進之後才重開，重播才會和錄製時一致。有遠端輸入時
+        # 由另一個行程顯示結束畫面，等玩家選擇後才重開
+        if self.headless:
+            if self.remote is None:
+                self._restart_pending = True
+            return
+        # 切換到結束畫面，由主循環等待玩家選擇
+        self.end_screen = EndScreen(self.screen, message, self.score)
+
+    def _update_end_screen(self):
+        """結束畫面期間的一次循環：等待玩家選擇重開或離開."""
+        choice = self.end_screen.update(self.clock)
+        if choice == "restart":
+            self.end_screen = None
+            self.reset_game()
+        elif choice == "quit":
+            sys.exit()
+
+    def render(self, alpha=1.0):
+        """渲染遊戲畫面.
+
+        磚塊已經畫在繪圖器的背景快取裡，這裡只需要畫會動的物件，
+        並記下畫過的區域，最後只更新有變動的部分。場景畫在繪圖器的畫布上
+        （內部繪圖比例小於 1 時是一張較小的畫布），文字則在畫布放大到視窗
+        之後才畫上。
+
+        Args:
+            alpha (float, optional): 畫面在兩個模擬步驟之間的位置（0 到 1），
+                球和粒子會依此在上一步與目前位置之間插值. Defaults to 1.0.
+        """
+        renderer = self.renderer
+        canvas = renderer.canvas
+        scale = renderer.scale
+        # 把上一幀畫過的地方補回背景（背景已含所有存活的磚塊）
+        renderer.begin_frame()
 
         # 繪製底板
-        self.paddle.draw(self.screen)
+        renderer.mark(self.paddle.draw(canvas, scale=scale))
 
         # 繪製所有球
-        for ball in self.balls:
-            ball.draw(self.screen)
+        renderer.mark_all(self.balls.draw(canvas, alpha=alpha, scale=scale))
 
         # 繪製爆炸效果
-        for explosion in self.explosions:
-            explosion.draw(self.screen)
+        renderer.mark_all(
+            self.particles.draw(
+                canvas,
+                alpha=alpha,
+                translucent=self.quality.tier["alpha_particles"],
+                scale=scale,
+            )
+        )
+
+        # 縮小的畫布用一次縮放貼到視窗
+        renderer.finish_canvas()
 
         # 繪製分數和球數於左上角
-        score_surface = self.default_font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_surface, (10, 10))
+        renderer.mark_overlay(self._draw_hud())
 
-        ball_count_surface = self.default_font.render(
-            f"Balls: {len(self.balls)}", True, WHITE
-        )
-        self.screen.blit(ball_count_surface, (10, 40))
+        # 效能分析開啟時在分數旁邊畫出各階段耗時圖表
+        if self.profiler.enabled:
+            renderer.mark_overlay([self.profiler.draw(self.screen)])
 
-        # 更新顯示
-        pygame.display.update()
+        # 只更新有變動的區域
+        renderer.end_frame()
 
-    def run(self):
-        """運行主遊戲循環."""
-        while True:
-            self.clock.tick(FPS)  # 控制幀率
+    def _draw_hud(self):
+        """繪製左上角的分數與球數.
 
+        數值沒變時直接貼上次的圖；數值改變時由 `TextCache` 拼接快取的單字圖。
+        畫質較低時，數值改變後也要等 `hud_interval` 幀才更新。
+
+        Returns:
+            list: 畫到的 pygame.Rect 區域
+        """
+        values = (self.score, len(self.balls))
+        self._hud_age += 1
+        if self._hud_surfaces is None or (
+            values != self._hud_values
+            and self._hud_age >= self.quality.tier["hud_interval"]
+        ):
+            self._hud_surfaces = [
+                self.hud_text.render_value("Score: ", values[0]),
+                self.hud_text.render_value("Balls: ", values[1]),
+            ]
+            self._hud_values = values
+            self._hud_age = 0
+        return [
+            self.screen.blit(surface, position)
+            for surface, position in zip(self._hud_surfaces, ((10, 10), (10, 40)))
+        ]
+
+    def step(self):
+        """模擬一個固定步長：處理事件、更新邏輯、檢查勝負，最後推進時間.
+
+        錄製中時會把這一步的底板位置與發射要求寫進錄製檔；每隔
+        `SNAPSHOT_INTERVAL` 步存一份快照供倒轉使用。
+        """
+        if self.profiler.enabled:
+            call = self.profiler.call
+            call(PHASE_EVENTS, self.handle_events)
+            call(PHASE_UPDATE, self.update_game_logic)
+            call(PHASE_CHECK, self.check_game_state)
+        else:
             self.handle_events()
             self.update_game_logic()
             self.check_game_state()
-            self.render()
+        if self.recorder is not None:
+            self.recorder.record(self.paddle.x, self._launch_requested)
+        self._launch_requested = False
+        self.frame_count += 1
+        self.time_source.advance()
+        if self._restart_pending:
+            self._restart_pending = False
+            self.reset_game()
+        if self.snapshots is not None:
+            self.snapshots.update(self)
+
+    def close(self):
+        """結束遊戲前的清理：把還在緩衝區的錄製記錄寫進檔案."""
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def run(self, uncapped=False):
+        """運行主遊戲循環（固定步長模擬，畫面與物理分開）.
+
+        每個畫面先把經過的真實時間存進累積器，再以 `SIMULATION_HZ` 的固定
+        步長把累積的時間模擬掉；畫面跑得慢時一個畫面會補跑好幾步，但最多
+        `MAX_CATCHUP_STEPS` 步，超過的時間直接丟掉，避免越補越慢。
+        剩下不足一步的時間用來在兩步之間插值繪製。
+
+        每個畫面實際工作的時間（不含等待幀率）會交給 `quality` 決定畫質。
+
+        Args:
+            uncapped (bool, optional): 不限制畫面幀率、盡可能快地繪製. Defaults to False.
+        """
+        if self.headless:
+            self.run_headless()
+            return
+        step_seconds = 1 / SIMULATION_HZ
+        accumulator = 0.0
+        previous = time.perf_counter()
+        while True:
+            if self.end_screen is not None:
+                # 結束畫面期間不模擬，回到遊戲時也不補跑這段時間
+                self._update_end_screen()
+                accumulator = 0.0
+                previous = time.perf_counter()
+                continue
+
+            if not uncapped:
+                self.clock.tick(FPS)  # 控制畫面幀率
+
+            now = time.perf_counter()
+            accumulator += now - previous
+            previous = now
+
+            # 把累積的時間用固定步長模擬掉，但一次最多補 MAX_CATCHUP_STEPS 步
+            steps = 0
+            while (
+                accumulator >= step_seconds
+                and steps < MAX_CATCHUP_STEPS
+                and self.end_screen is None
+            ):
+                self.step()
+                accumulator -= step_seconds
+                steps += 1
+            if accumulator >= step_seconds:
+                # 真的追不上了：放掉積欠的時間，讓遊戲變慢而不是卡死
+                accumulator = 0.0
+
+            if self.profiler.enabled:
+                self.profiler.call(
+                    PHASE_RENDER, self.render, accumulator / step_seconds
+                )
+            else:
+                self.render(alpha=accumulator / step_seconds)
+            self._record_profile_frame()
+
+            # 依這個畫面的工作時間調整畫質
+            self.quality.update((time.perf_counter() - now) * 1000)
+
+    def _record_profile_frame(self):
+        """效能分析開啟時，把這一幀的耗時與物件數量寫進緩衝區."""
+        if self.profiler.enabled:
+            self.profiler.end_frame(
+                self.frame_count,
+                len(self.balls),
+                self.particles.emitter_count(),
+                len(self.particles),
+            )
+
+    def run_headless(self, max_frames=None, max_seconds=None, render=False):
+        """以最快速度連續模擬，並回報每秒模擬的幀數.
+
+        重播時最多模擬到錄製檔的最後一步。
+
+        Args:
+            max_frames (int, optional): 最多模擬幾幀. Defaults to 不限制.
+            max_seconds (float, optional): 最多跑幾秒真實時間. Defaults to 不限制.
+            render (bool, optional): 是否也畫到記憶體中的畫面（用來量測繪圖）.
+                Defaults to False.
+
+        Returns:
+            dict: 模擬統計，包含 frames、wall_seconds、simulated_seconds、
+                sim_fps 與 games
+        """
+        if self.replay is not None:
+            remaining = len(self.replay) - self.frame_count
+            max_frames = remaining if max_frames is None else min(max_frames, remaining)
+        start_frame = self.frame_count
+        start_ticks = self.time_source.get_ticks()
+        start = time.perf_counter()
+        last_report = start
+        # 重複模擬直到幀數或時間用完（兩者都沒給時會一直跑）
+        while True:
+            frames = self.frame_count - start_frame
+            if max_frames is not None and frames >= max_frames:
+                break
+            now = time.perf_counter()
+            if max_seconds is not None and now - start >= max_seconds:
+                break
+            # 每隔一段時間印出目前的模擬速度
+            if now - last_report >= HEADLESS_REPORT_INTERVAL:
+                print(
+                    f"模擬中: {frames / (now - start):.0f} 幀/秒, 球數 {len(self.balls)}"
+                )
+                last_report = now
+
+            self.step()
+            if render:
+                if self.profiler.enabled:
+                    self.profiler.call(PHASE_RENDER, self.render)
+                else:
+                    self.render()
+            self._record_profile_frame()
+
+        wall_seconds = time.perf_counter() - start
+        frames = self.frame_count - start_frame
+        return {
+            "frames": frames,
+            "wall_seconds": wall_seconds,
+            "simulated_seconds": (self.time_source.get_ticks() - start_ticks) / 1000,
+            "sim_fps": frames / wall_seconds if wall_seconds > 0 else 0.0,
+            "games": self.games_played,
+        }
@@ -8,6 +8,10 @@ import random
 
 import pygame
 
+from config import *
+from particles import get_default_pool
+from render_cache import scale_rect
+
 
 class Brick:
     """簡單的磚塊物件.
@@ -21,6 +25,9 @@ class Brick:
         hit (bool): 是否已被打到
     """
 
+    # 不建立每個物件的 __dict__，大量磚塊時省下不少記憶體
+    __slots__ = ("width", "height", "x", "y", "color", "hit")
+
     def __init__(self, width, height, x, y, color, hit=False):
         """初始化磚塊.
 
@@ -39,7 +46,7 @@ class Brick:
         self.color = color
         self.hit = hit
 
-    def draw(self, surface, x=None, y=None):
+    def draw(self, surface, x=None, y=None, scale=1.0):
         """在指定的 surface 上繪製磚塊.
 
         可選的 x, y 參數會暫時覆蓋磚塊本身的座標來繪製。
@@ -49,14 +56,18 @@ class Brick:
             surface: pygame surface 物件
             x (int, optional): 暫時的 x 座標
             y (int, optional): 暫時的 y 座標
+            scale (float, optional): 內部繪圖比例. Defaults to 1.0.
+
+        Returns:
+            pygame.Rect: 畫到的區域，沒有繪製時回傳 None
         """
         if self.hit:
-            return
+            return None
 
         draw_x = self.x if x is None else x
         draw_y = self.y if y is None else y
-        rect = pygame.Rect(draw_x, draw_y, self.width, self.height)
-        pygame.draw.rect(surface, self.color, rect)
+        rect = scale_rect(draw_x, draw_y, self.width, self.height, scale)
+        return pygame.draw.rect(surface, self.color, rect)
 
 
 class Ball:
@@ -72,6 +83,8 @@ class Ball:
         vy (float): y 方向速度
     """
 
+    __slots__ = ("radius", "color", "x", "y", "launched", "vx", "vy")
+
     def __init__(self, radius, color, x, y, launched=False):
         """初始化球物件.
 
@@ -90,9 +103,26 @@ class Ball:
         self.vx = 0
         self.vy = 0
 
-    def draw(self, surface):
-        """繪製球."""
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.radius)
+    def draw(self, surface, scale=1.0):
+        """繪製球.
+
+        Args:
+            surface: pygame surface 物件
+            scale (float, optional): 內部繪圖比例. Defaults to 1.0.
+
+        Returns:
+            pygame.Rect: 畫到的區域
+        """
+        if scale != 1.0:
+            return pygame.draw.circle(
+                surface,
+                self.color,
+                (int(self.x * scale), int(self.y * scale)),
+                max(1, round(self.radius * scale)),
+            )
+        return pygame.draw.circle(
+            surface, self.color, (int(self.x), int(self.y)), self.radius
+        )
 
     def set_velocity(self, vx, vy):
         """設定球的速度.
@@ -146,20 +176,32 @@ class Ball:
             collided = True
         return collided
 
-    def check_brick_collision(self, bricks):
+    def check_brick_collision(self, bricks, rng=None):
         """檢查與磚塊的碰撞.
 
         簡單的 AABB 與圓形碰撞近似：檢查球中心點是否落入磚塊區域擴張 radius 的範圍。
         現在此方法會回傳一個被命中的磚塊清單（可能為空、1 或 2 個）。有 10% 機率
         同一次命中另外一個最近的未被擊中的磚塊。
 
+        若 bricks 是 `BrickField`，只會檢查空間索引中球附近的磚塊，
+        並透過 `BrickField.mark_hit` 把打掉的磚塊移出索引。
+
         Args:
-            bricks (list): 磚塊清單
+            bricks (list or BrickField): 磚塊清單或磚塊場地
+            rng (random.Random, optional): 決定是否額外命中的亂數產生器.
+                Defaults to 模組層級的 random.
 
         Returns:
             list: 被命中的磚塊清單
         """
-        for brick in bricks:
+        # 有空間索引時只看球附近的磚塊，否則掃描全部
+        find_candidates = getattr(bricks, "candidates", None)
+        if find_candidates is None:
+            candidates = bricks
+        else:
+            candidates = find_candidates(self.x, self.y, self.radius)
+
+        for brick in candidates:
             if brick.hit:
                 continue
             # 磚塊矩形
@@ -174,48 +216,92 @@ class Ball:
             dx = self.x - nearest_x
             dy = self.y - nearest_y
             if dx * dx + dy * dy <= self.radius * self.radius:
-                hit_bricks = []
-                # 標記第一個磚塊為已被打到
-                brick.hit = True
-                hit_bricks.append(brick)
-
                 # 簡單反彈：根據接觸方向反轉 vx 或 vy
                 if abs(dx) > abs(dy):
                     self.vx = -self.vx
                 else:
                     self.vy = -self.vy
-
-                # 10% 機率同時命中另一個最近的未被擊中磚塊
-                try:
-                    chance = random.random()
-                except Exception:
-                    chance = 1.0
-
-                if chance < 0.1:
-                    # 在所有未被擊中的磚塊中找到距離目前被擊中磚塊中心最近的一個
-                    brick_center_x = brick.x + brick.width / 2
-                    brick_center_y = brick.y + brick.height / 2
-                    nearest_other = None
-                    nearest_dist_sq = None
-                    for other in bricks:
-                        if other is brick or other.hit:
-                            continue
-                        other_x = other.x + other.width / 2
-                        other_y = other.y + other.height / 2
-                        dist_sq = (other_x - brick_center_x) ** 2 + (
-                            other_y - brick_center_y
-                        ) ** 2
-                        if nearest_other is None or dist_sq < nearest_dist_sq:
-                            nearest_other = other
-                            nearest_dist_sq = dist_sq
-
-                    if nearest_other is not None:
-                        nearest_other.hit = True
-                        hit_bricks.append(nearest_other)
-
-                return hit_bricks
+                return self.hit_brick(bricks, brick, rng)
         return []
 
+    @classmethod
+    def hit_brick(cls, bricks, brick, rng=None):
+        """把碰到的磚塊標記為已被打到，並有 10% 機率同時命中最近的另一塊磚.
+
+        Args:
+            bricks (list or BrickField): 磚塊清單或磚塊場地
+            brick (Brick): 碰到的磚塊
+            rng (random.Random, optional): 決定是否額外命中的亂數產生器.
+                Defaults to 模組層級的 random.
+
+        Returns:
+            list: 被命中的磚塊清單（1 或 2 個）
+        """
+        # 標記第一個磚塊為已被打到
+        cls._mark_brick_hit(bricks, brick)
+        hit_bricks = [brick]
+
+        # 10% 機率同時命中另一個最近的未被擊中磚塊
+        try:
+            chance = (random if rng is None else rng).random()
+        except Exception:
+            chance = 1.0
+
+        if chance < 0.1:
+            nearest_other = cls._find_nearest_live_brick(bricks, brick)
+            if nearest_other is not None:
+                cls._mark_brick_hit(bricks, nearest_other)
+                hit_bricks.append(nearest_other)
+        return hit_bricks
+
+    @staticmethod
+    def _find_nearest_live_brick(bricks, brick):
+        """找出中心離指定磚塊最近的未被擊中磚塊.
+
+        若 bricks 是 `BrickField`，直接查詢預先算好的最近鄰表；
+        否則掃描整個清單。
+
+        Args:
+            bricks (list or BrickField): 磚塊清單或磚塊場地
+            brick (Brick): 基準磚塊
+
+        Returns:
+            Brick: 最近的未被擊中磚塊，沒有時回傳 None
+        """
+        nearest_live = getattr(bricks, "nearest_live", None)
+        if nearest_live is not None:
+            return nearest_live(brick)
+
+        # 在所有未被擊中的磚塊中找到距離目前被擊中磚塊中心最近的一個
+        brick_center_x = brick.x + brick.width / 2
+        brick_center_y = brick.y + brick.height / 2
+        nearest_other = None
+        nearest_dist_sq = None
+        for other in bricks:
+            if other is brick or other.hit:
+                continue
+            other_x = other.x + other.width / 2
+            other_y = other.y + other.height / 2
+            dist_sq = (other_x - brick_center_x) ** 2 + (other_y - brick_center_y) ** 2
+            if nearest_other is None or dist_sq < nearest_dist_sq:
+                nearest_other = other
+                nearest_dist_sq = dist_sq
+        return nearest_other
+
+    @staticmethod
+    def _mark_brick_hit(bricks, brick):
+        """把磚塊標記為已被打到；若有磚塊場地則一併更新其索引.
+
+        Args:
+            bricks (list or BrickField): 磚塊清單或磚塊場地
+            brick (Brick): 被打到的磚塊
+        """
+        mark_hit = getattr(bricks, "mark_hit", None)
+        if mark_hit is None:
+            brick.hit = True
+        else:
+            mark_hit(brick)
+
     def check_paddle_collision(self, paddle):
         """檢查與底板的碰撞.
 
@@ -264,113 +350,102 @@ class Ball:
 class Explosion:
     """爆炸效果類別.
 
-    當磚塊被打中時創建的粒子爆炸效果。
+    當磚塊被打中時創建的粒子爆炸效果。粒子本身不存在這個物件裡，
+    而是一次全部放進共用的 `ParticlePool`，由粒子池整批更新與繪製；
+    這個物件只記錄爆炸的位置與時間。
     """
 
-    def __init__(self, x, y, color, particle_count=15):
-        """初始化爆炸效果.
+    __slots__ = ("x", "y", "pool", "creation_time", "duration", "particle_count")
+
+    def __init__(
+        self,
+        x,
+        y,
+        color,
+        particle_count=EXPLOSION_PARTICLE_COUNT,
+        pool=None,
+        current_time=None,
+        visible_count=None,
+        rng=None,
+    ):
+        """初始化爆炸效果，並把粒子放進粒子池.
+
+        visible_count 只決定放進粒子池的粒子數；亂數仍依 particle_count 產生，
+        所以畫質調整不會改變遊戲其他部分用到的亂數順序。
 
         Args:
             x (float): 爆炸中心 x 座標
             y (float): 爆炸中心 y 座標
             color (tuple): 爆炸顏色（基於磚塊顏色）
-            particle_count (int, optional): 粒子數量. Defaults to 15.
+            particle_count (int, optional): 粒子數量. Defaults to EXPLOSION_PARTICLE_COUNT.
+            pool (ParticlePool, optional): 要放入的粒子池. Defaults to 模組共用的粒子池.
+            current_time (int, optional): 目前時間（毫秒）. Defaults to pygame 時鐘.
+            visible_count (int, optional): 實際放進粒子池的粒子數. Defaults to particle_count.
+            rng (random.Random, optional): 產生粒子用的亂數產生器.
+                Defaults to 模組層級的 random.
         """
         self.x = x
         self.y = y
-        self.particles = []
-        self.creation_time = pygame.time.get_ticks()
-        self.duration = 800  # 爆炸持續時間（毫秒）
-
-        # 創建粒子
+        self.pool = pool if pool is not None else get_default_pool()
+        if current_time is None:
+            current_time = pygame.time.get_ticks()
+        self.creation_time = current_time
+        self.duration = EXPLOSION_DURATION  # 爆炸持續時間（毫秒）
+
+        # 先算好每個粒子的隨機角度、速度、大小和顏色，再一次放進粒子池
+        if rng is None:
+            rng = random
+        vx = []
+        vy = []
+        sizes = []
+        colors = []
         for _ in range(particle_count):
             # 隨機角度和速度
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2, 8)
-
-            particle = {
-                "x": x,
-                "y": y,
-                "vx": math.cos(angle) * speed,
-                "vy": math.sin(angle) * speed,
-                "size": random.uniform(2, 6),
-                "color": self._vary_color(color),
-                "life": 1.0,  # 生命值從1.0開始，逐漸減少到0
-            }
-            self.particles.append(particle)
-
-    def _vary_color(self, base_color):
+            angle = rng.uniform(0, 2 * math.pi)
+            speed = rng.uniform(2, 8)
+            vx.append(math.cos(angle) * speed)
+            vy.append(math.sin(angle) * speed)
+            sizes.append(rng.uniform(2, 6))
+            colors.append(self._vary_color(color, rng))
+
+        shown = particle_count if visible_count is None else visible_count
+        self.particle_count = self.pool.emit(
+            x,
+            y,
+            vx[:shown],
+            vy[:shown],
+            sizes[:shown],
+            colors[:shown],
+            self.creation_time,
+            self.duration,
+        )
+
+    def _vary_color(self, base_color, rng=random):
         """基於基礎顏色創建變化顏色.
 
         Args:
             base_color (tuple): 基礎 RGB 顏色值
+            rng (random.Random, optional): 亂數產生器. Defaults to 模組層級的 random.
 
         Returns:
             tuple: 變化後的 RGB 顏色值
         """
         r, g, b = base_color
         # 添加一些隨機變化，但保持在有效範圍內
-        r = max(0, min(255, r + random.randint(-50, 50)))
-        g = max(0, min(255, g + random.randint(-50, 50)))
-        b = max(0, min(255, b + random.randint(-50, 50)))
+        r = max(0, min(255, r + rng.randint(-50, 50)))
+        g = max(0, min(255, g + rng.randint(-50, 50)))
+        b = max(0, min(255, b + rng.randint(-50, 50)))
         return (r, g, b)
 
-    def update(self):
-        """更新爆炸效果."""
-        current_time = pygame.time.get_ticks()
-        elapsed = current_time - self.creation_time
-
-        # 計算生命值比例
-        life_ratio = max(0, 1 - elapsed / self.duration)
-
-        # 更新每個粒子
-        for particle in self.particles:
-            # 更新位置
-            particle["x"] += particle["vx"]
-            particle["y"] += particle["vy"]
-
-            # 添加重力效果
-            particle["vy"] += 0.2
-
-            # 更新生命值
-            particle["life"] = life_ratio
-
-            # 添加阻力
-            particle["vx"] *= 0.98
-            particle["vy"] *= 0.98
-
-    def draw(self, surface):
-        """繪製爆炸效果.
+    def is_finished(self, current_time=None):
+        """檢查爆炸是否已結束.
 
         Args:
-            surface: pygame surface 物件
-        """
-        for particle in self.particles:
-            if particle["life"] > 0:
-                # 根據生命值調整透明度和大小
-                alpha = int(particle["life"] * 255)
-                size = int(particle["size"] * particle["life"])
-
-                if size > 0:
-                    # 創建帶透明度的surface
-                    particle_surface = pygame.Surface(
-                        (size * 2, size * 2), pygame.SRCALPHA
-                    )
-                    color_with_alpha = (*particle["color"], alpha)
-                    pygame.draw.circle(
-                        particle_surface, color_with_alpha, (size, size), size
-                    )
-
-                    # 繪製到主surface
-                    surface.blit(
-                        particle_surface, (particle["x"] - size, particle["y"] - size)
-                    )
-
-    def is_finished(self):
-        """檢查爆炸是否已結束.
+            current_time (int, optional): 目前時間（毫秒）. Defaults to pygame 時鐘.
 
         Returns:
             bool: 爆炸是否已結束
         """
-        current_time = pygame.time.get_ticks()
+        if current_time is None:
+            current_time = pygame.time.get_ticks()
         return current_time - self.creation_time >= self.duration
@@ -0,0 +1,224 @@
+"""關卡檔模組.
+
+關卡檔是緊密的二進位格式，讓設計好的大型關卡（數萬塊磚）可以在幾毫秒內
+載入：
+
+1. 檔頭：魔術字 `BBLV`、版本、旗標、磚塊數、排列形狀、格子大小與鄰居數。
+2. 磚塊記錄：每塊磚一筆固定 12 位元組的記錄（位置、大小、顏色、狀態旗標）。
+3. 碰撞索引（可省略）：均勻格子的 CSR 陣列與磚塊最近鄰表。
+
+載入時以 `numpy.memmap` 映射整個檔案，位置、大小與顏色直接是檔案內容的
+零複製檢視；有碰撞索引時也直接使用映射的陣列，格子要等第一次被查詢時才
+轉成清單，不必一開始就為每塊磚建立 Python 物件。沒有碰撞索引的檔案則在
+載入時重新建立索引。
+
+也可以從命令列把預設版面或自訂大小的格狀版面輸出成關卡檔：
+
+    python level_format.py level.bblv --rows 200 --cols 250 --width 2 --height 1
+"""
+
+import argparse
+import struct
+import time
+
+import numpy as np
+
+from brick_field import BrickField
+from config import *
+from spatial_index import PackedCells, UniformGrid
+from utils import create_bricks
+
+LEVEL_MAGIC = b"BBLV"
+LEVEL_VERSION = 1
+# 檔頭：魔術字、版本、旗標、磚塊數、rows、cols、格子寬、格子高、鄰居數
+LEVEL_HEADER = struct.Struct("<4sHHIHHddI")
+# 檔頭旗標：檔案包含碰撞索引
+HEADER_HAS_INDEX = 0x1
+# 磚塊記錄的狀態旗標：一開始就已被打掉（關卡中的空位）
+BRICK_FLAG_HIT = 0x1
+
+BRICK_RECORD = np.dtype(
+    [
+        ("x", "<i2"),
+        ("y", "<i2"),
+        ("width", "<u2"),
+        ("height", "<u2"),
+        ("color", "u1", (3,)),
+        ("flags", "u1"),
+    ]
+)
+INDEX_DTYPE = np.dtype("<u4")
+NEIGHBOR_DTYPE = np.dtype("<i4")
+
+
+def save_level(path, bricks, include_index=True):
+    """把磚塊場地寫成關卡檔.
+
+    Args:
+        path (str): 輸出檔案路徑
+        bricks (BrickField): 要保存的磚塊場地（目前的命中狀態會存成旗標）
+        include_index (bool, optional): 是否一併保存碰撞索引. Defaults to True.
+
+    Returns:
+        int: 寫入的位元組數
+    """
+    count = len(bricks)
+    records = np.zeros(count, dtype=BRICK_RECORD)
+    records["x"] = bricks.x
+    records["y"] = bricks.y
+    records["width"] = bricks.width
+    records["height"] = bricks.height
+    records["color"] = bricks.color
+    records["flags"] = np.where(bricks.hit, BRICK_FLAG_HIT, 0)
+
+    rows, cols = bricks.shape or (0, 0)
+    grid = bricks.grid
+    header = LEVEL_HEADER.pack(
+        LEVEL_MAGIC,
+        LEVEL_VERSION,
+        HEADER_HAS_INDEX if include_index else 0,
+        count,
+        rows,
+        cols,
+        grid.cell_width,
+        grid.cell_height,
+        bricks.neighbors.size,
+    )
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(records.tobytes())
+        if include_index:
+            starts, items = grid.to_csr()
+            file.write(starts.astype(INDEX_DTYPE).tobytes())
+            file.write(items.astype(INDEX_DTYPE).tobytes())
+            file.write(np.asarray(bricks.neighbors.table, NEIGHBOR_DTYPE).tobytes())
+        return file.tell()
+
+
+def load_level(path, use_index=True):
+    """以記憶體映射載入關卡檔，建立磚塊場地.
+
+    Args:
+        path (str): 關卡檔路徑
+        use_index (bool, optional): 檔案有碰撞索引時是否直接使用.
+            Defaults to True.
+
+    Returns:
+        BrickField: 磚塊場地
+
+    Raises:
+        ValueError: 檔案不是關卡檔、版本不支援或內容不完整
+    """
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(data) < LEVEL_HEADER.size:
+        raise ValueError(f"{path} 不是關卡檔：檔案太短")
+    (
+        magic,
+        version,
+        flags,
+        count,
+        rows,
+        cols,
+        cell_width,
+        cell_height,
+        neighbor_size,
+    ) = LEVEL_HEADER.unpack_from(data)
+    if magic != LEVEL_MAGIC:
+        raise ValueError(f"{path} 不是關卡檔：魔術字為 {magic!r}")
+    if version != LEVEL_VERSION:
+        raise ValueError(f"{path} 的版本 {version} 不支援")
+
+    offset = LEVEL_HEADER.size
+    records = _section(data, path, offset, BRICK_RECORD, count)
+    offset += records.nbytes
+
+    grid = neighbor_table = None
+    if flags & HEADER_HAS_INDEX and use_index:
+        left = int(records["x"].min()) if count else 0
+        top = int(records["y"].min()) if count else 0
+        right = int((records["x"] + records["width"]).max()) if count else 0
+        bottom = int((records["y"] + records["height"]).max()) if count else 0
+        grid_cols = int((right - left) // cell_width) + 1
+        grid_rows = int((bottom - top) // cell_height) + 1
+
+        starts = _section(data, path, offset, INDEX_DTYPE, grid_cols * grid_rows + 1)
+        offset += starts.nbytes
+        items = _section(data, path, offset, INDEX_DTYPE, int(starts[-1]))
+        offset += items.nbytes
+        neighbor_table = _section(
+            data, path, offset, NEIGHBOR_DTYPE, count * neighbor_size
+        ).reshape(count, neighbor_size)
+        grid = UniformGrid(
+            left,
+            top,
+            cell_width,
+            cell_height,
+            grid_cols,
+            grid_rows,
+            PackedCells(starts, items),
+        )
+        if neighbor_size != BRICK_NEIGHBOR_COUNT:
+            # 鄰居數設定改過時，舊的鄰居表不能用，只重建這一部分
+            neighbor_table = None
+
+    return BrickField(
+        records["x"],
+        records["y"],
+        records["width"],
+        records["height"],
+        records["color"],
+        hit=records["flags"] & BRICK_FLAG_HIT,
+        shape=(rows, cols) if rows and cols else None,
+        cell_width=cell_width,
+        cell_height=cell_height,
+        grid=grid,
+        neighbor_table=neighbor_table,
+    )
+
+
+def _section(data, path, offset, dtype, count):
+    """取得映射檔案中一段陣列的零複製檢視.
+
+    Args:
+        data (numpy.memmap): 整個檔案的位元組映射
+        path (str): 檔案路徑（錯誤訊息用）
+        offset (int): 起始位元組
+        dtype (numpy.dtype): 元素型別
+        count (int): 元素數量
+
+    Returns:
+        numpy.ndarray: 唯讀的陣列檢視
+
+    Raises:
+        ValueError: 檔案長度不足
+    """
+    end = offset + dtype.itemsize * count
+    if end > len(data):
+        raise ValueError(f"{path} 內容不完整：需要 {end} 位元組，只有 {len(data)}")
+    return data[offset:end].view(dtype)
+
+
+def main():
+    """命令列入口：把格狀版面輸出成關卡檔並測量載入時間."""
+    parser = argparse.ArgumentParser(description="輸出格狀版面的關卡檔")
+    parser.add_argument("path", help="輸出的關卡檔路徑")
+    parser.add_argument("--rows", type=int, default=BRICK_ROWS, help="行數")
+    parser.add_argument("--cols", type=int, default=BRICK_COLS, help="列數")
+    parser.add_argument("--width", type=int, default=BRICK_WIDTH, help="磚塊寬度")
+    parser.add_argument("--height", type=int, default=BRICK_HEIGHT, help="磚塊高度")
+    parser.add_argument("--padding", type=int, default=BRICK_PADDING, help="磚塊間隔")
+    parser.add_argument(
+        "--no-index", action="store_true", help="不保存碰撞索引，載入時再建立"
+    )
+    args = parser.parse_args()
+
+    bricks = create_bricks(args.rows, args.cols, args.width, args.height, args.padding)
+    size = save_level(args.path, bricks, include_index=not args.no_index)
+    start = time.perf_counter()
+    loaded = load_level(args.path)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"{args.path}: {len(loaded)} 塊磚，{size} 位元組，載入 {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,13 @@
 
 使用方法:
     python main.py
+    python main.py --headless --frames 10000   # 無頭模式，以最快速度模擬
+    python main.py --profile profile.json       # 開啟效能分析，結束時匯出
+    python main.py --level level.bblv           # 載入關卡檔
+    python main.py --record session.bbrp        # 錄製輸入
+    python main.py --replay session.bbrp        # 以最快速度重播錄製檔
+    python main.py --split                      # 模擬與繪圖分在兩個行程
+    python main.py --render-scale 0.5           # 以一半的解析度繪圖再放大
 
 作者: 敲磚塊遊戲開發團隊
 版本: 1.0
@@ -19,20 +26,109 @@
 # 模組導入
 # =============================================================================
 
-from game_logic import BrickBreakerGame
+import argparse
 
+from config import *
+from game_logic import BrickBreakerGame
+from split_mode import run_split
 
 # =============================================================================
 # 主程式進入點
 # =============================================================================
 
 
+def parse_args():
+    """解析命令列參數.
+
+    Returns:
+        argparse.Namespace: 解析後的參數
+    """
+    parser = argparse.ArgumentParser(description="敲磚塊遊戲")
+    parser.add_argument(
+        "--headless", action="store_true", help="不開視窗，以最快速度模擬遊戲"
+    )
+    parser.add_argument("--frames", type=int, help="無頭模式最多模擬幾幀")
+    parser.add_argument("--seconds", type=float, help="無頭模式最多跑幾秒真實時間")
+    parser.add_argument("--uncapped", action="store_true", help="視窗模式下不限制幀率")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=PROFILER_DUMP_PATH,
+        help="一開始就開啟效能分析（遊戲中按 F3 開關），結束時匯出到此 CSV/JSON 檔",
+    )
+    parser.add_argument("--level", help="載入關卡檔（由 level_format.py 產生）")
+    parser.add_argument("--seed", type=int, help="遊戲亂數種子")
+    parser.add_argument("--record", help="把每一步的輸入錄製到這個檔案")
+    parser.add_argument(
+        "--replay", help="以無頭模式、最快速度重播錄製檔（需搭配錄製時的 --level）"
+    )
+    parser.add_argument(
+        "--split",
+        action="store_true",
+        help="模擬在另一個行程執行，這個行程只負責輸入與繪圖",
+    )
+    parser.add_argument(
+        "--render-scale",
+        type=float,
+        default=RENDER_SCALE,
+        help="內部繪圖比例（例如 0.75 或 0.5），遊戲中按 F4 切換",
+    )
+    return parser.parse_args()
+
+
+def save_profile(game, path):
+    """結束時把效能分析記錄匯出（沒有任何記錄時不匯出）.
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+        path (str): 輸出檔案路徑，None 時使用 PROFILER_DUMP_PATH
+    """
+    if game.profiler.size == 0:
+        return
+    path = path or PROFILER_DUMP_PATH
+    count = game.profiler.dump(path)
+    print(f"已將 {count} 幀的效能分析記錄匯出到 {path}")
+
+
+def run_headless(args):
+    """以無頭模式模擬（或重播錄製檔）並印出模擬速度.
+
+    Args:
+        args (argparse.Namespace): 命令列參數
+    """
+    game = BrickBreakerGame(
+        headless=True,
+        profile=args.profile is not None,
+        level=args.level,
+        seed=args.seed,
+        record=args.record,
+        replay=args.replay,
+    )
+    try:
+        stats = game.run_headless(max_frames=args.frames, max_seconds=args.seconds)
+    finally:
+        game.close()
+    print(
+        f"模擬了 {stats['frames']} 幀（遊戲時間 {stats['simulated_seconds']:.1f} 秒），"
+        f"耗時 {stats['wall_seconds']:.2f} 秒，"
+        f"平均 {stats['sim_fps']:.0f} 幀/秒，共 {stats['games']} 局"
+    )
+    print(f"亂數種子 {game.seed}，最後分數 {game.score}，剩餘球數 {len(game.balls)}")
+    save_profile(game, args.profile)
+
+
 def main():
     """主函數 - 遊戲的入口點.
 
     初始化並啟動敲磚塊遊戲。
     處理遊戲的整體生命週期管理。
     """
+    args = parse_args()
+    if args.headless or args.replay:
+        run_headless(args)
+        return
+
+    game = None
     try:
         # 顯示啟動訊息
         print("=" * 50)
@@ -40,15 +136,31 @@ def main():
         print("=" * 50)
         print("正在初始化遊戲引擎...")
 
-        # 建立遊戲實例
-        game = BrickBreakerGame()
+        # 建立遊戲實例（雙行程模式由模擬行程負責亂數與錄製）
+        game = BrickBreakerGame(
+            profile=args.profile is not None,
+            level=args.level,
+            seed=args.seed,
+            record=None if args.split else args.record,
+        )
+        if args.render_scale != game.renderer.scale:
+            game.set_render_scale(args.render_scale)
 
         print("遊戲啟動成功！")
         print("使用滑鼠移動底板，點擊發射球！")
         print("-" * 50)
 
         # 開始遊戲主循環
-        game.run()
+        if args.split:
+            run_split(
+                game,
+                level=args.level,
+                seed=args.seed,
+                record=args.record,
+                uncapped=args.uncapped,
+            )
+        else:
+            game.run(uncapped=args.uncapped)
 
     except Exception as e:
         # 處理啟動錯誤
@@ -57,7 +169,10 @@ def main():
         print("安裝指令: pip install pygame")
 
     finally:
-        # 清理資源
+        # 清理資源：寫完錄製檔，有效能分析記錄時先匯出
+        if game is not None:
+            game.close()
+            save_profile(game, args.profile)
         print("\n遊戲已結束，感謝您的遊玩！")
 
 
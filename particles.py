@@ -0,0 +1,290 @@
+"""粒子系統模組.
+
+`ParticlePool` 是固定容量的全域粒子池：所有爆炸粒子的位置、速度、大小、
+顏色與生命值都放在預先配置好的 NumPy 陣列裡，每幀用一次整批運算套用
+重力、阻力與淡出，結束的粒子空出的位置會直接給新粒子重複使用。
+繪製時以快取好的半透明圓點小圖一次批次貼上。
+"""
+
+import itertools
+
+import numpy as np
+import pygame
+
+from config import *
+from render_cache import SpriteCache, make_circle_sprite
+
+# 粒子池滿了之後的處理方式
+OVERFLOW_DROP_NEW = "drop_new"  # 丟掉放不下的新粒子
+OVERFLOW_REPLACE_OLDEST = "replace_oldest"  # 讓最舊的粒子提早結束，騰出位置
+OVERFLOW_POLICIES = (OVERFLOW_DROP_NEW, OVERFLOW_REPLACE_OLDEST)
+
+
+class ParticlePool:
+    """固定容量、以陣列儲存的粒子池.
+
+    存活的粒子永遠緊密排在陣列前 count 格，並依產生順序排列；
+    結束的粒子在更新時被壓縮掉，不會另外配置記憶體。
+
+    Attributes:
+        capacity (int): 最多能同時存在的粒子數
+        overflow (str): 粒子池滿時的處理方式（見 OVERFLOW_POLICIES）
+        count (int): 目前存活的粒子數
+        dropped (int): 因粒子池已滿而被丟掉或提早結束的粒子累計數
+        sprites (SpriteCache): 依大小、顏色與透明度分級的圓點小圖快取
+    """
+
+    # 每個粒子一格的陣列（壓縮或保存狀態時都要一起處理）
+    ARRAY_NAMES = (
+        "x",
+        "y",
+        "prev_x",
+        "prev_y",
+        "vx",
+        "vy",
+        "size",
+        "color",
+        "life",
+        "birth_time",
+        "duration",
+        "emitter",
+    )
+
+    def __init__(
+        self, capacity=PARTICLE_POOL_CAPACITY, overflow=PARTICLE_OVERFLOW_POLICY
+    ):
+        """初始化粒子池並預先配置所有陣列.
+
+        Args:
+            capacity (int, optional): 粒子池容量. Defaults to PARTICLE_POOL_CAPACITY.
+            overflow (str, optional): 滿載處理方式. Defaults to PARTICLE_OVERFLOW_POLICY.
+
+        Raises:
+            ValueError: overflow 不是支援的處理方式
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown particle overflow policy: {overflow!r}")
+        self.capacity = capacity
+        self.overflow = overflow
+        self.count = 0
+        self.dropped = 0
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.prev_x = np.zeros(capacity, dtype=np.float64)
+        self.prev_y = np.zeros(capacity, dtype=np.float64)
+        self.vx = np.zeros(capacity, dtype=np.float64)
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.size = np.zeros(capacity, dtype=np.float64)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.life = np.zeros(capacity, dtype=np.float64)
+        self.birth_time = np.zeros(capacity, dtype=np.int64)
+        self.duration = np.ones(capacity, dtype=np.int64)
+        # 每次 emit 的編號，同一次爆炸的粒子編號相同（用來計算爆炸數）
+        self.emitter = np.zeros(capacity, dtype=np.int64)
+        self._next_emitter = 0
+        self.sprites = SpriteCache(SPRITE_CACHE_SIZE)
+
+    def __len__(self):
+        """回傳目前存活的粒子數."""
+        return self.count
+
+    def clear(self):
+        """移除所有粒子（陣列保留給之後重複使用）."""
+        self.count = 0
+
+    def _compact(self, keep):
+        """只保留 keep 為 True 的粒子，並把它們往前排.
+
+        Args:
+            keep (numpy.ndarray): 長度為 count 的布林陣列
+        """
+        n = self.count
+        remaining = int(np.count_nonzero(keep))
+        if remaining == n:
+            return
+        for name in self.ARRAY_NAMES:
+            array = getattr(self, name)
+            array[:remaining] = array[:n][keep]
+        self.count = remaining
+
+    def emit(self, x, y, vx, vy, size, colors, birth_time, duration):
+        """一次加入一批從同一點出發的粒子.
+
+        Args:
+            x (float): 出發點 x 座標
+            y (float): 出發點 y 座標
+            vx (list): 每個粒子的 x 方向速度
+            vy (list): 每個粒子的 y 方向速度
+            size (list): 每個粒子的大小
+            colors (list): 每個粒子的 RGB 顏色
+            birth_time (int): 產生時間（毫秒）
+            duration (int): 存活時間（毫秒）
+
+        Returns:
+            int: 實際加入的粒子數
+        """
+        amount = len(vx)
+        free = self.capacity - self.count
+        if amount > free:
+            if self.overflow == OVERFLOW_REPLACE_OLDEST:
+                # 最舊的粒子排在最前面，直接讓它們提早結束騰出位置
+                evict = min(amount - free, self.count)
+                keep = np.ones(self.count, dtype=bool)
+                keep[:evict] = False
+                self._compact(keep)
+                self.dropped += evict
+            free = self.capacity - self.count
+            if amount > free:
+                # 還是放不下的部分只好丟掉（粒子數比整個池子還多時才會發生）
+                self.dropped += amount - free
+                amount = free
+        if amount <= 0:
+            return 0
+
+        start = self.count
+        end = start + amount
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.prev_x[start:end] = x
+        self.prev_y[start:end] = y
+        self.vx[start:end] = vx[:amount]
+        self.vy[start:end] = vy[:amount]
+        self.size[start:end] = size[:amount]
+        self.color[start:end] = colors[:amount]
+        self.life[start:end] = 1.0
+        self.birth_time[start:end] = birth_time
+        self.duration[start:end] = duration
+        self.emitter[start:end] = self._next_emitter
+        self._next_emitter += 1
+        self.count = end
+        return amount
+
+    def emitter_count(self):
+        """計算還有存活粒子的爆炸數.
+
+        同一次 emit 的粒子排在一起，只要數編號改變的次數。
+
+        Returns:
+            int: 存活的爆炸數
+        """
+        n = self.count
+        if n == 0:
+            return 0
+        return int(np.count_nonzero(np.diff(self.emitter[:n]))) + 1
+
+    def update(self, current_time):
+        """整批更新所有粒子，並回收已結束的粒子.
+
+        Args:
+            current_time (int): 目前時間（毫秒）
+        """
+        n = self.count
+        if n == 0:
+            return
+        vx = self.vx[:n]
+        vy = self.vy[:n]
+        elapsed = current_time - self.birth_time[:n]
+        duration = self.duration[:n]
+
+        # 計算生命值比例
+        np.maximum(0, 1 - elapsed / duration, out=self.life[:n])
+
+        # 記下移動前的位置，繪圖時可以在兩步之間插值
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+        # 更新位置
+        self.x[:n] += vx
+        self.y[:n] += vy
+        # 添加重力效果
+        vy += PARTICLE_GRAVITY
+        # 添加阻力
+        vx *= PARTICLE_DRAG
+        vy *= PARTICLE_DRAG
+
+        # 時間到的粒子就回收，把位置讓給新的粒子
+        self._compact(elapsed < duration)
+
+    def draw(self, surface, alpha=1.0, translucent=True, scale=1.0):
+        """用一次 `Surface.blits` 批次繪製所有存活的粒子.
+
+        大小、顏色與透明度會先分級，相同等級的粒子共用同一張快取小圖，
+        不必每幀為每個粒子建立新的 Surface。
+
+        Args:
+            surface: pygame surface 物件
+            alpha (float, optional): 插值比例，0 為上一步的位置、1 為目前位置.
+                Defaults to 1.0.
+            translucent (bool, optional): 是否依生命值半透明淡出；False 時畫成
+                不透明圓點（只隨大小縮小），貼圖較快. Defaults to True.
+            scale (float, optional): 內部繪圖比例，粒子的位置與大小都依比例縮小.
+                Defaults to 1.0.
+
+        Returns:
+            list: 每個粒子畫到的 pygame.Rect 區域
+        """
+        n = self.count
+        if n == 0:
+            return []
+        # 根據生命值調整透明度和大小
+        life = self.life[:n]
+        sizes = self.size[:n] * life
+        if scale != 1.0:
+            sizes = sizes * scale
+        sizes = sizes.astype(np.int64)
+        visible = np.flatnonzero((life > 0) & (sizes > 0))
+        if len(visible) == 0:
+            return []
+        sizes = sizes[visible]
+        if translucent:
+            alphas = (life[visible] * 255).astype(np.int64)
+            alphas -= alphas % PARTICLE_ALPHA_STEP
+            alphas = alphas.tolist()
+        else:
+            alphas = itertools.repeat(None)
+        colors = self.color[visible].astype(np.int64)
+        colors -= colors % PARTICLE_COLOR_STEP
+        x = self.x[visible]
+        y = self.y[visible]
+        if alpha < 1.0:
+            # 畫面落在兩個模擬步驟之間時，畫在兩步之間的位置
+            prev_x = self.prev_x[visible]
+            prev_y = self.prev_y[visible]
+            x = prev_x + (x - prev_x) * alpha
+            y = prev_y + (y - prev_y) * alpha
+        if scale != 1.0:
+            x = x * scale
+            y = y * scale
+        left = (x - sizes).tolist()
+        top = (y - sizes).tolist()
+
+        keys = zip(
+            sizes.tolist(),
+            colors[:, 0].tolist(),
+            colors[:, 1].tolist(),
+            colors[:, 2].tolist(),
+            alphas,
+        )
+        get_sprite = self.sprites.get
+        blit_list = [
+            (get_sprite(key, make_circle_sprite), position)
+            for key, position in zip(keys, zip(left, top))
+        ]
+        return surface.blits(blit_list)
+
+
+_default_pool = None
+
+
+def get_default_pool():
+    """取得模組共用的粒子池（第一次呼叫時才建立）.
+
+    沒有指定粒子池的 `Explosion` 會把粒子放到這裡。
+
+    Returns:
+        ParticlePool: 共用的粒子池
+    """
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = ParticlePool()
+    return _default_pool
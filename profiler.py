@@ -0,0 +1,224 @@
+"""效能分析模組.
+
+`FrameProfiler` 記錄每一幀各階段（`handle_events`、`update_game_logic`、
+`check_game_state`、`render`）花費的時間，以及當時的球數、爆炸數與粒子數，
+存進固定大小的環狀緩衝區。開啟時會在分數旁邊畫出最近幾百幀的耗時圖表，
+結束時可以把緩衝區匯出成 CSV 或 JSON。
+
+關閉時遊戲只多做一次 `enabled` 判斷，不會計時也不會寫入緩衝區。
+"""
+
+import csv
+import json
+import time
+
+import numpy as np
+import pygame
+
+from config import *
+
+# 要分別計時的階段（順序即緩衝區中的欄位順序）
+PHASE_NAMES = ("handle_events", "update_game_logic", "check_game_state", "render")
+PHASE_EVENTS, PHASE_UPDATE, PHASE_CHECK, PHASE_RENDER = range(len(PHASE_NAMES))
+# 每幀記錄的物件數量
+COUNTER_NAMES = ("balls", "explosions", "particles")
+
+
+class FrameProfiler:
+    """以環狀緩衝區記錄每幀各階段耗時的效能分析器.
+
+    使用方式：用 `call` 執行並計時各階段，一幀結束時呼叫 `end_frame`
+    把這一幀的結果寫進緩衝區。
+
+    Attributes:
+        enabled (bool): 是否正在記錄
+        capacity (int): 緩衝區最多保存的幀數
+        size (int): 緩衝區目前保存的幀數
+        frames (numpy.ndarray): 每列對應的幀編號
+        times (numpy.ndarray): 每列各階段耗時（秒），形狀為 (capacity, 階段數)
+        counts (numpy.ndarray): 每列的物件數量，形狀為 (capacity, 數量種類數)
+    """
+
+    def __init__(self, capacity=PROFILER_BUFFER_SIZE, enabled=False):
+        """初始化效能分析器並預先配置緩衝區.
+
+        Args:
+            capacity (int, optional): 緩衝區幀數. Defaults to PROFILER_BUFFER_SIZE.
+            enabled (bool, optional): 是否一開始就記錄. Defaults to False.
+        """
+        self.enabled = enabled
+        self.capacity = capacity
+        self.size = 0
+        self.frames = np.zeros(capacity, dtype=np.int64)
+        self.times = np.zeros((capacity, len(PHASE_NAMES)), dtype=np.float64)
+        self.counts = np.zeros((capacity, len(COUNTER_NAMES)), dtype=np.int64)
+        self._head = 0
+        self._current = [0.0] * len(PHASE_NAMES)
+        self._font = None
+
+    def toggle(self):
+        """切換是否記錄，並回傳切換後的狀態.
+
+        Returns:
+            bool: 切換後是否正在記錄
+        """
+        self.enabled = not self.enabled
+        # 重新開啟時不要把關閉前累積到一半的時間算進來
+        self._current = [0.0] * len(PHASE_NAMES)
+        return self.enabled
+
+    def call(self, phase, function, *args):
+        """執行 function 並把耗時累加到指定階段.
+
+        一幀裡同一階段執行多次時（例如一個畫面補跑好幾個模擬步驟）會加總。
+
+        Args:
+            phase (int): 階段在 PHASE_NAMES 中的索引
+            function (callable): 要執行的函式
+            *args: 傳給 function 的參數
+
+        Returns:
+            function 的回傳值
+        """
+        start = time.perf_counter()
+        result = function(*args)
+        self._current[phase] += time.perf_counter() - start
+        return result
+
+    def end_frame(self, frame, balls, explosions, particles):
+        """把這一幀累積的耗時和物件數量寫進緩衝區.
+
+        Args:
+            frame (int): 幀編號
+            balls (int): 球數
+            explosions (int): 爆炸數
+            particles (int): 粒子數
+        """
+        head = self._head
+        self.frames[head] = frame
+        self.times[head] = self._current
+        self.counts[head] = (balls, explosions, particles)
+        self._current = [0.0] * len(PHASE_NAMES)
+        self._head = (head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def clear(self):
+        """清空緩衝區."""
+        self.size = 0
+        self._head = 0
+        self._current = [0.0] * len(PHASE_NAMES)
+
+    def rows(self, last=None):
+        """依時間先後取出緩衝區內容.
+
+        Args:
+            last (int, optional): 只取最近幾幀. Defaults to 全部.
+
+        Returns:
+            tuple: (幀編號, 各階段耗時（秒）, 物件數量) 三個陣列
+        """
+        count = self.size if last is None else min(last, self.size)
+        order = (self._head - count + np.arange(count)) % self.capacity
+        return self.frames[order], self.times[order], self.counts[order]
+
+    def records(self):
+        """把緩衝區轉成每幀一筆的字典清單（耗時以毫秒表示）.
+
+        Returns:
+            list: 每幀的記錄
+        """
+        frames, times, counts = self.rows()
+        records = []
+        for frame, phase_times, frame_counts in zip(
+            frames.tolist(), (times * 1000).tolist(), counts.tolist()
+        ):
+            record = {"frame": frame}
+            for name, value in zip(PHASE_NAMES, phase_times):
+                record[f"{name}_ms"] = round(value, 4)
+            record["total_ms"] = round(sum(phase_times), 4)
+            record.update(zip(COUNTER_NAMES, frame_counts))
+            records.append(record)
+        return records
+
+    def dump(self, path=PROFILER_DUMP_PATH):
+        """把緩衝區匯出成檔案，副檔名為 .json 時輸出 JSON，否則輸出 CSV.
+
+        Args:
+            path (str, optional): 輸出檔案路徑. Defaults to PROFILER_DUMP_PATH.
+
+        Returns:
+            int: 匯出的幀數
+        """
+        records = self.records()
+        if path.lower().endswith(".json"):
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(records, file, indent=2)
+        else:
+            fields = (
+                ["frame"]
+                + [f"{name}_ms" for name in PHASE_NAMES]
+                + ["total_ms"]
+                + list(COUNTER_NAMES)
+            )
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                writer = csv.DictWriter(file, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(records)
+        return len(records)
+
+    def draw(self, surface, position=PROFILER_GRAPH_POS):
+        """畫出最近幾幀各階段耗時的堆疊長條圖與說明文字.
+
+        每一欄像素是一幀，由下往上依序疊上各階段的耗時；橫線標出
+        `FPS` 對應的每幀時間預算。
+
+        Args:
+            surface: pygame surface 物件
+            position (tuple, optional): 圖表左上角. Defaults to PROFILER_GRAPH_POS.
+
+        Returns:
+            pygame.Rect: 畫到的區域
+        """
+        left, top = position
+        width, height = PROFILER_GRAPH_SIZE
+        graph = pygame.Rect(left, top, width, height)
+        surface.fill(BLACK, graph)
+
+        _, times, counts = self.rows(width)
+        scale = height / PROFILER_GRAPH_MAX_MS
+        # 每幀各階段的累計高度（像素），由下往上疊
+        stacked = np.minimum(np.cumsum(times * 1000 * scale, axis=1), height)
+        bottom = graph.bottom - 1
+        start = graph.right - len(stacked)
+        for column, heights in enumerate(stacked.astype(np.int64).tolist()):
+            x = start + column
+            below = 0
+            for color, above in zip(PROFILER_PHASE_COLORS, heights):
+                if above > below:
+                    pygame.draw.line(
+                        surface, color, (x, bottom - below), (x, bottom - above + 1)
+                    )
+                below = above
+
+        # 每幀時間預算的參考線
+        budget_y = bottom - int(1000 / FPS * scale)
+        if budget_y > top:
+            pygame.draw.line(
+                surface, GRAY, (left, budget_y), (graph.right - 1, budget_y)
+            )
+        pygame.draw.rect(surface, GRAY, graph, 1)
+
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, PROFILER_FONT_SIZE)
+        if len(times):
+            total_ms = times[-1].sum() * 1000
+            balls, explosions, particles = counts[-1].tolist()
+        else:
+            total_ms = 0.0
+            balls = explosions = particles = 0
+        label = self._font.render(
+            f"{total_ms:.1f} ms  balls {balls}  expl {explosions}  parts {particles}",
+            True,
+            WHITE,
+        )
+        return graph.union(surface.blit(label, (left, graph.bottom + 2)))
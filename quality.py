@@ -0,0 +1,79 @@
+"""畫質自動調整模組.
+
+`QualityGovernor` 以指數移動平均追蹤最近的幀時間，超過每幀時間預算時把
+畫質降一級（爆炸粒子變少、粒子不再半透明、分數文字較少重新產生），
+有足夠餘裕時再升回來。降級與升級使用不同門檻，調整後還要等待一段時間
+才會再次調整（遲滯），避免畫質在兩個等級之間來回跳動。
+
+畫質只影響畫面，不會改變遊戲的模擬結果。
+"""
+
+from config import *
+
+
+class QualityGovernor:
+    """依幀時間自動選擇畫質等級.
+
+    Attributes:
+        tiers (tuple): 由高到低的畫質等級設定
+        budget_ms (float): 每幀的時間預算（毫秒）
+        enabled (bool): 是否自動調整；關閉時固定使用最高等級
+        level (int): 目前的等級索引，0 為最高畫質
+        average_ms (float): 幀時間的指數移動平均（毫秒），尚無資料時為 None
+    """
+
+    def __init__(self, tiers=QUALITY_TIERS, budget_ms=1000 / FPS, enabled=True):
+        """初始化畫質調整器.
+
+        Args:
+            tiers (tuple, optional): 由高到低的畫質等級. Defaults to QUALITY_TIERS.
+            budget_ms (float, optional): 每幀時間預算（毫秒）. Defaults to 1000 / FPS.
+            enabled (bool, optional): 是否自動調整. Defaults to True.
+        """
+        self.tiers = tiers
+        self.budget_ms = budget_ms
+        self.enabled = enabled
+        self.level = 0
+        self.average_ms = None
+        # 剛開始的幾幀（載入、快取暖身）通常比較慢，先累積資料再判斷
+        self._hold = QUALITY_HOLD_FRAMES
+
+    @property
+    def tier(self):
+        """目前等級的設定（dict）."""
+        return self.tiers[self.level]
+
+    def update(self, frame_ms):
+        """加入一幀的耗時，必要時調整畫質等級.
+
+        Args:
+            frame_ms (float): 這一幀實際工作的時間（毫秒，不含等待幀率的時間）
+
+        Returns:
+            bool: 這次是否改變了等級
+        """
+        if not self.enabled:
+            return False
+        if self.average_ms is None:
+            self.average_ms = frame_ms
+        else:
+            self.average_ms += (frame_ms - self.average_ms) * QUALITY_EMA_WEIGHT
+
+        # 剛調整過時先等平均值跟上新的等級
+        if self._hold > 0:
+            self._hold -= 1
+            return False
+
+        if (
+            self.average_ms > self.budget_ms * QUALITY_DOWNGRADE_RATIO
+            and self.level < len(self.tiers) - 1
+        ):
+            self.level += 1
+        elif (
+            self.average_ms < self.budget_ms * QUALITY_UPGRADE_RATIO and self.level > 0
+        ):
+            self.level -= 1
+        else:
+            return False
+        self._hold = QUALITY_HOLD_FRAMES
+        return True
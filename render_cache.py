@@ -0,0 +1,218 @@
+"""繪圖快取模組.
+
+把重複使用的小圖（例如半透明粒子圓點、球）畫好一次後存起來，下次直接拿來貼，
+不必每幀重新建立 Surface。粒子小圖快取有數量上限，用 LRU 方式淘汰最久沒用的圖。
+`TextCache` 則快取文字圖，數字改變時只拼接已經畫好的單字圖，不必重新排版整段文字。
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+from config import *
+
+
+class SpriteCache:
+    """有數量上限的 LRU 小圖快取.
+
+    Attributes:
+        max_size (int): 最多保存的小圖數量
+        hits (int): 命中快取的次數
+        misses (int): 需要重新畫圖的次數
+    """
+
+    def __init__(self, max_size=SPRITE_CACHE_SIZE):
+        """初始化空的快取.
+
+        Args:
+            max_size (int, optional): 最多保存的小圖數量. Defaults to SPRITE_CACHE_SIZE.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._sprites = OrderedDict()
+
+    def __len__(self):
+        """回傳目前保存的小圖數量."""
+        return len(self._sprites)
+
+    def clear(self):
+        """清空快取."""
+        self._sprites.clear()
+
+    def get(self, key, factory):
+        """取得 key 對應的小圖，沒有時呼叫 factory 畫一張並存起來.
+
+        Args:
+            key (hashable): 小圖的識別鍵
+            factory (callable): 以 key 呼叫、回傳 pygame Surface 的函式
+
+        Returns:
+            pygame.Surface: 對應的小圖
+        """
+        sprites = self._sprites
+        sprite = sprites.get(key)
+        if sprite is not None:
+            # 最近用過的移到最後面，淘汰時從最前面開始
+            sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = factory(key)
+        sprites[key] = sprite
+        if len(sprites) > self.max_size:
+            sprites.popitem(last=False)
+        return sprite
+
+
+# 不透明圓點小圖的透明色（粒子顏色分級後不會出現這個顏色）
+_COLOR_KEY = (255, 0, 255)
+
+
+class TextCache:
+    """以字串為鍵的文字圖快取.
+
+    `render` 直接快取整段文字；`render_value` 用於「標籤 + 會變的數值」
+    （例如分數），標籤和每個數字字元只各畫一次，之後拼接出新的文字圖。
+
+    Attributes:
+        font (pygame.font.Font): 使用的字型
+        color (tuple): 文字顏色
+        strings (SpriteCache): 整段文字圖的 LRU 快取
+        glyphs (dict): 標籤與單一字元的文字圖（種類很少，不淘汰）
+    """
+
+    def __init__(self, font, color, max_size=TEXT_CACHE_SIZE):
+        """初始化文字快取.
+
+        Args:
+            font (pygame.font.Font): 使用的字型
+            color (tuple): 文字顏色
+            max_size (int, optional): 最多保存的整段文字圖數. Defaults to TEXT_CACHE_SIZE.
+        """
+        self.font = font
+        self.color = color
+        self.strings = SpriteCache(max_size)
+        self.glyphs = {}
+
+    def render(self, text):
+        """取得整段文字的圖.
+
+        Args:
+            text (str): 文字
+
+        Returns:
+            pygame.Surface: 文字圖
+        """
+        return self.strings.get(text, self._render_text)
+
+    def render_value(self, label, value):
+        """取得「標籤 + 數值」的文字圖，數值的每個字元重複使用快取的單字圖.
+
+        Args:
+            label (str): 固定的標籤文字，例如 "Score: "
+            value: 要顯示的數值
+
+        Returns:
+            pygame.Surface: 文字圖
+        """
+        return self.strings.get((label, str(value)), self._compose)
+
+    def _render_text(self, text):
+        """以字型畫出整段文字."""
+        return self.font.render(text, True, self.color)
+
+    def _glyph(self, text):
+        """取得標籤或單一字元的文字圖（第一次用到時才畫）."""
+        glyph = self.glyphs.get(text)
+        if glyph is None:
+            glyph = self.glyphs[text] = self._render_text(text)
+        return glyph
+
+    def _compose(self, key):
+        """把標籤與每個數值字元的單字圖拼成一張文字圖.
+
+        每個字元放在字型排版整段文字時的位置（由 `Font.size` 算出），
+        只計算寬度，不必重新畫字。
+
+        Args:
+            key (tuple): (label, 數值字串)
+
+        Returns:
+            pygame.Surface: 拼好的文字圖
+        """
+        label, digits = key
+        text = label + digits
+        surface = pygame.Surface(self.font.size(text), pygame.SRCALPHA)
+        # 各片段不會重疊，用 RGBA_MAX 直接複製像素與透明度，不和透明底色混色
+        surface.blit(self._glyph(label), (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        for i, char in enumerate(digits):
+            x = self.font.size(text[: len(label) + i])[0]
+            surface.blit(self._glyph(char), (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        return surface
+
+
+def make_circle_sprite(key):
+    """畫一顆半透明圓點小圖.
+
+    Args:
+        key (tuple): (size, r, g, b, alpha)，size 為半徑；alpha 為 None 時
+            畫成不透明、以透明色去背的小圖，貼圖比逐像素混色快
+
+    Returns:
+        pygame.Surface: 大小為 (2 * size, 2 * size) 的小圖
+    """
+    size, r, g, b, alpha = key
+    if alpha is None:
+        sprite = pygame.Surface((size * 2, size * 2))
+        sprite.fill(_COLOR_KEY)
+        sprite.set_colorkey(_COLOR_KEY, pygame.RLEACCEL)
+        pygame.draw.circle(sprite, (r, g, b), (size, size), size)
+        return sprite
+    sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (r, g, b, alpha), (size, size), size)
+    return sprite
+
+
+def make_ball_sprite(radius, color):
+    """畫一張球的小圖，供所有球共用.
+
+    已經有顯示視窗時會轉成和畫面相同的像素格式，貼圖時不必每次轉換。
+
+    Args:
+        radius (int): 球的半徑
+        color (tuple): 球的 RGB 顏色值
+
+    Returns:
+        pygame.Surface: 大小為 (2 * radius, 2 * radius) 的帶透明度小圖
+    """
+    sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, color, (radius, radius), radius)
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+    return sprite
+
+
+def scale_rect(x, y, width, height, scale):
+    """把遊戲座標的矩形換算成內部繪圖比例下的矩形.
+
+    左上角和右下角分別換算再取整數，相鄰的磚塊縮小後仍然剛好接在一起，
+    不會出現縫隙或重疊。
+
+    Args:
+        x (float): 左邊的 x 座標
+        y (float): 上邊的 y 座標
+        width (float): 寬度
+        height (float): 高度
+        scale (float): 內部繪圖比例
+
+    Returns:
+        pygame.Rect: 換算後的矩形
+    """
+    if scale == 1.0:
+        return pygame.Rect(x, y, width, height)
+    left = int(x * scale)
+    top = int(y * scale)
+    return pygame.Rect(
+        left, top, int((x + width) * scale) - left, int((y + height) * scale) - top
+    )
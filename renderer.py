@@ -0,0 +1,218 @@
+"""保留模式繪圖模組.
+
+磚塊只有被打到時才會改變，所以先把背景和所有磚塊畫在一張離屏的
+背景圖上；被打掉的磚塊只需要把那一格塗回背景色。每幀只把上一幀
+畫過動態物件（球、底板、爆炸、分數）的區域從背景圖補回來，再只更新
+有變動的矩形區域到螢幕，不必每幀重畫並送出整個畫面。
+
+內部繪圖比例小於 1 時，背景與動態物件改畫在一張較小的離屏畫布上，
+每幀再用一次 `pygame.transform.scale`（或 `smoothscale`）放大到視窗，
+分數與效能面板則在放大之後直接畫在視窗上，維持清晰的文字。
+"""
+
+import pygame
+
+from config import *
+from render_cache import scale_rect
+
+
+class Renderer:
+    """以背景快取與髒矩形（dirty rectangle）更新畫面的繪圖器.
+
+    使用方式：每幀先呼叫 `begin_frame` 擦掉上一幀的動態物件，
+    在 `canvas` 上畫完後用 `mark` / `mark_all` 記下這幀畫過的區域，
+    呼叫 `finish_canvas` 把畫布放大到視窗，再把直接畫在視窗上的
+    文字用 `mark_overlay` 記下，最後呼叫 `end_frame` 只更新變動的區域。
+
+    Attributes:
+        screen (pygame.Surface): 要繪製的目標畫面
+        present (bool): 是否把結果送到顯示視窗
+        scale (float): 內部繪圖比例
+        canvas (pygame.Surface): 遊戲場景的繪圖目標；比例為 1 時就是 screen
+        background (pygame.Surface): 背景與磚塊的離屏快取（和 canvas 一樣大）
+    """
+
+    def __init__(self, screen, bricks, present=True, scale=RENDER_SCALE):
+        """建立繪圖器並畫好磚塊背景.
+
+        Args:
+            screen (pygame.Surface): 要繪製的目標畫面
+            bricks (list or BrickField): 磚塊清單或磚塊場地
+            present (bool, optional): 是否把結果送到顯示視窗；無頭模式沒有視窗.
+                Defaults to True.
+            scale (float, optional): 內部繪圖比例. Defaults to RENDER_SCALE.
+        """
+        self.screen = screen
+        self.present = present
+        self._screen_rect = screen.get_rect()
+        self._overlay_rects = []
+        self._previous_overlay = []
+        self.set_scale(scale, bricks)
+
+    def set_scale(self, scale, bricks):
+        """改變內部繪圖比例，重新配置畫布並畫好磚塊背景.
+
+        Args:
+            scale (float): 內部繪圖比例（0 到 1 之間，1 表示直接畫在視窗上）
+            bricks (list or BrickField): 磚塊清單或磚塊場地
+
+        Raises:
+            ValueError: 比例不在 0 到 1 之間
+        """
+        if not 0 < scale <= 1:
+            raise ValueError(f"內部繪圖比例必須在 0 到 1 之間：{scale}")
+        self.scale = scale
+        if scale == 1.0:
+            self.canvas = self.screen
+        else:
+            width, height = self.screen.get_size()
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            self.canvas = pygame.Surface(size, 0, self.screen)
+        # 用和畫面相同的像素格式，貼圖時不必再轉換
+        self.background = pygame.Surface(self.canvas.get_size(), 0, self.screen)
+        self._current_rects = []
+        self.reset(bricks)
+
+    def reset(self, bricks):
+        """重新畫好整個磚塊背景，並在下一幀整個畫面重畫.
+
+        Args:
+            bricks (list or BrickField): 磚塊清單或磚塊場地
+        """
+        self.background.fill(BLACK)
+        # 磚塊場地直接由陣列畫出存活的磚塊
+        draw_bricks = getattr(bricks, "draw", None)
+        if draw_bricks is not None:
+            draw_bricks(self.background, scale=self.scale)
+        else:
+            for brick in bricks:
+                brick.draw(self.background, scale=self.scale)
+        # 下一幀整個畫面重畫，之前記下要補回的區域都不需要了；無頭模式不繪圖時
+        # 沒有 end_frame 會清掉這份清單，不清空的話每局都會越積越多
+        self._previous_rects = []
+        self.request_full_redraw()
+
+    def request_full_redraw(self):
+        """要求下一幀重畫並更新整個畫面（例如結束畫面蓋掉遊戲之後）."""
+        self._full_redraw = True
+
+    def invalidate_brick(self, brick):
+        """把被打掉的磚塊從背景中擦掉.
+
+        Args:
+            brick (Brick): 被打掉的磚塊
+        """
+        rect = scale_rect(brick.x, brick.y, brick.width, brick.height, self.scale)
+        self.background.fill(BLACK, rect)
+        # 這一格的畫面也要補回背景並送到螢幕
+        self._previous_rects.append(rect)
+
+    def restore_brick(self, brick):
+        """把恢復的磚塊畫回背景（例如倒轉之後）.
+
+        Args:
+            brick (Brick): 恢復的磚塊
+        """
+        rect = brick.draw(self.background, scale=self.scale)
+        if rect is not None:
+            self._previous_rects.append(rect)
+
+    def begin_frame(self):
+        """開始新的一幀：把上一幀畫過動態物件的區域補回背景."""
+        if self._full_redraw:
+            self.canvas.blit(self.background, (0, 0))
+            return
+        blit_list = [(self.background, rect, rect) for rect in self._previous_rects]
+        self.canvas.blits(blit_list, doreturn=False)
+
+    def mark(self, rect):
+        """記下這一幀畫過的一個矩形區域.
+
+        Args:
+            rect (pygame.Rect): 畫過的區域
+        """
+        self._current_rects.append(pygame.Rect(rect))
+
+    def mark_all(self, rects):
+        """記下這一幀畫過的一批矩形區域.
+
+        數量太多時合併成一個外框，避免矩形清單本身變成負擔。
+
+        Args:
+            rects (list): pygame.Rect 清單
+        """
+        if not rects:
+            return
+        if len(rects) > DIRTY_RECT_MERGE_LIMIT:
+            # 太多小區域時只記一個把它們全部包起來的外框
+            self._current_rects.append(rects[0].unionall(rects))
+        else:
+            self._current_rects.extend(rects)
+
+    def finish_canvas(self):
+        """把畫好的場景用一次縮放貼到視窗；比例為 1 時場景已經在視窗上."""
+        if self.canvas is self.screen:
+            return
+        size = self._screen_rect.size
+        if RENDER_SMOOTH_SCALE:
+            pygame.transform.smoothscale(self.canvas, size, self.screen)
+        else:
+            pygame.transform.scale(self.canvas, size, self.screen)
+
+    def mark_overlay(self, rects):
+        """記下這一幀在 `finish_canvas` 之後直接畫在視窗上的區域.
+
+        Args:
+            rects (list): 以視窗座標表示的 pygame.Rect 清單
+        """
+        if self.canvas is self.screen:
+            self.mark_all(rects)
+        else:
+            self._overlay_rects.extend(rects)
+
+    def _to_screen(self, rect):
+        """把畫布上的矩形換算成視窗上涵蓋它的矩形.
+
+        Args:
+            rect (pygame.Rect): 畫布座標的矩形
+
+        Returns:
+            pygame.Rect: 視窗座標的矩形
+        """
+        scale = self.scale
+        left = int(rect.left / scale)
+        top = int(rect.top / scale)
+        right = -int(-rect.right // scale)
+        bottom = -int(-rect.bottom // scale)
+        # 平滑縮放會用到鄰近像素，多更新一圈
+        margin = RENDER_SCALE_MARGIN
+        return pygame.Rect(
+            left - margin,
+            top - margin,
+            right - left + 2 * margin,
+            bottom - top + 2 * margin,
+        )
+
+    def end_frame(self):
+        """結束這一幀：只把有變動的區域更新到螢幕."""
+        if not self.present:
+            # 沒有視窗可以更新，只要整理好下一幀要擦掉的區域
+            self._full_redraw = False
+        elif self._full_redraw:
+            pygame.display.update()
+            self._full_redraw = False
+        else:
+            # 上一幀的區域要擦掉、這一幀的區域要畫上，兩者都要送出
+            dirty = self._previous_rects + self._current_rects
+            if self.canvas is not self.screen:
+                dirty = [self._to_screen(rect) for rect in dirty]
+                dirty += self._previous_overlay + self._overlay_rects
+            dirty = [rect.clip(self._screen_rect) for rect in dirty]
+            if len(dirty) > DIRTY_RECT_FULL_UPDATE_LIMIT:
+                pygame.display.update()
+            else:
+                pygame.display.update(dirty)
+        self._previous_rects = self._current_rects
+        self._current_rects = []
+        self._previous_overlay = self._overlay_rects
+        self._overlay_rects = []
@@ -0,0 +1,135 @@
+"""輸入錄製與重播模組.
+
+遊戲的亂數全部來自遊戲自己持有、以種子初始化的 `random.Random`，時間
+也由固定步長的模擬時鐘決定，所以只要記下種子和每一步的玩家輸入，就能
+完整重現一整段遊戲。
+
+錄製檔是緊密的二進位格式：
+
+1. 檔頭：魔術字 `BBRP`、版本與亂數種子。
+2. 每個模擬步驟一筆 3 位元組的記錄：這一步結束時底板的 x 座標（整數像素）
+   與事件旗標（目前只有「要求發射」）。
+
+記錄只會附加在檔尾，步數由檔案長度推算，所以遊戲中途被關掉時已經寫入
+的部分仍然可以重播。
+"""
+
+import struct
+
+import numpy as np
+
+from config import *
+
+REPLAY_MAGIC = b"BBRP"
+REPLAY_VERSION = 1
+# 檔頭：魔術字、版本、保留欄位、亂數種子
+REPLAY_HEADER = struct.Struct("<4sHHQ")
+# 事件旗標：這一步要求發射一批球
+FRAME_FLAG_LAUNCH = 0x1
+
+FRAME_RECORD = np.dtype([("paddle_x", "<i2"), ("flags", "u1")])
+
+
+class InputRecorder:
+    """把每個模擬步驟的玩家輸入寫進錄製檔.
+
+    記錄先放在固定大小的緩衝區，每 `REPLAY_FLUSH_FRAMES` 步才寫入檔案一次。
+
+    Attributes:
+        path (str): 錄製檔路徑
+        seed (int): 這段遊戲的亂數種子
+        frames (int): 已錄製的步數
+    """
+
+    def __init__(self, path, seed, flush_frames=REPLAY_FLUSH_FRAMES):
+        """建立錄製檔並寫入檔頭.
+
+        Args:
+            path (str): 錄製檔路徑（已存在時會被覆蓋）
+            seed (int): 這段遊戲的亂數種子
+            flush_frames (int, optional): 每累積幾步寫入一次. Defaults to REPLAY_FLUSH_FRAMES.
+        """
+        self.path = path
+        self.seed = seed
+        self.frames = 0
+        self._buffer = np.zeros(flush_frames, dtype=FRAME_RECORD)
+        self._pending = 0
+        self._file = open(path, "wb")
+        self._file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, 0, seed))
+
+    def record(self, paddle_x, launch):
+        """記錄一個模擬步驟的輸入.
+
+        Args:
+            paddle_x (float): 這一步結束時底板的 x 座標
+            launch (bool): 這一步是否要求發射
+        """
+        self._buffer[self._pending] = (
+            int(paddle_x),
+            FRAME_FLAG_LAUNCH if launch else 0,
+        )
+        self._pending += 1
+        self.frames += 1
+        if self._pending == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        """把緩衝區中的記錄寫入檔案."""
+        if self._file is None or self._pending == 0:
+            return
+        self._file.write(self._buffer[: self._pending].tobytes())
+        self._file.flush()
+        self._pending = 0
+
+    def close(self):
+        """寫入剩下的記錄並關閉檔案（可以重複呼叫）."""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+
+class InputReplay:
+    """讀入錄製檔，依步數提供當時的玩家輸入.
+
+    Attributes:
+        path (str): 錄製檔路徑
+        seed (int): 錄製時的亂數種子
+        paddle_x (numpy.ndarray): 每一步結束時底板的 x 座標
+        launch (numpy.ndarray): 每一步是否要求發射的布林陣列
+    """
+
+    def __init__(self, path):
+        """讀入錄製檔.
+
+        Args:
+            path (str): 錄製檔路徑
+
+        Raises:
+            ValueError: 檔案不是錄製檔或版本不支援
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < REPLAY_HEADER.size:
+            raise ValueError(f"{path} 不是錄製檔：檔案太短")
+        magic, version, _, seed = REPLAY_HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError(f"{path} 不是錄製檔：魔術字為 {magic!r}")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"{path} 的版本 {version} 不支援")
+        self.seed = seed
+
+        # 最後一筆可能只寫了一半（錄製時被強制結束），直接捨去
+        body = len(data) - REPLAY_HEADER.size
+        count = body // FRAME_RECORD.itemsize
+        frames = np.frombuffer(
+            data, dtype=FRAME_RECORD, count=count, offset=REPLAY_HEADER.size
+        )
+        self.paddle_x = frames["paddle_x"].astype(np.int64)
+        self.launch = (frames["flags"] & FRAME_FLAG_LAUNCH) != 0
+
+    def __len__(self):
+        """回傳錄製的步數."""
+        return len(self.paddle_x)
@@ -0,0 +1,663 @@
+"""多場遊戲主機模組.
+
+在一個行程裡以 asyncio 同時執行大量互不相干的無頭遊戲：每一場遊戲是一個
+協程，所有協程共用同一個 tick，每個 tick 依序各模擬一步，慢的場次不會讓
+其他場次多跑或少跑。場次可以是機器人（自動駕駛、自動發射、一局結束自動
+重開），也可以由本機 socket 上的薄客戶端控制。
+
+客戶端協定（二進位、小端序）：
+
+1. 連線後主機先送出 `HELLO`：魔術字 `BBSH`、版本、場次編號、亂數種子與磚塊數。
+2. 客戶端每次送出一筆 4 位元組的 `INPUT_RECORD`：命令、方向鍵旗標、滑鼠 x。
+3. 主機每 `SESSION_FRAME_INTERVAL` 步送出一份畫面：`FRAME_HEADER`，接著是每顆
+   球的 int16 (x, y)，磚塊命中狀態改變時再接著每塊磚一個位元的命中狀態。
+
+每場遊戲的輸入放在有上限的 `asyncio.Queue`：佇列滿時主機暫停讀取那個連線，
+由 socket 的流量控制把壓力推回客戶端；每一步最多處理
+`SESSION_INPUTS_PER_TICK` 筆輸入。送往客戶端的畫面不會等待：客戶端來不及
+收、未送出的資料超過 `SESSION_WRITE_LIMIT` 時直接略過那一份畫面，不會拖慢
+共用的 tick。
+
+使用方法:
+    python session_host.py --socket bricks.sock                 # 等待薄客戶端連線
+    python session_host.py --bots 200 --seconds 10              # 200 場機器人，量測 tick
+    python session_host.py --socket bricks.sock --client       # 以薄客戶端連上主機
+"""
+
+import argparse
+import asyncio
+import os
+import struct
+import time
+
+import numpy as np
+import pygame
+
+from config import *
+from game_logic import BrickBreakerGame
+from level_format import load_level
+from render_cache import TextCache, make_ball_sprite
+from snapshot import pack_bricks
+from split_mode import COMMAND_INPUT, COMMAND_QUIT, COMMAND_RESTART, RemoteInput
+from utils import create_bricks, create_paddle
+
+SESSION_MAGIC = b"BBSH"
+SESSION_VERSION = 1
+# 主機送出的第一筆資料：魔術字、版本、場次編號、亂數種子、磚塊數
+HELLO = struct.Struct("<4sHIQI")
+# 客戶端的輸入記錄：命令編號（CLIENT_COMMANDS 的索引）、方向鍵旗標、滑鼠 x
+INPUT_RECORD = struct.Struct("<BBh")
+CLIENT_COMMANDS = (COMMAND_INPUT, "launch", COMMAND_RESTART, COMMAND_QUIT)
+KEY_LEFT = 0x1
+KEY_RIGHT = 0x2
+# 畫面檔頭：步數、分數、球的總數、球的記錄數、底板 x、結束訊息編號、磚塊位元組數
+FRAME_HEADER = struct.Struct("<IqIIhBI")
+# 畫面檔頭結束訊息欄位的編號對應的訊息（0 表示正在遊戲中）
+RESULT_MESSAGES = (None, "Game Over", "You Win!")
+
+
+class Session:
+    """主機上的一場遊戲.
+
+    Attributes:
+        session_id (int): 場次編號
+        game (BrickBreakerGame): 無頭遊戲
+        remote (RemoteInput): 客戶端送來的輸入，機器人場次為 None
+        inputs (asyncio.Queue): 還沒有處理的輸入命令（有上限）
+        writer (asyncio.StreamWriter): 送畫面給客戶端的連線，沒有時為 None
+        waiting (bool): 一局已經結束、正在等客戶端選擇重新開始
+        closed (bool): 場次是否已經結束
+        frames_dropped (int): 因客戶端來不及接收而略過的畫面數
+    """
+
+    def __init__(
+        self,
+        session_id,
+        seed=None,
+        level=None,
+        bot=False,
+        queue_size=SESSION_INPUT_QUEUE,
+    ):
+        """建立一場遊戲.
+
+        Args:
+            session_id (int): 場次編號
+            seed (int, optional): 遊戲亂數種子. Defaults to 隨機產生.
+            level (str, optional): 關卡檔路徑. Defaults to 使用預設的格狀版面.
+            bot (bool, optional): 是否為機器人場次（自動駕駛、自動重開）.
+                Defaults to False.
+            queue_size (int, optional): 輸入佇列的上限. Defaults to SESSION_INPUT_QUEUE.
+        """
+        self.session_id = session_id
+        self.remote = None if bot else RemoteInput()
+        # 主機上的場次不支援倒轉，不必為每場配置快照緩衝區；粒子只在主機內
+        # 模擬、不會送給客戶端，粒子池也只要很小
+        self.game = BrickBreakerGame(
+            headless=True,
+            level=level,
+            seed=seed,
+            remote=self.remote,
+            rewind=False,
+            particle_capacity=SESSION_PARTICLE_CAPACITY,
+        )
+        self.inputs = asyncio.Queue(queue_size)
+        self.writer = None
+        self.waiting = False
+        self.closed = False
+        self.frames_dropped = 0
+        self._games_played = 0
+        self._brick_changes = -1
+
+    def advance(self):
+        """處理排隊的輸入並模擬一步（一局結束後等待重新開始時不模擬）.
+
+        Returns:
+            bool: 這一步是否有模擬
+        """
+        remote = self.remote
+        game = self.game
+        if remote is not None:
+            for _ in range(min(self.inputs.qsize(), SESSION_INPUTS_PER_TICK)):
+                if not remote.apply(self.inputs.get_nowait()):
+                    self.closed = True
+                    return False
+            if self.waiting:
+                if not remote.restart_requested:
+                    return False
+                self.waiting = False
+                game.reset_game()
+            remote.restart_requested = False
+
+        game.step()
+        if game.games_played != self._games_played:
+            self._games_played = game.games_played
+            # 有客戶端的場次停在最後一步，等客戶端送回重新開始；機器人已自動重開
+            self.waiting = remote is not None
+        return True
+
+    def send_frame(self):
+        """把目前的畫面送給客戶端；客戶端來不及接收時略過這一份.
+
+        Returns:
+            bool: 是否送出
+        """
+        writer = self.writer
+        if writer is None or writer.is_closing():
+            return False
+        if writer.transport.get_write_buffer_size() > SESSION_WRITE_LIMIT:
+            self.frames_dropped += 1
+            return False
+        writer.write(self.encode_frame())
+        return True
+
+    def encode_frame(self):
+        """把目前的畫面編碼成送給客戶端的資料.
+
+        磚塊命中狀態只有在上次送出之後改變過才會附上。
+
+        Returns:
+            bytes: 畫面資料
+        """
+        game = self.game
+        balls = game.balls
+        count = balls.count
+        records = count + (1 if balls.idle_count else 0)
+        positions = np.empty((records, 2), dtype="<i2")
+        positions[:count, 0] = balls.x[:count]
+        positions[:count, 1] = balls.y[:count]
+        if records > count:
+            # 未發射的球疊在同一個位置，只送一筆
+            positions[count] = (balls.idle_x, balls.idle_y)
+        bricks = b""
+        if game.bricks.changes != self._brick_changes:
+            bricks = pack_bricks(game.bricks)
+            self._brick_changes = game.bricks.changes
+        result = 0
+        if self.waiting:
+            result = RESULT_MESSAGES.index(game.last_game["result"])
+        header = FRAME_HEADER.pack(
+            game.frame_count,
+            game.score,
+            len(balls),
+            records,
+            int(game.paddle.x),
+            result,
+            len(bricks),
+        )
+        return b"".join((header, positions.tobytes(), bricks))
+
+
+class SessionHost:
+    """以共用 tick 排程大量場次的主機.
+
+    Attributes:
+        tick_seconds (float): 每個 tick 的長度（秒）
+        level (str): 所有場次使用的關卡檔，None 表示預設版面
+        sessions (dict): 場次編號到 `Session` 的對照
+        tick (int): 已經過的 tick 數
+        steps (int): 所有場次累計模擬的步數
+        overruns (int): 模擬花太久、整整落後一個 tick 以上的次數
+        busy_seconds (float): 累計花在模擬與送畫面的時間
+    """
+
+    def __init__(self, tick_hz=SIMULATION_HZ, level=None):
+        """初始化主機.
+
+        Args:
+            tick_hz (int, optional): 每秒幾個 tick. Defaults to SIMULATION_HZ.
+            level (str, optional): 所有場次使用的關卡檔. Defaults to 預設版面.
+        """
+        self.tick_seconds = 1 / tick_hz
+        self.level = level
+        self.sessions = {}
+        self.tick = 0
+        self.steps = 0
+        self.overruns = 0
+        self.busy_seconds = 0.0
+        self._next_id = 1
+        self._tick_future = None
+        self._tasks = set()
+
+    def open_session(self, seed=None, bot=False):
+        """建立一場遊戲並開始在共用 tick 上執行（需在事件迴圈中呼叫）.
+
+        Args:
+            seed (int, optional): 遊戲亂數種子. Defaults to 隨機產生.
+            bot (bool, optional): 是否為機器人場次. Defaults to False.
+
+        Returns:
+            Session: 新的場次
+        """
+        session = Session(self._next_id, seed=seed, level=self.level, bot=bot)
+        self._next_id += 1
+        self.sessions[session.session_id] = session
+        task = asyncio.get_running_loop().create_task(self._drive(session))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return session
+
+    def _next_tick(self):
+        """取得下一個 tick 開始時會完成的 future.
+
+        Returns:
+            asyncio.Future: 下一個 tick 的 future
+        """
+        if self._tick_future is None:
+            self._tick_future = asyncio.get_running_loop().create_future()
+        return self._tick_future
+
+    async def _drive(self, session):
+        """一場遊戲的協程：每個 tick 模擬一步，該送畫面時送出.
+
+        Args:
+            session (Session): 場次
+        """
+        try:
+            while not session.closed:
+                await self._next_tick()
+                start = time.perf_counter()
+                if session.advance():
+                    self.steps += 1
+                if self.tick % SESSION_FRAME_INTERVAL == 0:
+                    session.send_frame()
+                self.busy_seconds += time.perf_counter() - start
+        finally:
+            self.sessions.pop(session.session_id, None)
+            session.game.close()
+            if session.writer is not None:
+                session.writer.close()
+
+    async def run(self, seconds=None):
+        """發出共用的 tick，直到時間用完（沒有給時一直執行）.
+
+        Args:
+            seconds (float, optional): 執行幾秒. Defaults to 不限制.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        end = None if seconds is None else deadline + seconds
+        last_report = deadline
+        report_tick = self.tick
+        report_busy = self.busy_seconds
+        while end is None or loop.time() < end:
+            deadline += self.tick_seconds
+            delay = deadline - loop.time()
+            if delay < -self.tick_seconds:
+                # 場次太多、整整落後一個 tick 以上：不補跑，從現在重新計時
+                self.overruns += 1
+                deadline = loop.time()
+            await asyncio.sleep(max(delay, 0.0))
+
+            # 先換上下一個 tick 的 future，再叫醒等待這一個 tick 的所有場次
+            future = self._next_tick()
+            self._tick_future = loop.create_future()
+            self.tick += 1
+            future.set_result(self.tick)
+
+            now = loop.time()
+            if now - last_report >= SESSION_REPORT_INTERVAL:
+                ticks = self.tick - report_tick
+                busy_ms = (self.busy_seconds - report_busy) * 1000 / max(ticks, 1)
+                print(
+                    f"場次 {len(self.sessions)}，{ticks / (now - last_report):.1f} tick/秒，"
+                    f"每個 tick 模擬 {busy_ms:.2f} ms，落後 {self.overruns} 次"
+                )
+                last_report = now
+                report_tick = self.tick
+                report_busy = self.busy_seconds
+
+    async def close(self):
+        """結束所有場次並等待它們的協程結束."""
+        for session in list(self.sessions.values()):
+            session.closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def serve_client(self, reader, writer):
+        """處理一個薄客戶端連線：建立場次、讀取輸入直到連線中斷.
+
+        客戶端送來無法解碼的輸入時印出原因並中斷這個連線；不論怎麼結束，
+        都會關閉連線並等它真正關好。
+
+        Args:
+            reader (asyncio.StreamReader): 連線的讀取端
+            writer (asyncio.StreamWriter): 連線的寫入端
+        """
+        session = self.open_session()
+        session.writer = writer
+        game = session.game
+        writer.write(encode_hello(session.session_id, game.seed, len(game.bricks)))
+        try:
+            while not session.closed:
+                record = await reader.readexactly(INPUT_RECORD.size)
+                command = decode_input(record)
+                # 佇列滿時在這裡等待，不再讀取這個連線（背壓）
+                await session.inputs.put(command)
+                if command[0] == COMMAND_QUIT:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as e:
+            # 客戶端送來壞掉的資料：協定已經對不上，只能中斷這個連線
+            print(f"場次 {session.session_id} 的客戶端輸入無法解碼，中斷連線: {e}")
+        finally:
+            session.closed = True
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                # 對方已經先斷線，連線本來就關掉了
+                pass
+
+
+def encode_hello(session_id, seed, brick_count):
+    """把主機送出的第一筆資料編碼成 `HELLO`.
+
+    Args:
+        session_id (int): 場次編號
+        seed (int): 這場遊戲的亂數種子
+        brick_count (int): 磚塊數
+
+    Returns:
+        bytes: `HELLO` 資料
+    """
+    return HELLO.pack(SESSION_MAGIC, SESSION_VERSION, session_id, seed, brick_count)
+
+
+def decode_hello(data):
+    """解碼主機送出的 `HELLO`.
+
+    Args:
+        data (bytes): `HELLO` 資料
+
+    Returns:
+        tuple: (session_id, seed, brick_count)
+
+    Raises:
+        ValueError: 長度不對、對方不是遊戲主機或版本不支援
+    """
+    if len(data) != HELLO.size:
+        raise ValueError(f"HELLO 應為 {HELLO.size} 位元組，收到 {len(data)}")
+    magic, version, session_id, seed, brick_count = HELLO.unpack(data)
+    if magic != SESSION_MAGIC:
+        raise ValueError(f"不是遊戲主機：魔術字為 {magic!r}")
+    if version != SESSION_VERSION:
+        raise ValueError(f"主機協定版本 {version} 不支援")
+    return session_id, seed, brick_count
+
+
+def encode_input(command, mouse_x=0, left=False, right=False):
+    """把一個客戶端命令編碼成輸入記錄.
+
+    Args:
+        command (str): 命令名稱（CLIENT_COMMANDS 之一）
+        mouse_x (int, optional): 滑鼠 x 座標. Defaults to 0.
+        left (bool, optional): 是否按著左鍵. Defaults to False.
+        right (bool, optional): 是否按著右鍵. Defaults to False.
+
+    Returns:
+        bytes: 輸入記錄
+    """
+    flags = (KEY_LEFT if left else 0) | (KEY_RIGHT if right else 0)
+    return INPUT_RECORD.pack(CLIENT_COMMANDS.index(command), flags, mouse_x)
+
+
+def decode_input(record):
+    """把輸入記錄解碼成 `RemoteInput.apply` 使用的命令.
+
+    Args:
+        record (bytes): 輸入記錄
+
+    Returns:
+        tuple: 命令名稱與參數
+
+    Raises:
+        ValueError: 長度不對或命令編號不存在
+    """
+    if len(record) != INPUT_RECORD.size:
+        raise ValueError(f"輸入記錄應為 {INPUT_RECORD.size} 位元組，收到 {len(record)}")
+    code, flags, mouse_x = INPUT_RECORD.unpack(record)
+    if code >= len(CLIENT_COMMANDS):
+        raise ValueError(f"未知的命令編號 {code}")
+    command = CLIENT_COMMANDS[code]
+    if command == COMMAND_INPUT:
+        return (command, mouse_x, bool(flags & KEY_LEFT), bool(flags & KEY_RIGHT))
+    return (command,)
+
+
+class SessionClient:
+    """連上主機的薄客戶端連線.
+
+    Attributes:
+        session_id (int): 主機指派的場次編號
+        seed (int): 這場遊戲的亂數種子
+        brick_count (int): 磚塊數
+    """
+
+    def __init__(self, reader, writer, session_id, seed, brick_count):
+        """包裝已經完成握手的連線（請使用 `connect` 建立）.
+
+        Args:
+            reader (asyncio.StreamReader): 連線的讀取端
+            writer (asyncio.StreamWriter): 連線的寫入端
+            session_id (int): 場次編號
+            seed (int): 亂數種子
+            brick_count (int): 磚塊數
+        """
+        self.reader = reader
+        self.writer = writer
+        self.session_id = session_id
+        self.seed = seed
+        self.brick_count = brick_count
+
+    @classmethod
+    async def connect(cls, path=None, port=None):
+        """連上主機並讀取 `HELLO`.
+
+        Args:
+            path (str, optional): 主機的 Unix socket 路徑
+            port (int, optional): 主機在本機的 TCP 連接埠（沒有 path 時使用）
+
+        Returns:
+            SessionClient: 連線
+
+        Raises:
+            ValueError: 對方不是遊戲主機或版本不支援
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        hello = await reader.readexactly(HELLO.size)
+        return cls(reader, writer, *decode_hello(hello))
+
+    async def send(self, command, mouse_x=0, left=False, right=False):
+        """送出一個命令；主機的輸入佇列滿時會在這裡等待.
+
+        Args:
+            command (str): 命令名稱（CLIENT_COMMANDS 之一）
+            mouse_x (int, optional): 滑鼠 x 座標. Defaults to 0.
+            left (bool, optional): 是否按著左鍵. Defaults to False.
+            right (bool, optional): 是否按著右鍵. Defaults to False.
+        """
+        self.writer.write(encode_input(command, mouse_x, left, right))
+        await self.writer.drain()
+
+    async def read_frame(self):
+        """讀取下一份畫面.
+
+        Returns:
+            dict: frame_count、score、balls、paddle_x、result（結束訊息或 None）、
+                positions（球的 (N, 2) int16 座標）與 hit（磚塊命中狀態，
+                沒有改變時為 None）
+        """
+        header = await self.reader.readexactly(FRAME_HEADER.size)
+        (
+            frame_count,
+            score,
+            ball_total,
+            records,
+            paddle_x,
+            result,
+            brick_bytes,
+        ) = FRAME_HEADER.unpack(header)
+        data = await self.reader.readexactly(records * 4 + brick_bytes)
+        positions = np.frombuffer(data, dtype="<i2", count=records * 2)
+        hit = None
+        if brick_bytes:
+            bits = np.frombuffer(data, dtype=np.uint8, offset=records * 4)
+            hit = np.unpackbits(bits, count=self.brick_count).astype(bool)
+        return {
+            "frame_count": frame_count,
+            "score": score,
+            "balls": ball_total,
+            "paddle_x": paddle_x,
+            "result": RESULT_MESSAGES[result],
+            "positions": positions.reshape(records, 2),
+            "hit": hit,
+        }
+
+    def close(self):
+        """關閉連線."""
+        self.writer.close()
+
+
+async def run_client(path=None, port=None, level=None):
+    """以薄客戶端連上主機：送出鍵盤滑鼠輸入，畫出主機送來的畫面.
+
+    Args:
+        path (str, optional): 主機的 Unix socket 路徑
+        port (int, optional): 主機在本機的 TCP 連接埠
+        level (str, optional): 主機使用的關卡檔. Defaults to 預設版面.
+    """
+    client = await SessionClient.connect(path, port)
+    bricks = create_bricks() if level is None else load_level(level)
+    if len(bricks) != client.brick_count:
+        raise ValueError(
+            f"主機有 {client.brick_count} 塊磚，本機的版面有 {len(bricks)} 塊，"
+            "請使用相同的 --level"
+        )
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption(f"{WINDOW_TITLE} #{client.session_id}")
+    paddle = create_paddle()
+    sprite = make_ball_sprite(BALL_RADIUS, BALL_COLOR)
+    font = pygame.font.SysFont(None, FONT_SIZE)
+    text = TextCache(font, WHITE)
+    latest = {}
+
+    async def receive():
+        while True:
+            frame = await client.read_frame()
+            if frame["hit"] is not None:
+                for i in np.flatnonzero(frame["hit"] != bricks.hit).tolist():
+                    bricks.set_hit(i, bool(frame["hit"][i]))
+            latest["frame"] = frame
+
+    receiver = asyncio.get_running_loop().create_task(receive())
+    last_input = None
+    try:
+        while not receiver.done():
+            frame = latest.get("frame")
+            finished = frame is not None and frame["result"] is not None
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    await client.send(COMMAND_QUIT)
+                    return
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        await client.send("launch")
+                    elif event.key == pygame.K_r and finished:
+                        await client.send(COMMAND_RESTART)
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    await client.send(COMMAND_RESTART if finished else "launch")
+
+            # 輸入有變化時才送出
+            keys = pygame.key.get_pressed()
+            state = (
+                pygame.mouse.get_pos()[0],
+                bool(keys[pygame.K_LEFT] or keys[pygame.K_a]),
+                bool(keys[pygame.K_RIGHT] or keys[pygame.K_d]),
+            )
+            if state != last_input:
+                await client.send(COMMAND_INPUT, *state)
+                last_input = state
+
+            screen.fill(BLACK)
+            bricks.draw(screen)
+            if frame is not None:
+                paddle.x = frame["paddle_x"]
+                paddle.draw(screen)
+                corners = (frame["positions"].astype(np.int64) - BALL_RADIUS).tolist()
+                screen.blits([(sprite, corner) for corner in corners], doreturn=False)
+                screen.blit(text.render_value("Score: ", frame["score"]), (10, 10))
+                screen.blit(text.render_value("Balls: ", frame["balls"]), (10, 40))
+                if finished:
+                    message = font.render(
+                        f"{frame['result']} - R to restart", True, WHITE
+                    )
+                    screen.blit(
+                        message, message.get_rect(center=screen.get_rect().center)
+                    )
+            pygame.display.flip()
+            await asyncio.sleep(1 / FPS)
+    finally:
+        receiver.cancel()
+        client.close()
+        pygame.quit()
+
+
+async def serve(args):
+    """依命令列參數啟動主機與機器人場次.
+
+    Args:
+        args (argparse.Namespace): 命令列參數
+    """
+    host = SessionHost(level=args.level)
+    server = None
+    if args.socket:
+        server = await asyncio.start_unix_server(host.serve_client, args.socket)
+        print(f"主機在 {args.socket} 等待連線")
+    elif args.port:
+        server = await asyncio.start_server(host.serve_client, "127.0.0.1", args.port)
+        print(f"主機在 127.0.0.1:{args.port} 等待連線")
+    for i in range(args.bots):
+        host.open_session(seed=args.seed + i, bot=True)
+    try:
+        await host.run(args.seconds)
+    finally:
+        if server is not None:
+            server.close()
+            if args.socket and os.path.exists(args.socket):
+                os.unlink(args.socket)
+        await host.close()
+    seconds = host.tick * host.tick_seconds
+    print(
+        f"共 {host.tick} 個 tick、{host.steps} 步，"
+        f"平均每個 tick 模擬 {host.busy_seconds * 1000 / max(host.tick, 1):.2f} ms，"
+        f"落後 {host.overruns} 次（tick 時間 {seconds:.1f} 秒）"
+    )
+
+
+def main():
+    """命令列入口."""
+    parser = argparse.ArgumentParser(description="以 asyncio 同時執行多場無頭遊戲")
+    parser.add_argument("--socket", help="在這個 Unix socket 路徑等待薄客戶端")
+    parser.add_argument("--port", type=int, help="在本機這個 TCP 連接埠等待薄客戶端")
+    parser.add_argument("--bots", type=int, default=0, help="機器人場次數")
+    parser.add_argument("--seed", type=int, default=0, help="第一個機器人場次的種子")
+    parser.add_argument("--seconds", type=float, help="執行幾秒後結束")
+    parser.add_argument("--level", help="所有場次使用的關卡檔")
+    parser.add_argument(
+        "--client", action="store_true", help="以薄客戶端連上 --socket 或 --port 的主機"
+    )
+    args = parser.parse_args()
+    if args.client:
+        asyncio.run(run_client(path=args.socket, port=args.port, level=args.level))
+        return
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""時間來源模組.
+
+遊戲邏輯不直接呼叫 `pygame.time.get_ticks()`，而是向注入的時間來源要時間。
+預設使用 `SimulationClock`：每模擬一個固定步長就前進固定的毫秒數，因此遊戲
+時間和畫面幀率無關，無頭（headless）模擬也能跑得比真實時間快。
+`SystemClock` 則直接跟著真實時間走。
+"""
+
+import pygame
+
+from config import *
+
+
+class SystemClock:
+    """跟著真實時間走的時間來源（包裝 `pygame.time.get_ticks`）."""
+
+    def get_ticks(self):
+        """回傳從 pygame 初始化到現在經過的毫秒數.
+
+        Returns:
+            int: 目前時間（毫秒）
+        """
+        return pygame.time.get_ticks()
+
+    def advance(self, milliseconds=None):
+        """真實時間會自己前進，這裡不需要做任何事.
+
+        Args:
+            milliseconds (float, optional): 不使用，只為了和 `SimulationClock` 介面一致
+        """
+
+
+class SimulationClock:
+    """由模擬迴圈手動推進的時間來源.
+
+    Attributes:
+        time_ms (float): 目前的模擬時間（毫秒）
+        step_ms (float): 預設每次前進的毫秒數
+    """
+
+    def __init__(self, step_ms=1000 / SIMULATION_HZ, start_ms=0):
+        """初始化模擬時鐘.
+
+        Args:
+            step_ms (float, optional): 預設每次前進的毫秒數. Defaults to 1000 / SIMULATION_HZ.
+            start_ms (float, optional): 起始時間（毫秒）. Defaults to 0.
+        """
+        self.step_ms = step_ms
+        self.time_ms = start_ms
+
+    def get_ticks(self):
+        """回傳目前的模擬時間.
+
+        Returns:
+            int: 目前時間（毫秒），和 `pygame.time.get_ticks` 一樣是整數
+        """
+        return int(self.time_ms)
+
+    def advance(self, milliseconds=None):
+        """讓模擬時間往前走.
+
+        Args:
+            milliseconds (float, optional): 前進的毫秒數. Defaults to step_ms.
+        """
+        self.time_ms += self.step_ms if milliseconds is None else milliseconds
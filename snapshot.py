@@ -0,0 +1,387 @@
+"""遊戲狀態快照模組.
+
+把整個遊戲狀態（計時器與分數、亂數狀態、底板位置、所有球與粒子的陣列、
+磚塊命中狀態）存成緊密的二進位資料，之後可以原封不動地還原，讓遊戲從
+那一刻重新開始模擬。
+
+資料格式：
+
+1. 檔頭：魔術字 `BBSS`、版本與所有純量狀態（固定長度）。
+2. 亂數產生器的 625 個 32 位元狀態值。
+3. 球的每個陣列（只存前 count 格），接著是粒子的每個陣列。
+4. 磚塊命中狀態，每塊磚一個位元。
+
+`SnapshotRing` 每隔 `SNAPSHOT_INTERVAL` 步自動存一份快照到固定大小的
+環狀緩衝區，空間不夠時覆蓋最舊的快照。磚塊的命中位元另外保存：磚塊沒有
+被打掉時，新快照直接共用上一份快照的位元資料，不會重複產生。
+"""
+
+import collections
+import struct
+
+import numpy as np
+
+from config import *
+
+SNAPSHOT_MAGIC = b"BBSS"
+SNAPSHOT_VERSION = 1
+# 檔頭：魔術字、版本，接著是遊戲、球、粒子、磚塊與亂數的純量狀態
+SNAPSHOT_HEADER = struct.Struct(
+    "<4sH"
+    "qqqd"  # frame_count, games_played, game_start_frame, 模擬時間（毫秒）
+    "qqqqq"  # score, total_balls, last_add_time, balls_to_launch, launch_timer
+    "d"  # 底板 x
+    "Iqdddd"  # 球數, 未發射球數, 未發射球的 x、y 與上一步的 x、y
+    "Iqq"  # 粒子數, 下一個爆炸編號, 被丟掉的粒子數
+    "I"  # 磚塊數
+    "iBd"  # 亂數狀態版本, 是否有暫存的 gauss 值, gauss 值
+)
+RNG_STATE_DTYPE = np.dtype("<u4")
+RNG_STATE_SIZE = 625
+
+
+def pack_state(game):
+    """把磚塊以外的遊戲狀態存成二進位資料.
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+
+    Returns:
+        bytes: 檔頭、亂數狀態、球與粒子陣列
+    """
+    balls = game.balls
+    particles = game.particles
+    rng_version, rng_state, gauss = game.rng.getstate()
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        game.frame_count,
+        game.games_played,
+        game.game_start_frame,
+        getattr(game.time_source, "time_ms", 0.0),
+        game.score,
+        game.total_balls,
+        game.last_add_time,
+        game.balls_to_launch,
+        game.launch_timer,
+        game.paddle.x,
+        balls.count,
+        balls.idle_count,
+        balls.idle_x,
+        balls.idle_y,
+        *balls._idle_prev,
+        particles.count,
+        particles._next_emitter,
+        particles.dropped,
+        len(game.bricks),
+        rng_version,
+        gauss is not None,
+        0.0 if gauss is None else gauss,
+    )
+    parts = [header, np.asarray(rng_state, dtype=RNG_STATE_DTYPE).tobytes()]
+    for name in balls.ARRAY_NAMES:
+        parts.append(getattr(balls, name)[: balls.count].tobytes())
+    for name in particles.ARRAY_NAMES:
+        parts.append(getattr(particles, name)[: particles.count].tobytes())
+    return b"".join(parts)
+
+
+def pack_bricks(bricks):
+    """把磚塊命中狀態存成每塊磚一個位元的資料.
+
+    Args:
+        bricks (BrickField): 磚塊場地
+
+    Returns:
+        bytes: 命中位元
+    """
+    return np.packbits(bricks.hit).tobytes()
+
+
+def save_snapshot(game):
+    """把整個遊戲狀態存成一份快照.
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+
+    Returns:
+        bytes: 快照資料
+    """
+    return pack_state(game) + pack_bricks(game.bricks)
+
+
+def load_snapshot(game, data):
+    """把遊戲還原成 `save_snapshot` 存下的狀態.
+
+    Args:
+        game (BrickBreakerGame): 遊戲（必須使用同一個磚塊場地）
+        data (bytes): 快照資料
+
+    Raises:
+        ValueError: 資料不是快照、版本不支援、磚塊數不符或內容不完整
+    """
+    view = memoryview(data)
+    size = _restore_state(game, view, trailing=(len(game.bricks) + 7) // 8)
+    _restore_bricks(game, view[size:])
+
+
+def _restore_state(game, data, trailing=0):
+    """還原 `pack_state` 存下的部分.
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+        data (memoryview): 以 `pack_state` 的內容開頭的資料
+        trailing (int, optional): 後面還必須接著的位元組數（磚塊命中位元）.
+            Defaults to 0.
+
+    Returns:
+        int: 讀取的位元組數（後面接著磚塊命中位元）
+
+    Raises:
+        ValueError: 資料不是快照、版本不支援、磚塊數不符或內容不完整
+    """
+    if len(data) < SNAPSHOT_HEADER.size:
+        raise ValueError(f"不是遊戲快照：資料只有 {len(data)} 位元組")
+    (
+        magic,
+        version,
+        frame_count,
+        games_played,
+        game_start_frame,
+        time_ms,
+        score,
+        total_balls,
+        last_add_time,
+        balls_to_launch,
+        launch_timer,
+        paddle_x,
+        ball_count,
+        idle_count,
+        idle_x,
+        idle_y,
+        idle_prev_x,
+        idle_prev_y,
+        particle_count,
+        next_emitter,
+        dropped,
+        brick_count,
+        rng_version,
+        has_gauss,
+        gauss,
+    ) = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"不是遊戲快照：魔術字為 {bytes(magic)!r}")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"快照版本 {version} 不支援")
+    if brick_count != len(game.bricks):
+        raise ValueError(
+            f"快照有 {brick_count} 塊磚，目前的場地有 {len(game.bricks)} 塊"
+        )
+    balls = game.balls
+    particles = game.particles
+    # 先確認資料夠長再開始還原，內容不完整時遊戲狀態不會只改了一半
+    needed = SNAPSHOT_HEADER.size + RNG_STATE_SIZE * RNG_STATE_DTYPE.itemsize
+    for name in balls.ARRAY_NAMES:
+        needed += ball_count * getattr(balls, name).itemsize
+    for name in particles.ARRAY_NAMES:
+        array = getattr(particles, name)
+        needed += particle_count * array.itemsize * int(np.prod(array.shape[1:]))
+    if len(data) < needed + trailing:
+        raise ValueError(
+            f"快照內容不完整：需要 {needed + trailing} 位元組，只有 {len(data)}"
+        )
+    offset = SNAPSHOT_HEADER.size
+
+    rng_state = np.frombuffer(data, RNG_STATE_DTYPE, RNG_STATE_SIZE, offset)
+    offset += rng_state.nbytes
+    game.rng.setstate(
+        (rng_version, tuple(rng_state.tolist()), gauss if has_gauss else None)
+    )
+
+    balls._grow(ball_count)
+    for name in balls.ARRAY_NAMES:
+        array = getattr(balls, name)
+        values = np.frombuffer(data, array.dtype, ball_count, offset)
+        array[:ball_count] = values
+        offset += values.nbytes
+    balls.count = ball_count
+    balls.idle_count = idle_count
+    balls.idle_x = idle_x
+    balls.idle_y = idle_y
+    balls._idle_prev = (idle_prev_x, idle_prev_y)
+
+    for name in particles.ARRAY_NAMES:
+        array = getattr(particles, name)
+        shape = (particle_count,) + array.shape[1:]
+        values = np.frombuffer(data, array.dtype, int(np.prod(shape)), offset)
+        array[:particle_count] = values.reshape(shape)
+        offset += values.nbytes
+    particles.count = particle_count
+    particles._next_emitter = next_emitter
+    particles.dropped = dropped
+
+    game.frame_count = frame_count
+    game.games_played = games_played
+    game.game_start_frame = game_start_frame
+    if hasattr(game.time_source, "time_ms"):
+        game.time_source.time_ms = time_ms
+    game.score = score
+    game.total_balls = total_balls
+    game.last_add_time = last_add_time
+    game.balls_to_launch = balls_to_launch
+    game.launch_timer = launch_timer
+    game.paddle.x = paddle_x
+    return offset
+
+
+def _restore_bricks(game, bits):
+    """還原 `pack_bricks` 存下的磚塊命中狀態，並重畫整個畫面.
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+        bits (bytes-like): `pack_bricks` 存下的命中位元
+    """
+    count = len(game.bricks)
+    hit = np.unpackbits(np.frombuffer(bits, dtype=np.uint8), count=count)
+    apply_brick_hits(game, hit.astype(bool))
+    if game.has_renderer:
+        game.renderer.request_full_redraw()
+
+
+def apply_brick_hits(game, hit):
+    """把磚塊命中狀態改成 hit，只在背景上重畫狀態改變的磚塊.
+
+    被打掉的磚塊會從背景擦掉、恢復的磚塊會畫回背景，兩者都在下一幀
+    自動補到螢幕；無頭遊戲還沒繪圖過、沒有繪圖器時只改命中狀態。
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+        hit (numpy.ndarray): 每塊磚是否已被打掉的布林陣列
+
+    Returns:
+        bool: 是否有磚塊恢復
+    """
+    bricks = game.bricks
+    renderer = game.renderer if game.has_renderer else None
+    revived = False
+    for i in np.flatnonzero(hit != bricks.hit).tolist():
+        brick = bricks[i]
+        if hit[i]:
+            bricks.set_hit(i, True)
+            if renderer is not None:
+                renderer.invalidate_brick(brick)
+        else:
+            bricks.set_hit(i, False)
+            if renderer is not None:
+                renderer.restore_brick(brick)
+            revived = True
+    return revived
+
+
+class SnapshotRing:
+    """固定記憶體大小、定期自動存快照的環狀緩衝區.
+
+    磚塊以外的狀態依序寫進預先配置的位元組緩衝區，寫到尾端放不下時從頭
+    開始，並丟掉被覆蓋到的舊快照。磚塊命中位元在磚塊沒有改變時共用同一份。
+
+    Attributes:
+        interval (int): 每隔幾個模擬步驟存一份快照
+        capacity (int): 緩衝區大小（位元組）
+        entries (collections.deque): 由舊到新的 (步數, 位置, 長度, 磚塊位元)
+    """
+
+    def __init__(self, capacity=SNAPSHOT_RING_BYTES, interval=SNAPSHOT_INTERVAL):
+        """預先配置緩衝區.
+
+        Args:
+            capacity (int, optional): 緩衝區大小（位元組）. Defaults to SNAPSHOT_RING_BYTES.
+            interval (int, optional): 存快照的間隔步數. Defaults to SNAPSHOT_INTERVAL.
+        """
+        self.interval = interval
+        self.capacity = capacity
+        self.entries = collections.deque()
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._write = 0
+        self._bits = None
+        self._bits_key = None
+
+    def __len__(self):
+        """回傳目前保存的快照數."""
+        return len(self.entries)
+
+    def update(self, game):
+        """到了存快照的步數時存一份快照.
+
+        Args:
+            game (BrickBreakerGame): 遊戲
+        """
+        if game.frame_count % self.interval == 0:
+            self.push(game)
+
+    def push(self, game):
+        """存一份快照，空間不夠時覆蓋最舊的快照.
+
+        Args:
+            game (BrickBreakerGame): 遊戲
+
+        Returns:
+            bool: 是否存成功（單一快照比整個緩衝區還大時會放棄）
+        """
+        state = pack_state(game)
+        size = len(state)
+        if size > self.capacity:
+            return False
+        start = self._write
+        if start + size > self.capacity:
+            start = 0
+        end = start + size
+        # 丟掉和這次寫入範圍重疊的舊快照
+        if any(
+            offset < end and start < offset + length
+            for _, offset, length, _ in self.entries
+        ):
+            self.entries = collections.deque(
+                entry
+                for entry in self.entries
+                if not (entry[1] < end and start < entry[1] + entry[2])
+            )
+        self._view[start:end] = state
+        self._write = end
+
+        # 磚塊沒有改變時沿用上一份位元資料
+        bricks = game.bricks
+        key = (id(bricks), bricks.changes)
+        if key != self._bits_key:
+            self._bits = pack_bricks(bricks)
+            self._bits_key = key
+        self.entries.append((game.frame_count, start, size, self._bits))
+        return True
+
+    def rewind(self, game):
+        """倒轉到目前這一步之前最近的快照.
+
+        還原的快照與比它新的快照都會被移除，所以連續倒轉會一次比一次更早。
+
+        Args:
+            game (BrickBreakerGame): 遊戲
+
+        Returns:
+            int: 還原到的步數，沒有更早的快照時回傳 None
+        """
+        while self.entries and self.entries[-1][0] >= game.frame_count:
+            self.entries.pop()
+        if not self.entries:
+            self._write = 0
+            return None
+        frame, offset, length, bits = self.entries.pop()
+        _restore_state(game, self._view[offset : offset + length])
+        _restore_bricks(game, bits)
+        # 被移除的快照所佔的空間可以直接重複使用
+        self._write = offset
+        return frame
+
+    def clear(self):
+        """丟掉所有快照."""
+        self.entries.clear()
+        self._write = 0
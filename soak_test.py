@@ -0,0 +1,533 @@
+"""長時間浸泡測試模組.
+
+球會隨著 `BALLS_ADD_INTERVAL` 不斷增加，玩久了記憶體與每幀耗時可能一路往上漂，
+這類問題很難在短時間的效能測試裡看出來。這個模組以無頭模式、最快速度連續
+模擬數小時的遊戲時間：底板由腳本策略控制，一局結束就經由 `reset_game` 自動
+重開。每隔 `SOAK_SAMPLE_SECONDS` 秒遊戲時間取樣一次：
+
+- 行程的常駐記憶體（RSS）
+- tracemalloc 追蹤到的記憶體與配置最多的程式位置
+- 垃圾回收器看得到的存活物件數（依型別統計）
+- 各階段（`handle_events`、`update_game_logic`、`check_game_state`、`render`）
+  在這段期間的平均與 95 百分位耗時
+
+最後對每個數值以遊戲時間做線性迴歸，比較前後段的平均與前後半段的斜率，
+標出持續成長（疑似洩漏）、耗時漂移與超線性成長的項目。有標出問題時以
+結束碼 1 結束，取樣數不足、無法判斷時以結束碼 2 結束，方便放進排程定期執行。
+
+使用方法:
+    python soak_test.py                              # 模擬 SOAK_SIMULATED_HOURS 小時
+    python soak_test.py --hours 6 --render --json soak.json
+    python soak_test.py --hours 0.5 --policy autopilot --no-tracemalloc
+"""
+
+import argparse
+import collections
+import gc
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from config import *
+from batch_runner import POLICIES
+from game_logic import BrickBreakerGame
+from profiler import PHASE_NAMES, PHASE_RENDER, PHASE_UPDATE, FrameProfiler
+
+# 記憶體類的數值：後段仍在成長時視為洩漏
+MEMORY_METRICS = ("rss_bytes", "traced_bytes", "gc_objects")
+# 每次取樣時 tracemalloc 要忽略的配置來源（量測工具本身、保存取樣結果與匯入機制）
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+# 判定結果與報告中顯示的文字；除了 ok 與 plateau 以外都算有問題
+VERDICT_LABELS = {
+    "ok": "正常",
+    "plateau": "成長後趨平",
+    "leak": "疑似洩漏",
+    "drift": "耗時漂移",
+    "superlinear": "超線性成長",
+}
+FLAGGED_VERDICTS = ("leak", "drift", "superlinear")
+
+
+def read_rss():
+    """回傳目前行程的常駐記憶體（RSS）.
+
+    Linux 直接讀 `/proc/self/statm`；其他平台退回 `resource` 模組的峰值
+    （只會上升，僅供參考）；兩者都沒有時回傳 0。
+
+    Returns:
+        int: 常駐記憶體（位元組）
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以位元組回報，其他平台以 KB 回報
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def count_objects():
+    """先執行一次完整的垃圾回收，再依型別名稱統計存活的物件.
+
+    Returns:
+        collections.Counter: 型別名稱 -> 物件數
+    """
+    gc.collect()
+    return collections.Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+def trace_snapshot():
+    """取一份排除量測工具本身的 tracemalloc 快照.
+
+    Returns:
+        tracemalloc.Snapshot: 快照，沒有在追蹤時回傳 None
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    return tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+
+
+def _location(traceback):
+    """把配置的呼叫堆疊轉成 `檔名:行號` 字串（只取最內層）."""
+    frame = traceback[0]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+
+def take_sample(game, profiler, start, objects, snapshot):
+    """整理一次取樣的所有數值.
+
+    Args:
+        game (BrickBreakerGame): 遊戲
+        profiler (FrameProfiler): 記錄這段期間每一步耗時的效能分析器
+        start (float): 開始模擬時的 `time.perf_counter()`
+        objects (collections.Counter): `count_objects` 的結果
+        snapshot (tracemalloc.Snapshot): tracemalloc 快照，沒有追蹤時為 None
+
+    Returns:
+        dict: 這次取樣的數值（耗時以毫秒表示）
+    """
+    _, times, counts = profiler.rows()
+    times = times * 1000
+    sample = {
+        "sim_hours": game.time_source.get_ticks() / 3_600_000,
+        "wall_seconds": time.perf_counter() - start,
+        "frame": game.frame_count,
+        "games": game.games_played,
+        "balls": len(game.balls),
+        "particles": len(game.particles),
+        "rss_bytes": read_rss(),
+        "traced_bytes": tracemalloc.get_traced_memory()[0] if snapshot else 0,
+        "gc_objects": sum(objects.values()),
+    }
+    for phase, name in enumerate(PHASE_NAMES):
+        sample[f"{name}_ms"] = float(times[:, phase].mean()) if len(times) else 0.0
+        sample[f"{name}_p95_ms"] = (
+            float(np.percentile(times[:, phase], 95)) if len(times) else 0.0
+        )
+    # 球越多更新越慢，換算成每顆球的耗時才看得出和球數無關的漂移
+    ball_frames = int(counts[:, 0].sum())
+    sample["update_us_per_ball"] = (
+        float(times[:, PHASE_UPDATE].sum()) * 1000 / ball_frames if ball_frames else 0.0
+    )
+    if snapshot is not None:
+        sample["top_allocators"] = [
+            [_location(stat.traceback), stat.size]
+            for stat in snapshot.statistics("traceback")[:SOAK_TOP_ALLOCATORS]
+        ]
+    return sample
+
+
+def _frame_counts(hours, sample_seconds):
+    """回傳每次取樣間隔的步數與總步數."""
+    sample_frames = max(1, round(sample_seconds * SIMULATION_HZ))
+    total_frames = round(hours * 3600 * SIMULATION_HZ)
+    return sample_frames, total_frames
+
+
+def planned_samples(hours, sample_seconds):
+    """回傳一次完整的浸泡測試會取樣幾次.
+
+    Args:
+        hours (float): 模擬幾小時的遊戲時間
+        sample_seconds (float): 每隔幾秒遊戲時間取樣一次
+
+    Returns:
+        int: 取樣次數（最後不足一個間隔的部分也會取樣一次）
+    """
+    sample_frames, total_frames = _frame_counts(hours, sample_seconds)
+    return -(-total_frames // sample_frames)
+
+
+def run_soak(
+    hours=SOAK_SIMULATED_HOURS,
+    sample_seconds=SOAK_SAMPLE_SECONDS,
+    seed=0,
+    policy="sweep",
+    level=None,
+    render=False,
+    trace=True,
+    max_seconds=None,
+    on_sample=None,
+):
+    """以無頭模式連續模擬並定期取樣.
+
+    Args:
+        hours (float, optional): 模擬幾小時的遊戲時間. Defaults to SOAK_SIMULATED_HOURS.
+        sample_seconds (float, optional): 每隔幾秒遊戲時間取樣一次.
+            Defaults to SOAK_SAMPLE_SECONDS.
+        seed (int, optional): 遊戲亂數種子. Defaults to 0.
+        policy (str, optional): `POLICIES` 中的底板控制策略. Defaults to "sweep".
+        level (str, optional): 關卡檔路徑. Defaults to 預設版面.
+        render (bool, optional): 每一步是否也畫到記憶體中的畫面. Defaults to False.
+        trace (bool, optional): 是否以 tracemalloc 追蹤配置（會讓模擬變慢數倍）.
+            Defaults to True.
+        max_seconds (float, optional): 最多跑幾秒真實時間（在兩次取樣之間檢查）.
+            Defaults to 不限制.
+        on_sample (callable, optional): 每次取樣後以取樣結果呼叫. Defaults to None.
+
+    Returns:
+        dict: samples（每次取樣）、allocator_growth（暖身之後配置成長最多的
+            程式位置）與 object_growth（暖身之後數量成長最多的型別）
+    """
+    sample_frames, total_frames = _frame_counts(hours, sample_seconds)
+    if trace:
+        tracemalloc.start(SOAK_TRACEMALLOC_DEPTH)
+    game = BrickBreakerGame(
+        headless=True, seed=seed, level=level, policy=POLICIES[policy]
+    )
+    # 緩衝區剛好放得下一次取樣期間的每一步，取樣後清空
+    profiler = FrameProfiler(capacity=sample_frames, enabled=True)
+    game.profiler = profiler
+
+    samples = []
+    baseline_objects = baseline_snapshot = None
+    objects = snapshot = None
+    start = time.perf_counter()
+    try:
+        while game.frame_count < total_frames:
+            if max_seconds is not None and time.perf_counter() - start >= max_seconds:
+                break
+            for _ in range(min(sample_frames, total_frames - game.frame_count)):
+                game.step()
+                if render:
+                    profiler.call(PHASE_RENDER, game.render)
+                game._record_profile_frame()
+
+            objects = count_objects()
+            snapshot = trace_snapshot()
+            sample = take_sample(game, profiler, start, objects, snapshot)
+            profiler.clear()
+            samples.append(sample)
+            if len(samples) <= SOAK_WARMUP_SAMPLES or baseline_objects is None:
+                # 暖身結束前一直更新基準，之後的成長都和暖身結束時比較
+                baseline_objects = objects
+                baseline_snapshot = snapshot
+            if on_sample is not None:
+                on_sample(sample)
+    finally:
+        game.close()
+        if trace:
+            tracemalloc.stop()
+
+    allocator_growth = []
+    if snapshot is not None and baseline_snapshot is not None:
+        # compare_to 依變化量的絕對值排序，只留下成長的部分
+        stats = [
+            stat
+            for stat in snapshot.compare_to(baseline_snapshot, "traceback")
+            if stat.size_diff > 0
+        ]
+        stats.sort(key=lambda stat: stat.size_diff, reverse=True)
+        allocator_growth = [
+            [_location(stat.traceback), stat.size_diff, stat.count_diff]
+            for stat in stats[:SOAK_TOP_ALLOCATORS]
+        ]
+    object_growth = []
+    if objects is not None:
+        growth = objects.copy()
+        growth.subtract(baseline_objects)
+        object_growth = [
+            [name, count]
+            for name, count in growth.most_common(SOAK_TOP_ALLOCATORS)
+            if count > 0
+        ]
+    return {
+        "samples": samples,
+        "allocator_growth": allocator_growth,
+        "object_growth": object_growth,
+    }
+
+
+def _trend(hours, values):
+    """以最小平方法擬合直線，回傳斜率與斜率的 t 值.
+
+    Args:
+        hours (numpy.ndarray): 遊戲時間（小時）
+        values (numpy.ndarray): 數值
+
+    Returns:
+        tuple: (每小時斜率, t 值)；數值完全在一直線上時 t 值為無限大或 0
+    """
+    if len(values) < 4:
+        # 點數太少時算不出斜率的變異數，只回傳斜率
+        slope = float(np.polyfit(hours, values, 1)[0])
+        return slope, 0.0
+    coefficients, covariance = np.polyfit(hours, values, 1, cov=True)
+    slope = float(coefficients[0])
+    variance = float(covariance[0][0])
+    if variance > 0:
+        return slope, slope / variance**0.5
+    return slope, math.inf if slope > 0 else 0.0
+
+
+def analyze_series(hours, values, memory, min_change=0.0):
+    """分析一個數值隨遊戲時間的變化.
+
+    前段與後段各取四分之一的樣本平均，避免單一樣本的雜訊；成長超過
+    `SOAK_GROWTH_THRESHOLD` 與 min_change、而且整段的斜率 t 值超過 `SOAK_TREND_T`（不是
+    雜訊造成）時才算成長，再依後半段判斷：記憶體類後半段仍顯著成長為疑似
+    洩漏、已經停止成長為趨平；耗時類為漂移。後半段斜率顯著、而且超過前半段
+    的 `SOAK_SUPERLINEAR_RATIO` 倍時為超線性成長。
+
+    Args:
+        hours (numpy.ndarray): 每次取樣的遊戲時間（小時）
+        values (numpy.ndarray): 每次取樣的數值
+        memory (bool): 是否為記憶體類的數值
+        min_change (float, optional): 後段平均至少要比前段多出多少才算成長，
+            用來忽略本來就只有幾微秒的階段. Defaults to 0.0.
+
+    Returns:
+        dict: start、end、growth、slope_per_hour、t、early_slope、late_slope 與
+            verdict；樣本少於 `SOAK_MIN_SAMPLES` 個時回傳 None
+    """
+    count = len(values)
+    if count < SOAK_MIN_SAMPLES:
+        return None
+    quarter = max(1, count // 4)
+    half = count // 2
+    start = float(values[:quarter].mean())
+    end = float(values[-quarter:].mean())
+    growth = (end - start) / start if start > 0 else 0.0
+    slope, t = _trend(hours, values)
+    early, _ = _trend(hours[:half], values[:half])
+    late, late_t = _trend(hours[half:], values[half:])
+
+    verdict = "ok"
+    grown = growth > SOAK_GROWTH_THRESHOLD and end - start > min_change
+    if grown and t > SOAK_TREND_T:
+        late_growing = late > 0 and late_t > SOAK_TREND_T
+        if late_growing and late > SOAK_SUPERLINEAR_RATIO * max(early, 0.0):
+            verdict = "superlinear"
+        elif not memory:
+            verdict = "drift"
+        elif late_growing:
+            verdict = "leak"
+        else:
+            verdict = "plateau"
+    return {
+        "start": start,
+        "end": end,
+        "growth": growth,
+        "slope_per_hour": slope,
+        "t": t,
+        "early_slope": early,
+        "late_slope": late,
+        "verdict": verdict,
+    }
+
+
+def analyze_drift(samples, warmup=SOAK_WARMUP_SAMPLES):
+    """分析暖身之後每個記憶體與耗時數值的漂移.
+
+    Args:
+        samples (list): `run_soak` 的取樣結果
+        warmup (int, optional): 略過前幾次取樣. Defaults to SOAK_WARMUP_SAMPLES.
+
+    Returns:
+        dict: 數值名稱 -> `analyze_series` 的結果（全為 0 或樣本不足的數值不列出）
+    """
+    samples = samples[warmup:]
+    if not samples:
+        return {}
+    hours = np.array([sample["sim_hours"] for sample in samples])
+    names = list(MEMORY_METRICS)
+    names += [f"{name}_ms" for name in PHASE_NAMES] + ["update_us_per_ball"]
+    drift = {}
+    for name in names:
+        values = np.array([sample[name] for sample in samples], dtype=np.float64)
+        if not values.any():
+            continue
+        min_change = SOAK_MIN_PHASE_GROWTH_MS if name.endswith("_ms") else 0.0
+        result = analyze_series(hours, values, name in MEMORY_METRICS, min_change)
+        if result is not None:
+            drift[name] = result
+    return drift
+
+
+def _format_value(name, value):
+    """依數值種類格式化成報告中顯示的文字."""
+    if name.endswith("_bytes"):
+        return f"{value / (1024 * 1024):.1f} MB"
+    if name.endswith("_ms"):
+        return f"{value:.3f} ms"
+    if name.endswith("_us_per_ball"):
+        return f"{value:.3f} us"
+    return f"{value:.0f}"
+
+
+def print_report(result, drift):
+    """印出漂移報告與暖身之後成長最多的配置來源與物件型別.
+
+    Args:
+        result (dict): `run_soak` 的結果
+        drift (dict): `analyze_drift` 的結果
+    """
+    samples = result["samples"]
+    if samples:
+        last = samples[-1]
+        print(
+            f"\n模擬了 {last['sim_hours']:.2f} 小時遊戲時間（{last['frame']} 步、"
+            f"{last['games']} 局），耗時 {last['wall_seconds']:.1f} 秒，"
+            f"共取樣 {len(samples)} 次"
+        )
+    if not drift:
+        print(
+            f"取樣數不足（暖身 {SOAK_WARMUP_SAMPLES} 次之後至少需要 "
+            f"{SOAK_MIN_SAMPLES} 次），無法分析漂移"
+        )
+        return
+
+    header = f"{'數值':<24}{'前段':>14}{'後段':>14}{'成長':>9}{'每小時斜率':>16}  判定"
+    print("\n" + header)
+    print("-" * (len(header) + 12))
+    for name, row in drift.items():
+        print(
+            f"{name:<24}"
+            f"{_format_value(name, row['start']):>14}"
+            f"{_format_value(name, row['end']):>14}"
+            f"{row['growth']:>+9.1%}"
+            f"{_format_value(name, row['slope_per_hour']):>16}"
+            f"  {VERDICT_LABELS[row['verdict']]}"
+        )
+
+    if result["allocator_growth"]:
+        print("\n暖身之後配置成長最多的位置:")
+        for location, size, count in result["allocator_growth"]:
+            print(f"  {location:<40}{size / 1024:>+12.1f} KB {count:>+10} 個")
+    if result["object_growth"]:
+        print("\n暖身之後數量成長最多的型別:")
+        for name, count in result["object_growth"]:
+            print(f"  {name:<40}{count:>+12}")
+
+
+def main():
+    """命令列入口：執行浸泡測試、印出漂移報告，有問題時以非 0 結束."""
+    parser = argparse.ArgumentParser(description="敲磚塊遊戲長時間浸泡測試")
+    parser.add_argument(
+        "--hours", type=float, default=SOAK_SIMULATED_HOURS, help="模擬幾小時的遊戲時間"
+    )
+    parser.add_argument(
+        "--sample-seconds",
+        type=float,
+        default=SOAK_SAMPLE_SECONDS,
+        help="每隔幾秒遊戲時間取樣一次",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="遊戲亂數種子")
+    parser.add_argument(
+        "--policy", choices=sorted(POLICIES), default="sweep", help="底板控制策略"
+    )
+    parser.add_argument("--level", help="使用的關卡檔")
+    parser.add_argument(
+        "--render", action="store_true", help="每一步也畫到記憶體中的畫面"
+    )
+    parser.add_argument(
+        "--no-tracemalloc",
+        dest="trace",
+        action="store_false",
+        help="不追蹤記憶體配置（模擬較快，但沒有配置來源的資料）",
+    )
+    parser.add_argument("--max-seconds", type=float, help="最多跑幾秒真實時間")
+    parser.add_argument("--json", help="把取樣與報告寫成 JSON 檔")
+    args = parser.parse_args()
+    needed = SOAK_WARMUP_SAMPLES + SOAK_MIN_SAMPLES
+    if args.hours <= 0 or args.sample_seconds <= 0:
+        parser.error("--hours 與 --sample-seconds 必須大於 0")
+    planned = planned_samples(args.hours, args.sample_seconds)
+    if planned < needed:
+        parser.error(
+            f"--hours {args.hours:g} 每 {args.sample_seconds:g} 秒取樣只有 {planned} 次，"
+            f"至少需要 {needed} 次（至少 {needed * args.sample_seconds / 3600:.3f} 小時）"
+        )
+
+    def report_progress(sample):
+        print(
+            f"遊戲時間 {sample['sim_hours']:.2f} 小時，{sample['games']} 局，"
+            f"球數 {sample['balls']}，RSS {sample['rss_bytes'] / (1024 * 1024):.1f} MB，"
+            f"物件 {sample['gc_objects']}，"
+            f"{sample['frame'] / sample['wall_seconds']:.0f} 步/秒",
+            file=sys.stderr,
+        )
+
+    result = run_soak(
+        hours=args.hours,
+        sample_seconds=args.sample_seconds,
+        seed=args.seed,
+        policy=args.policy,
+        level=args.level,
+        render=args.render,
+        trace=args.trace,
+        max_seconds=args.max_seconds,
+        on_sample=report_progress,
+    )
+    drift = analyze_drift(result["samples"])
+    print_report(result, drift)
+
+    if args.json:
+        output = {
+            "meta": {
+                "hours": args.hours,
+                "sample_seconds": args.sample_seconds,
+                "seed": args.seed,
+                "policy": args.policy,
+                "level": args.level,
+                "render": args.render,
+                "tracemalloc": args.trace,
+            },
+            "drift": drift,
+            **result,
+        }
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(output, file, indent=2)
+
+    if not drift:
+        # 例如被 --max-seconds 提早停下：沒有結果不能當成沒有問題
+        print("\n結果不確定：取樣數不足，沒有分析任何數值")
+        sys.exit(2)
+    flagged = [
+        name for name, row in drift.items() if row["verdict"] in FLAGGED_VERDICTS
+    ]
+    if flagged:
+        print(f"\n有問題的數值: {', '.join(flagged)}")
+        sys.exit(1)
+    print("\n沒有發現洩漏或漂移")
+
+
+if __name__ == "__main__":
+    main()
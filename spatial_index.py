@@ -0,0 +1,431 @@
+"""空間索引模組.
+
+提供均勻格子（uniform grid）索引，讓碰撞檢查只需要查看球附近的幾個格子，
+不必每次都掃描全部磚塊。格子內容可以匯出成緊密的 CSR 陣列（每格起點 +
+連續的編號），存進關卡檔後直接載入，不必重新建立。
+"""
+
+import bisect
+import math
+
+import numpy as np
+
+
+class PackedCells:
+    """以 CSR 陣列保存的格子內容，某個格子第一次被用到時才轉成清單.
+
+    從關卡檔載入大型索引時，陣列可以直接是檔案的記憶體映射，不必一開始
+    就為每個格子建立 Python 清單。
+
+    Attributes:
+        starts (numpy.ndarray): 每個格子在 items 中的起點，長度為格子數 + 1
+        items (numpy.ndarray): 依格子順序串接的物件編號
+    """
+
+    __slots__ = ("starts", "items", "_lists")
+
+    def __init__(self, starts, items):
+        """包裝 CSR 陣列.
+
+        Args:
+            starts (numpy.ndarray): 每個格子的起點
+            items (numpy.ndarray): 串接的物件編號
+        """
+        self.starts = starts
+        self.items = items
+        self._lists = [None] * (len(starts) - 1)
+
+    def __len__(self):
+        """回傳格子數."""
+        return len(self._lists)
+
+    def __getitem__(self, index):
+        """取得格子的物件編號清單（之後的修改會直接寫在這個清單上）."""
+        cell = self._lists[index]
+        if cell is None:
+            start = int(self.starts[index])
+            end = int(self.starts[index + 1])
+            cell = self._lists[index] = self.items[start:end].tolist()
+        return cell
+
+
+class UniformGrid:
+    """把矩形物件分配到固定大小格子裡的空間索引.
+
+    每個格子保存覆蓋到它的物件編號，編號依插入順序排列；查詢時回傳的
+    編號也依小到大排序，讓呼叫方能維持和線性掃描相同的檢查順序。
+
+    Attributes:
+        origin_x (float): 格子原點 x 座標
+        origin_y (float): 格子原點 y 座標
+        cell_width (float): 格子寬度
+        cell_height (float): 格子高度
+        cols (int): 格子欄數
+        rows (int): 格子列數
+        cells (list or PackedCells): 每個格子的物件編號清單
+    """
+
+    def __init__(
+        self, origin_x, origin_y, cell_width, cell_height, cols, rows, cells=None
+    ):
+        """初始化格子索引.
+
+        Args:
+            origin_x (float): 格子原點 x 座標
+            origin_y (float): 格子原點 y 座標
+            cell_width (float): 格子寬度，必須 > 0
+            cell_height (float): 格子高度，必須 > 0
+            cols (int): 格子欄數
+            rows (int): 格子列數
+            cells (list or PackedCells, optional): 已建好的格子內容.
+                Defaults to 全部為空.
+        """
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cols = cols
+        self.rows = rows
+        if cells is None:
+            cells = [[] for _ in range(cols * rows)]
+        elif len(cells) != cols * rows:
+            raise ValueError(f"格子數量不符：需要 {cols * rows}，收到 {len(cells)}")
+        self.cells = cells
+
+    @classmethod
+    def from_rects(
+        cls, origin_x, origin_y, cell_width, cell_height, cols, rows, items, rects
+    ):
+        """一次把大量矩形放進新的格子索引（以 NumPy 計算，不逐一插入）.
+
+        結果和依編號由小到大逐一 `insert` 相同。
+
+        Args:
+            origin_x (float): 格子原點 x 座標
+            origin_y (float): 格子原點 y 座標
+            cell_width (float): 格子寬度，必須 > 0
+            cell_height (float): 格子高度，必須 > 0
+            cols (int): 格子欄數
+            rows (int): 格子列數
+            items (array-like): 物件編號
+            rects (tuple): 每個物件的 (left, top, right, bottom) 陣列
+
+        Returns:
+            UniformGrid: 建好的格子索引
+        """
+        items = np.asarray(items, dtype=np.int64)
+        left, top, right, bottom = (
+            np.asarray(edge, dtype=np.float64) for edge in rects
+        )
+        # 和 cell_range 相同的算式，只是一次算完所有矩形
+        col0 = np.maximum(np.floor((left - origin_x) / cell_width), 0)
+        col1 = np.minimum(np.floor((right - origin_x) / cell_width), cols - 1)
+        row0 = np.maximum(np.floor((top - origin_y) / cell_height), 0)
+        row1 = np.minimum(np.floor((bottom - origin_y) / cell_height), rows - 1)
+        span_cols = np.maximum(col1 - col0 + 1, 0).astype(np.int64)
+        span_rows = np.maximum(row1 - row0 + 1, 0).astype(np.int64)
+        spans = span_cols * span_rows
+
+        # 把每個矩形展開成它覆蓋到的每一個格子
+        owner = np.repeat(np.arange(len(items)), spans)
+        offset = np.arange(len(owner)) - np.repeat(np.cumsum(spans) - spans, spans)
+        col = col0.astype(np.int64)[owner] + offset % span_cols[owner]
+        row = row0.astype(np.int64)[owner] + offset // span_cols[owner]
+        cell = row * cols + col
+        order = np.lexsort((items[owner], cell))
+
+        starts = np.zeros(cols * rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cell, minlength=cols * rows), out=starts[1:])
+        cells = PackedCells(starts, items[owner][order])
+        return cls(origin_x, origin_y, cell_width, cell_height, cols, rows, cells)
+
+    def to_csr(self):
+        """把格子內容匯出成 CSR 陣列.
+
+        Returns:
+            tuple: (starts, items)，starts 長度為格子數 + 1，
+                第 i 格的內容是 items[starts[i]:starts[i + 1]]
+        """
+        cells = [self.cells[i] for i in range(self.cols * self.rows)]
+        starts = np.zeros(len(cells) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter(map(len, cells), dtype=np.int64, count=len(cells)),
+            out=starts[1:],
+        )
+        items = np.fromiter(
+            (item for cell in cells for item in cell),
+            dtype=np.int64,
+            count=int(starts[-1]),
+        )
+        return starts, items
+
+    def cell_range(self, left, top, right, bottom):
+        """計算矩形範圍覆蓋到的格子欄列範圍.
+
+        Args:
+            left (float): 左邊界
+            top (float): 上邊界
+            right (float): 右邊界
+            bottom (float): 下邊界
+
+        Returns:
+            tuple: (col0, row0, col1, row1)，包含兩端；完全在格子外時回傳 None
+        """
+        col0 = max(0, math.floor((left - self.origin_x) / self.cell_width))
+        col1 = min(self.cols - 1, math.floor((right - self.origin_x) / self.cell_width))
+        row0 = max(0, math.floor((top - self.origin_y) / self.cell_height))
+        row1 = min(
+            self.rows - 1, math.floor((bottom - self.origin_y) / self.cell_height)
+        )
+        if col0 > col1 or row0 > row1:
+            return None
+        return col0, row0, col1, row1
+
+    def insert(self, item, left, top, right, bottom):
+        """把物件編號加入它覆蓋到的所有格子.
+
+        Args:
+            item (int): 物件編號
+            left (float): 左邊界
+            top (float): 上邊界
+            right (float): 右邊界
+            bottom (float): 下邊界
+        """
+        span = self.cell_range(left, top, right, bottom)
+        if span is None:
+            return
+        col0, row0, col1, row1 = span
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                # 維持格子內依編號排序，重新插入的物件也不會破壞查詢順序
+                bisect.insort(self.cells[row * self.cols + col], item)
+
+    def remove(self, item, left, top, right, bottom):
+        """把物件編號從它覆蓋到的所有格子移除.
+
+        Args:
+            item (int): 物件編號
+            left (float): 左邊界
+            top (float): 上邊界
+            right (float): 右邊界
+            bottom (float): 下邊界
+        """
+        span = self.cell_range(left, top, right, bottom)
+        if span is None:
+            return
+        col0, row0, col1, row1 = span
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                cell = self.cells[row * self.cols + col]
+                if item in cell:
+                    cell.remove(item)
+
+    def query(self, left, top, right, bottom):
+        """找出和矩形範圍可能重疊的物件編號.
+
+        Args:
+            left (float): 左邊界
+            top (float): 上邊界
+            right (float): 右邊界
+            bottom (float): 下邊界
+
+        Returns:
+            list: 由小到大排序、不重複的物件編號
+        """
+        span = self.cell_range(left, top, right, bottom)
+        if span is None:
+            return []
+        col0, row0, col1, row1 = span
+        # 大多數情況只碰到一個格子，格子內本來就依編號排序，直接複製即可
+        if col0 == col1 and row0 == row1:
+            return list(self.cells[row0 * self.cols + col0])
+        found = set()
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                found.update(self.cells[row * self.cols + col])
+        return sorted(found)
+
+
+class NeighborTable:
+    """預先算好的最近鄰表，用來快速找出「離某個點最近的存活點」.
+
+    建立時為每個點記下最近的 size 個其他點（依距離平方、再依編號排序；
+    點數不足 size 時以 -1 補齊）。查詢時依序找出第一個還存活的鄰居；若表中
+    的鄰居都已消失，才退回到只含存活點的格子索引，由內往外一圈一圈搜尋。
+    結果和「掃描所有存活點、取距離最小且編號最小者」完全相同。
+
+    鄰居表可以從關卡檔直接載入；這時搜尋用的格子索引要等第一次需要退回
+    搜尋時才建立。
+
+    Attributes:
+        centers (numpy.ndarray): 每個點的座標，形狀為 (N, 2)
+        size (int): 每個點記錄的鄰居數量
+        table (numpy.ndarray): 每個點的最近鄰編號，形狀為 (N, size)
+        alive (bytearray): 每個點是否仍存活（1 為存活）
+    """
+
+    def __init__(self, centers, cell_width, cell_height, size, table=None):
+        """建立最近鄰表.
+
+        Args:
+            centers (array-like): 每個點的座標 (x, y)
+            cell_width (float): 搜尋用格子寬度，必須 > 0
+            cell_height (float): 搜尋用格子高度，必須 > 0
+            size (int): 每個點預先記錄的鄰居數量，必須 > 0
+            table (numpy.ndarray, optional): 已算好的鄰居表（所有點都存活時的
+                結果）. Defaults to 現在計算.
+        """
+        self.centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.size = size
+        self.alive = bytearray(b"\x01" * len(self.centers))
+        self._points = None
+        self._grid = None
+
+        if table is None:
+            # 一次算好每個點最近的 size 個鄰居
+            table = np.full((len(self.centers), size), -1, dtype=np.int64)
+            for i in range(len(self.centers)):
+                neighbors = [j for _, j in self._search(i, size)]
+                table[i, : len(neighbors)] = neighbors
+        elif np.shape(table) != (len(self.centers), size):
+            raise ValueError(
+                f"鄰居表形狀不符：需要 {(len(self.centers), size)}，"
+                f"收到 {np.shape(table)}"
+            )
+        self.table = table
+
+    @property
+    def grid(self):
+        """只包含存活點的搜尋用格子索引（第一次使用時才建立）."""
+        if self._grid is None:
+            if len(self.centers):
+                left, top = self.centers.min(axis=0).tolist()
+                right, bottom = self.centers.max(axis=0).tolist()
+            else:
+                left = top = right = bottom = 0
+            cols = int((right - left) // self.cell_width) + 1
+            rows = int((bottom - top) // self.cell_height) + 1
+            alive = np.flatnonzero(np.frombuffer(self.alive, dtype=np.uint8))
+            x, y = self.centers[alive].T
+            self._grid = UniformGrid.from_rects(
+                left,
+                top,
+                self.cell_width,
+                self.cell_height,
+                cols,
+                rows,
+                alive,
+                (x, y, x, y),
+            )
+        return self._grid
+
+    def _point(self, i):
+        """回傳點 i 的座標（Python float，和原本的線性掃描算式相同）."""
+        if self._points is None:
+            self._points = self.centers.tolist()
+        return self._points[i]
+
+    def _distance_sq(self, i, j):
+        """計算兩點距離的平方（算式與原本的線性掃描相同）."""
+        center_x, center_y = self._point(i)
+        other_x, other_y = self._point(j)
+        return (other_x - center_x) ** 2 + (other_y - center_y) ** 2
+
+    def _search(self, i, count):
+        """從點 i 所在格子往外一圈一圈找出最近的 count 個存活點.
+
+        Args:
+            i (int): 中心點編號
+            count (int): 要找的鄰居數量
+
+        Returns:
+            list: 依 (距離平方, 編號) 排序的 (距離平方, 編號) 清單
+        """
+        grid = self.grid
+        x, y = self._point(i)
+        center_col = int((x - grid.origin_x) // grid.cell_width)
+        center_row = int((y - grid.origin_y) // grid.cell_height)
+        min_cell = min(grid.cell_width, grid.cell_height)
+        found = []
+        for ring in range(max(grid.cols, grid.rows)):
+            # 第 ring 圈裡的點至少距離 (ring - 1) 個格子，已經比目前最遠的
+            # 候選還遠時就不用再往外找
+            if len(found) >= count:
+                bound = (ring - 1) * min_cell
+                if bound > 0 and bound * bound > found[count - 1][0]:
+                    break
+            for col, row in self._ring_cells(center_col, center_row, ring):
+                for j in grid.cells[row * grid.cols + col]:
+                    if j != i:
+                        found.append((self._distance_sq(i, j), j))
+            found.sort()
+        return found[:count]
+
+    def _ring_cells(self, center_col, center_row, ring):
+        """列出和中心格子相距 ring 圈（切比雪夫距離）的所有格子.
+
+        Args:
+            center_col (int): 中心格子欄
+            center_row (int): 中心格子列
+            ring (int): 圈數，0 表示中心格子本身
+
+        Yields:
+            tuple: 格子的 (col, row)
+        """
+        grid = self.grid
+        for row in range(center_row - ring, center_row + ring + 1):
+            if not 0 <= row < grid.rows:
+                continue
+            if row in (center_row - ring, center_row + ring):
+                cols = range(center_col - ring, center_col + ring + 1)
+            else:
+                cols = (center_col - ring, center_col + ring)
+            for col in cols:
+                if 0 <= col < grid.cols:
+                    yield col, row
+
+    def discard(self, i):
+        """把點標記為已消失，並從搜尋用格子移除.
+
+        Args:
+            i (int): 點的編號
+        """
+        if not self.alive[i]:
+            return
+        self.alive[i] = 0
+        if self._grid is not None:
+            x, y = self._point(i)
+            self._grid.remove(i, x, y, x, y)
+
+    def restore(self, i):
+        """讓已消失的點重新存活，並放回搜尋用格子.
+
+        Args:
+            i (int): 點的編號
+        """
+        if self.alive[i]:
+            return
+        self.alive[i] = 1
+        if self._grid is not None:
+            x, y = self._point(i)
+            self._grid.insert(i, x, y, x, y)
+
+    def nearest(self, i):
+        """找出離點 i 最近的存活點.
+
+        Args:
+            i (int): 中心點編號
+
+        Returns:
+            int: 最近存活點的編號，沒有其他存活點時回傳 -1
+        """
+        for j in self.table[i].tolist():
+            # 補齊用的 -1 代表表裡已經包含所有其他點，真的沒有存活的點了
+            if j < 0:
+                return -1
+            if self.alive[j]:
+                return j
+        found = self._search(i, 1)
+        return found[0][1] if found else -1
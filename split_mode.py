@@ -0,0 +1,621 @@
+"""雙行程模式模組.
+
+一般模式在同一個行程裡依序處理事件、物理與繪圖，物理和繪圖的耗時會疊加
+在同一幀裡。雙行程模式把模擬搬到另一個行程：模擬行程擁有球、磚塊與粒子
+陣列，每模擬完一批步驟就把狀態發佈到 `multiprocessing.shared_memory` 的
+雙緩衝區；主行程保留 pygame 的輸入與繪圖，直接以 NumPy 檢視讀取共享記憶體
+中的陣列（不複製），玩家輸入則經由單向 `Pipe` 送回模擬行程。多核心機器上
+物理與繪圖可以同時進行。
+
+共享記憶體的內容：
+
+1. 控制區：目前發佈的緩衝區編號、發佈次數、主行程正在讀的緩衝區編號。
+2. 兩份格式相同的畫面緩衝區，每份包含檔頭（分數、球數、底板位置等純量）、
+   球的位置陣列、粒子的繪圖陣列與每塊磚一個位元組的命中狀態。
+
+模擬行程只寫入主行程沒有在讀的那一份，寫完才切換發佈編號。切換編號和主行程
+取得編號時用同一把鎖保護，鎖只在交換編號時持有，複製與繪圖都不會持有鎖；
+主行程還在讀舊的那一份時，模擬行程這次先不發佈，下一步再試。
+
+使用方法:
+    python main.py --split
+"""
+
+import collections
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from config import *
+from profiler import PHASE_RENDER
+from snapshot import apply_brick_hits
+from utils import EndScreen
+
+# 畫面檔頭：模擬行程每次發佈時寫入的純量狀態
+FRAME_HEADER = np.dtype(
+    [
+        ("frame_count", "<i8"),
+        ("games_played", "<i8"),
+        ("result", "<i8"),
+        ("score", "<i8"),
+        ("ball_count", "<i8"),
+        ("idle_count", "<i8"),
+        ("idle_x", "<f8"),
+        ("idle_y", "<f8"),
+        ("idle_prev_x", "<f8"),
+        ("idle_prev_y", "<f8"),
+        ("paddle_x", "<f8"),
+        ("particle_count", "<i8"),
+        ("brick_changes", "<i8"),
+        ("stamp", "<f8"),
+    ]
+)
+# 檔頭 result 欄位的編號對應的結束訊息（0 表示還沒有結束的局）
+RESULT_MESSAGES = (None, "Game Over", "You Win!")
+# 繪圖需要的球陣列與粒子陣列
+BALL_ARRAYS = ("x", "y", "prev_x", "prev_y")
+PARTICLE_ARRAYS = ("x", "y", "prev_x", "prev_y", "size", "color", "life", "emitter")
+PARTICLE_DTYPES = {
+    "x": np.float64,
+    "y": np.float64,
+    "prev_x": np.float64,
+    "prev_y": np.float64,
+    "size": np.float64,
+    "color": np.uint8,
+    "life": np.float64,
+    "emitter": np.int64,
+}
+# 控制區的欄位：發佈的緩衝區編號、發佈次數、主行程正在讀的編號（-1 表示沒有）
+CONTROL_PUBLISHED = 0
+CONTROL_SEQUENCE = 1
+CONTROL_READING = 2
+
+# 主行程送給模擬行程的命令
+COMMAND_INPUT = "input"  # 滑鼠 x 座標、左鍵、右鍵
+COMMAND_QUALITY = "quality"  # 畫質等級
+COMMAND_RESTART = "restart"
+COMMAND_QUIT = "quit"
+# 交給遊戲在下一步處理的事件（與 `BrickBreakerGame.handle_events` 一致）
+GAME_EVENTS = ("launch", "rewind", "quick_save", "quick_load")
+
+
+def _frame_fields(brick_count, ball_capacity, particle_capacity):
+    """列出一份畫面緩衝區中的所有陣列.
+
+    Args:
+        brick_count (int): 磚塊數
+        ball_capacity (int): 最多能放幾顆球
+        particle_capacity (int): 最多能放幾個粒子
+
+    Returns:
+        list: (名稱, dtype, 形狀) 的清單
+    """
+    fields = [("header", FRAME_HEADER, ())]
+    for name in BALL_ARRAYS:
+        fields.append(("ball_" + name, np.dtype(np.float64), (ball_capacity,)))
+    for name in PARTICLE_ARRAYS:
+        shape = (particle_capacity, 3) if name == "color" else (particle_capacity,)
+        fields.append(("particle_" + name, np.dtype(PARTICLE_DTYPES[name]), shape))
+    fields.append(("hit", np.dtype(bool), (brick_count,)))
+    return fields
+
+
+class SharedFrames:
+    """共享記憶體中的雙緩衝畫面.
+
+    主行程建立（name 為 None），模擬行程以相同的參數和名稱連接。
+
+    Attributes:
+        memory (shared_memory.SharedMemory): 整塊共享記憶體
+        control (numpy.ndarray): 控制區（見 CONTROL_*）
+        buffers (list): 兩份畫面緩衝區，每份是名稱到陣列檢視的 dict
+    """
+
+    def __init__(
+        self,
+        brick_count,
+        lock,
+        ball_capacity=SPLIT_BALL_CAPACITY,
+        particle_capacity=PARTICLE_POOL_CAPACITY,
+        name=None,
+    ):
+        """建立或連接共享記憶體，並切出每個陣列的檢視.
+
+        Args:
+            brick_count (int): 磚塊數
+            lock (multiprocessing.Lock): 保護控制區的鎖
+            ball_capacity (int, optional): 最多能放幾顆球. Defaults to SPLIT_BALL_CAPACITY.
+            particle_capacity (int, optional): 最多能放幾個粒子.
+                Defaults to PARTICLE_POOL_CAPACITY.
+            name (str, optional): 要連接的共享記憶體名稱. Defaults to 建立新的.
+        """
+        self.brick_count = brick_count
+        self.ball_capacity = ball_capacity
+        self.particle_capacity = particle_capacity
+        self.lock = lock
+
+        fields = _frame_fields(brick_count, ball_capacity, particle_capacity)
+        # 每個陣列都對齊到 8 位元組
+        layout = []
+        offset = 0
+        for field_name, dtype, shape in fields:
+            layout.append((field_name, dtype, shape, offset))
+            offset += -(-dtype.itemsize * int(np.prod(shape)) // 8) * 8
+        frame_size = offset
+        control_size = 3 * np.dtype(np.int64).itemsize
+        size = control_size + 2 * frame_size
+
+        self._owner = name is None
+        if self._owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        buf = self.memory.buf
+        self.control = np.ndarray(3, dtype=np.int64, buffer=buf)
+        self.buffers = []
+        for index in range(2):
+            base = control_size + index * frame_size
+            self.buffers.append(
+                {
+                    field_name: np.ndarray(
+                        shape, dtype=dtype, buffer=buf, offset=base + offset
+                    )
+                    for field_name, dtype, shape, offset in layout
+                }
+            )
+        if self._owner:
+            self.control[:] = (0, 0, -1)
+            # 第一次發佈時一定要複製磚塊命中狀態
+            for frame in self.buffers:
+                frame["header"]["brick_changes"] = -1
+        # 主行程上次套用到磚塊場地的命中狀態版本
+        self._brick_changes = -1
+
+    def spec(self):
+        """回傳讓其他行程連接這塊共享記憶體所需的參數.
+
+        Returns:
+            tuple: 傳給 `SharedFrames(*spec)` 的參數
+        """
+        return (
+            self.brick_count,
+            self.lock,
+            self.ball_capacity,
+            self.particle_capacity,
+            self.memory.name,
+        )
+
+    def publish(self, game, stamp):
+        """（模擬行程）把遊戲目前的狀態寫進沒有被讀取的緩衝區並發佈.
+
+        Args:
+            game (BrickBreakerGame): 遊戲
+            stamp (float): 這個狀態對應的 `time.perf_counter()` 時間，主行程
+                用來計算插值比例
+
+        Returns:
+            bool: 是否發佈成功（主行程還在讀另一份時回傳 False）
+        """
+        control = self.control
+        with self.lock:
+            target = 1 - int(control[CONTROL_PUBLISHED])
+            if control[CONTROL_READING] == target:
+                return False
+        self._write(self.buffers[target], game, stamp)
+        with self.lock:
+            control[CONTROL_PUBLISHED] = target
+            control[CONTROL_SEQUENCE] += 1
+        return True
+
+    def _write(self, frame, game, stamp):
+        """把遊戲狀態複製到一份畫面緩衝區.
+
+        Args:
+            frame (dict): 畫面緩衝區
+            game (BrickBreakerGame): 遊戲
+            stamp (float): 這個狀態對應的時間
+        """
+        balls = game.balls
+        particles = game.particles
+        bricks = game.bricks
+        header = frame["header"]
+        last_game = game.last_game
+        ball_count = min(balls.count, self.ball_capacity)
+        for name in BALL_ARRAYS:
+            frame["ball_" + name][:ball_count] = getattr(balls, name)[:ball_count]
+        particle_count = particles.count
+        for name in PARTICLE_ARRAYS:
+            frame["particle_" + name][:particle_count] = getattr(particles, name)[
+                :particle_count
+            ]
+        # 磚塊只在命中狀態改變時才複製
+        if header["brick_changes"] != bricks.changes:
+            np.copyto(frame["hit"], bricks.hit)
+            header["brick_changes"] = bricks.changes
+
+        header["frame_count"] = game.frame_count
+        header["games_played"] = game.games_played
+        header["result"] = (
+            0 if last_game is None else RESULT_MESSAGES.index(last_game["result"])
+        )
+        header["score"] = game.score
+        header["ball_count"] = ball_count
+        header["idle_count"] = balls.idle_count
+        header["idle_x"] = balls.idle_x
+        header["idle_y"] = balls.idle_y
+        header["idle_prev_x"], header["idle_prev_y"] = balls._idle_prev
+        header["paddle_x"] = game.paddle.x
+        header["particle_count"] = particle_count
+        header["stamp"] = stamp
+
+    def acquire(self):
+        """（主行程）取得最新發佈的緩衝區，讀完後要呼叫 `release`.
+
+        Returns:
+            dict: 畫面緩衝區，還沒有任何發佈時回傳 None
+        """
+        control = self.control
+        with self.lock:
+            if control[CONTROL_SEQUENCE] == 0:
+                return None
+            index = int(control[CONTROL_PUBLISHED])
+            control[CONTROL_READING] = index
+        return self.buffers[index]
+
+    def release(self):
+        """（主行程）讀完緩衝區，讓模擬行程可以再寫入."""
+        with self.lock:
+            self.control[CONTROL_READING] = -1
+
+    def show(self, game, frame):
+        """（主行程）讓遊戲的球與粒子直接使用緩衝區中的陣列，並同步純量狀態.
+
+        主行程的遊戲物件只用來繪圖：球引擎與粒子池的陣列換成共享記憶體的
+        檢視，被打掉或恢復的磚塊在背景快取上重畫。
+
+        Args:
+            game (BrickBreakerGame): 主行程的遊戲
+            frame (dict): `acquire` 取得的畫面緩衝區
+
+        Returns:
+            numpy.ndarray: 畫面檔頭
+        """
+        header = frame["header"]
+        balls = game.balls
+        for name in BALL_ARRAYS:
+            setattr(balls, name, frame["ball_" + name])
+        balls.count = int(header["ball_count"])
+        balls.idle_count = int(header["idle_count"])
+        balls.idle_x = float(header["idle_x"])
+        balls.idle_y = float(header["idle_y"])
+        balls._idle_prev = (float(header["idle_prev_x"]), float(header["idle_prev_y"]))
+        particles = game.particles
+        for name in PARTICLE_ARRAYS:
+            setattr(particles, name, frame["particle_" + name])
+        particles.count = int(header["particle_count"])
+
+        game.frame_count = int(header["frame_count"])
+        game.score = int(header["score"])
+        game.paddle.x = float(header["paddle_x"])
+        changes = int(header["brick_changes"])
+        if changes != self._brick_changes:
+            if apply_brick_hits(game, frame["hit"]):
+                game.renderer.request_full_redraw()
+            self._brick_changes = changes
+        return header
+
+    def close(self):
+        """釋放這個行程的檢視並關閉共享記憶體（建立者同時刪除它）."""
+        self.control = None
+        self.buffers = []
+        self.memory.close()
+        if self._owner:
+            self.memory.unlink()
+
+
+class RemoteInput:
+    """由其他行程或連線送來的玩家輸入.
+
+    遊戲以它取代鍵盤滑鼠：`keys` 與 `mouse_pos` 給底板使用，`events` 中的
+    事件在下一步的 `handle_events` 處理。
+
+    Attributes:
+        keys (collections.defaultdict): 按下的方向鍵（pygame 按鍵碼到布林值）
+        mouse_pos (tuple): 滑鼠位置
+        events (list): 還沒有處理的遊戲事件（見 GAME_EVENTS）
+        quality_level (int): 主行程目前的畫質等級
+        restart_requested (bool): 玩家是否在結束畫面選擇重新開始
+    """
+
+    def __init__(self, connection=None):
+        """初始化輸入狀態.
+
+        Args:
+            connection (multiprocessing.connection.Connection, optional): 接收命令
+                的 Pipe 端點；沒有時由呼叫方以 `apply` 直接交給命令. Defaults to None.
+        """
+        self.connection = connection
+        self.keys = collections.defaultdict(bool)
+        self.mouse_pos = (WINDOW_WIDTH // 2, 0)
+        self.events = []
+        self.quality_level = 0
+        self.restart_requested = False
+
+    def take_events(self):
+        """取出並清空還沒有處理的遊戲事件.
+
+        Returns:
+            list: 遊戲事件
+        """
+        events = self.events
+        self.events = []
+        return events
+
+    def receive(self, timeout):
+        """等待命令最多 timeout 秒，並處理所有已經送到的命令.
+
+        Args:
+            timeout (float): 最多等待的秒數，None 表示一直等到有命令
+
+        Returns:
+            bool: 是否繼續執行（收到結束命令或主行程已經關閉時回傳 False）
+        """
+        connection = self.connection
+        try:
+            if not connection.poll(timeout):
+                return True
+            while True:
+                if not self.apply(connection.recv()):
+                    return False
+                if not connection.poll():
+                    return True
+        except (EOFError, OSError):
+            return False
+
+    def apply(self, command):
+        """處理一個命令.
+
+        Args:
+            command (tuple): 命令名稱（COMMAND_* 或 GAME_EVENTS）與參數
+
+        Returns:
+            bool: 是否繼續執行（結束命令回傳 False）
+        """
+        kind = command[0]
+        if kind == COMMAND_INPUT:
+            mouse_x, left, right = command[1:]
+            self.mouse_pos = (mouse_x, 0)
+            self.keys[pygame.K_LEFT] = left
+            self.keys[pygame.K_RIGHT] = right
+        elif kind in GAME_EVENTS:
+            self.events.append(kind)
+        elif kind == COMMAND_QUALITY:
+            self.quality_level = command[1]
+        elif kind == COMMAND_RESTART:
+            self.restart_requested = True
+        elif kind == COMMAND_QUIT:
+            return False
+        return True
+
+
+def simulation_main(spec, connection, options):
+    """模擬行程的入口：建立無頭遊戲，依真實時間以固定步長模擬並發佈畫面.
+
+    Args:
+        spec (tuple): `SharedFrames.spec()` 回傳的連接參數
+        connection (multiprocessing.connection.Connection): 接收命令的 Pipe 端點
+        options (dict): 傳給 `BrickBreakerGame` 的 level、seed 與 record
+    """
+    # 模擬行程不開視窗；SDL 預設會攔截 SIGTERM，主行程就無法強制終止它
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+    from game_logic import BrickBreakerGame
+
+    frames = SharedFrames(*spec)
+    remote = RemoteInput(connection)
+    game = BrickBreakerGame(headless=True, remote=remote, **options)
+    try:
+        _simulate(game, frames, remote)
+    finally:
+        game.close()
+        frames.close()
+
+
+def _simulate(game, frames, remote):
+    """模擬行程的主循環.
+
+    和 `BrickBreakerGame.run` 一樣把經過的真實時間用固定步長模擬掉，最多補
+    `MAX_CATCHUP_STEPS` 步；兩步之間的空檔用來等待主行程的輸入。一局結束後
+    暫停模擬，等主行程的結束畫面送回重新開始的命令。
+
+    Args:
+        game (BrickBreakerGame): 模擬行程的無頭遊戲
+        frames (SharedFrames): 共享畫面
+        remote (RemoteInput): 主行程送來的輸入
+    """
+    step_seconds = 1 / SIMULATION_HZ
+    accumulator = 0.0
+    previous = time.perf_counter()
+    stamp = previous
+    pending = not frames.publish(game, stamp)
+    games_played = game.games_played
+    paused = False
+    while True:
+        if pending:
+            # 上次主行程還在讀另一份緩衝區，現在再發佈一次
+            pending = not frames.publish(game, stamp)
+        if paused:
+            timeout = step_seconds if pending else None
+        else:
+            timeout = max(step_seconds - accumulator, 0.0)
+        if not remote.receive(timeout):
+            return
+        game.quality.level = remote.quality_level
+
+        if paused:
+            if not remote.restart_requested:
+                continue
+            game.reset_game()
+            paused = False
+            accumulator = 0.0
+            previous = stamp = time.perf_counter()
+            pending = not frames.publish(game, stamp)
+        remote.restart_requested = False
+
+        now = time.perf_counter()
+        accumulator += now - previous
+        previous = now
+        steps = 0
+        while accumulator >= step_seconds and steps < MAX_CATCHUP_STEPS:
+            game.step()
+            accumulator -= step_seconds
+            steps += 1
+            if game.games_played != games_played:
+                # 這一局結束了：停在最後一步，等主行程顯示結束畫面
+                games_played = game.games_played
+                paused = True
+                accumulator = 0.0
+                break
+        if accumulator >= step_seconds:
+            # 真的追不上了：放掉積欠的時間，讓遊戲變慢而不是卡死
+            accumulator = 0.0
+        if steps:
+            stamp = now - accumulator
+            pending = not frames.publish(game, stamp)
+
+
+def run_split(game, level=None, seed=None, record=None, uncapped=False):
+    """以雙行程模式執行遊戲：模擬在另一個行程，這個行程只處理輸入與繪圖.
+
+    Args:
+        game (BrickBreakerGame): 主行程的遊戲（必須和模擬行程使用相同的關卡）
+        level (str, optional): 關卡檔路徑. Defaults to 使用預設的格狀版面.
+        seed (int, optional): 遊戲亂數種子. Defaults to 由模擬行程產生.
+        record (str, optional): 由模擬行程把輸入錄製到這個檔案. Defaults to 不錄製.
+        uncapped (bool, optional): 不限制畫面幀率. Defaults to False.
+    """
+    # 用 spawn 啟動全新的直譯器，不要複製已經初始化視窗的 SDL 狀態
+    context = multiprocessing.get_context("spawn")
+    frames = SharedFrames(len(game.bricks), context.Lock())
+    receiver, sender = context.Pipe(duplex=False)
+    options = {"level": level, "seed": seed, "record": record}
+    process = context.Process(
+        target=simulation_main,
+        args=(frames.spec(), receiver, options),
+        name="simulation",
+        daemon=True,
+    )
+    process.start()
+    receiver.close()
+    try:
+        _render_loop(game, frames, sender, process, uncapped)
+    finally:
+        try:
+            sender.send((COMMAND_QUIT,))
+        except OSError:
+            pass
+        process.join(SPLIT_JOIN_TIMEOUT)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        sender.close()
+        frames.close()
+
+
+def _render_loop(game, frames, sender, process, uncapped):
+    """主行程的循環：把輸入送給模擬行程，並畫出最新發佈的畫面.
+
+    Args:
+        game (BrickBreakerGame): 主行程的遊戲
+        frames (SharedFrames): 共享畫面
+        sender (multiprocessing.connection.Connection): 送出命令的 Pipe 端點
+        process (multiprocessing.Process): 模擬行程
+        uncapped (bool): 不限制畫面幀率
+    """
+    step_seconds = 1 / SIMULATION_HZ
+    last_input = None
+    games_played = 0
+    quality_level = game.quality.level
+    while process.is_alive():
+        if game.end_screen is not None:
+            choice = game.end_screen.update(game.clock)
+            if choice == "restart":
+                game.end_screen = None
+                game.renderer.request_full_redraw()
+                sender.send((COMMAND_RESTART,))
+            elif choice == "quit":
+                return
+            continue
+
+        if not uncapped:
+            game.clock.tick(FPS)
+        start = time.perf_counter()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    sender.send(("launch",))
+                elif event.key == pygame.K_F3:
+                    game.profiler.toggle()
+                elif event.key == pygame.K_F4:
+                    game.cycle_render_scale()
+                elif event.key == pygame.K_BACKSPACE:
+                    sender.send(("rewind",))
+                elif event.key == pygame.K_F5:
+                    sender.send(("quick_save",))
+                elif event.key == pygame.K_F9:
+                    sender.send(("quick_load",))
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                sender.send(("launch",))
+
+        # 輸入有變化時才送出
+        keys = pygame.key.get_pressed()
+        state = (
+            pygame.mouse.get_pos()[0],
+            bool(keys[pygame.K_LEFT] or keys[pygame.K_a]),
+            bool(keys[pygame.K_RIGHT] or keys[pygame.K_d]),
+        )
+        if state != last_input:
+            sender.send((COMMAND_INPUT,) + state)
+            last_input = state
+
+        frame = frames.acquire()
+        if frame is None:
+            continue
+        try:
+            header = frames.show(game, frame)
+            # perf_counter 是整個系統共用的單調時鐘，可以直接和模擬行程的時間比較
+            alpha = (time.perf_counter() - float(header["stamp"])) / step_seconds
+            alpha = min(max(alpha, 0.0), 1.0)
+            if game.profiler.enabled:
+                game.profiler.call(PHASE_RENDER, game.render, alpha)
+            else:
+                game.render(alpha=alpha)
+            if game.profiler.enabled:
+                game.profiler.end_frame(
+                    game.frame_count,
+                    len(game.balls),
+                    game.particles.emitter_count(),
+                    len(game.particles),
+                )
+            finished = int(header["games_played"]) != games_played
+            games_played = int(header["games_played"])
+            message = RESULT_MESSAGES[int(header["result"])]
+        finally:
+            frames.release()
+        if finished:
+            game.end_screen = EndScreen(game.screen, message, game.score)
+
+        # 畫質等級也影響模擬行程產生的爆炸粒子數
+        game.quality.update((time.perf_counter() - start) * 1000)
+        if game.quality.level != quality_level:
+            quality_level = game.quality.level
+            sender.send((COMMAND_QUALITY, quality_level))
@@ -5,7 +5,6 @@
 
 from game_logic import BrickBreakerGame
 
-
 if __name__ == "__main__":
     print("正在啟動敲磚塊遊戲...")
     game = BrickBreakerGame()
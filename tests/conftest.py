@@ -0,0 +1,36 @@
+"""測試共用設定.
+
+遊戲模組都放在專案根目錄，測試時把根目錄加進匯入路徑；所有遊戲都以
+無頭模式建立，沒有螢幕的機器上也要能初始化 pygame。
+"""
+
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_game():
+    """建立無頭遊戲，測試結束時關閉（錄製檔才會寫完）.
+
+    Returns:
+        callable: 以 `BrickBreakerGame` 的參數建立遊戲的函式
+    """
+    from game_logic import BrickBreakerGame
+
+    games = []
+
+    def build(**kwargs):
+        kwargs.setdefault("headless", True)
+        game = BrickBreakerGame(**kwargs)
+        games.append(game)
+        return game
+
+    yield build
+    for game in games:
+        game.close()
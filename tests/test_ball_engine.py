@@ -0,0 +1,233 @@
+"""`BallEngine` 與磚塊場地和逐顆物件版本一致的測試.
+
+參考版本是原本的寫法：一串 `Ball` 物件逐顆移動、檢查牆壁、線性掃描一般
+`Brick` 清單、檢查底板。`BallEngine` 搭配 `create_bricks()` 的磚塊場地（空間索引、
+整批重疊判斷、最近鄰表與存活清單）每一步都要得到完全相同的位置、速度、
+命中順序與亂數使用。
+"""
+
+import random
+
+from ball_engine import BallEngine
+from config import (
+    BALL_COLOR,
+    BALL_RADIUS,
+    BALL_SPEED,
+    BRICK_BATCH_MIN_BALLS,
+    WINDOW_HEIGHT,
+    WINDOW_WIDTH,
+)
+from game_objects import Ball, Brick
+from utils import create_bricks, create_paddle
+
+# 比預設版面更密的磚塊，讓很多球同時位在磚塊區域裡
+FIELD = dict(rows=8, cols=24, width=24, height=10, padding=8)
+
+
+def _brick_list(field):
+    """把磚塊場地複製成一般的 `Brick` 清單."""
+    return [
+        Brick(
+            int(field.width[i]),
+            int(field.height[i]),
+            int(field.x[i]),
+            int(field.y[i]),
+            None,
+        )
+        for i in range(len(field))
+    ]
+
+
+def _move_paddle(paddle, frame):
+    """讓底板左右來回移動，兩個版本用同一個底板."""
+    span = WINDOW_WIDTH - paddle.width
+    offset = frame * 7 % (2 * span)
+    paddle.x = offset if offset <= span else 2 * span - offset
+
+
+def _step_objects(balls, bricks, paddle, rng, hits):
+    """以原本逐顆處理的方式模擬一步，命中的磚塊索引加到 hits."""
+    for ball in balls:
+        if not ball.launched:
+            ball.move_with_paddle(paddle)
+            continue
+        ball.update()
+        ball.check_wall_collision(WINDOW_WIDTH, WINDOW_HEIGHT)
+        hit_bricks = ball.check_brick_collision(bricks, rng)
+        if hit_bricks:
+            hits.append([bricks.index(brick) for brick in hit_bricks])
+        ball.check_paddle_collision(paddle)
+    r = BALL_RADIUS
+    balls[:] = [
+        ball
+        for ball in balls
+        if not ball.launched
+        or not (
+            ball.x + r < 0
+            or ball.x - r > WINDOW_WIDTH
+            or ball.y - r > WINDOW_HEIGHT
+            or ball.y + r < 0
+        )
+    ]
+
+
+def _step_engine(engine, bricks, paddle, rng, hits):
+    """以 `BallEngine` 模擬一步，命中的磚塊索引加到 hits."""
+    engine.move_with_paddle(paddle)
+    engine.step()
+    engine.check_wall_collision(WINDOW_WIDTH, WINDOW_HEIGHT)
+    engine.check_brick_collision(
+        bricks, lambda hit_bricks: hits.append([b.index for b in hit_bricks]), rng
+    )
+    engine.check_paddle_collision(paddle)
+    engine.remove_out_of_bounds(WINDOW_WIDTH, WINDOW_HEIGHT)
+
+
+def _ball_state(balls, engine):
+    """回傳兩個版本已發射的球的 (x, y, vx, vy) 與待發射的球數."""
+    expected = (
+        [(b.x, b.y, b.vx, b.vy) for b in balls if b.launched],
+        sum(not b.launched for b in balls),
+    )
+    n = engine.count
+    actual = (
+        list(
+            zip(
+                engine.x[:n].tolist(),
+                engine.y[:n].tolist(),
+                engine.vx[:n].tolist(),
+                engine.vy[:n].tolist(),
+            )
+        ),
+        engine.idle_count,
+    )
+    return expected, actual
+
+
+class _World:
+    """同一個情境的兩個版本：物件清單與 `BallEngine`."""
+
+    def __init__(self, seed):
+        self.field = create_bricks(**FIELD)
+        self.brick_list = _brick_list(self.field)
+        self.paddle = create_paddle()
+        self.balls = []
+        self.engine = BallEngine(BALL_RADIUS, BALL_COLOR)
+        self.object_rng = random.Random(seed)
+        self.engine_rng = random.Random(seed)
+        self.object_hits = []
+        self.engine_hits = []
+        self.frame = 0
+
+    def add_launched(self, x, y, vx, vy):
+        """在兩個版本加入一顆已發射的球."""
+        ball = Ball(BALL_RADIUS, BALL_COLOR, x, y, launched=True)
+        ball.set_velocity(vx, vy)
+        self.balls.append(ball)
+        self.engine.add(x, y, vx, vy, launched=True)
+
+    def reset(self, amount):
+        """重開一局：磚塊回到初始狀態，兩邊都只剩 amount 顆待發射的球."""
+        self.field.reset()
+        for brick in self.brick_list:
+            brick.hit = False
+        x = self.paddle.x + self.paddle.width / 2
+        y = self.paddle.y - BALL_RADIUS - 1
+        self.balls = [Ball(BALL_RADIUS, BALL_COLOR, x, y) for _ in range(amount)]
+        self.engine.clear()
+        self.engine.add_idle(amount, x, y)
+
+    def launch(self, vx, vy):
+        """兩個版本都發射下一顆待發射的球."""
+        for ball in self.balls:
+            if not ball.launched:
+                ball.launched = True
+                ball.set_velocity(vx, vy)
+                break
+        self.engine.launch_idle(vx, vy)
+
+    def step(self):
+        """兩個版本各模擬一步，並確認結果相同."""
+        _move_paddle(self.paddle, self.frame)
+        self.frame += 1
+        _step_objects(
+            self.balls, self.brick_list, self.paddle, self.object_rng, self.object_hits
+        )
+        _step_engine(
+            self.engine, self.field, self.paddle, self.engine_rng, self.engine_hits
+        )
+        expected, actual = _ball_state(self.balls, self.engine)
+        assert actual == expected, f"第 {self.frame} 步的球不同"
+        assert self.engine_hits == self.object_hits, f"第 {self.frame} 步的命中不同"
+
+    def check_end(self):
+        """最後的磚塊狀態與亂數產生器的狀態也要相同."""
+        assert self.field.hit.tolist() == [b.hit for b in self.brick_list]
+        assert self.engine_rng.getstate() == self.object_rng.getstate()
+
+
+def _scatter(world, count, rng):
+    """在磚塊區域裡灑下 count 顆往隨機方向移動的球."""
+    left, top, right, bottom = world.field.bounds
+    for _ in range(count):
+        world.add_launched(
+            rng.uniform(left, right),
+            rng.uniform(top, bottom + 40),
+            rng.uniform(-1, 1) * BALL_SPEED,
+            rng.uniform(-1, 1) * BALL_SPEED,
+        )
+
+
+def _count_batches(world, monkeypatch):
+    """記下磚塊場地整批判斷重疊的次數."""
+    calls = []
+    overlapping = world.field.overlapping
+
+    def counted(x, y, radius):
+        calls.append(len(x))
+        return overlapping(x, y, radius)
+
+    monkeypatch.setattr(world.field, "overlapping", counted)
+    return calls
+
+
+def test_few_balls_match_objects(monkeypatch):
+    """附近的球少於 `BRICK_BATCH_MIN_BALLS` 時逐顆檢查，結果要和物件版本相同."""
+    world = _World(seed=3)
+    batches = _count_batches(world, monkeypatch)
+    _scatter(world, BRICK_BATCH_MIN_BALLS // 2, random.Random(30))
+
+    for _ in range(300):
+        world.step()
+    world.check_end()
+    assert world.object_hits
+    assert batches == []
+
+
+def test_many_balls_match_objects(monkeypatch):
+    """附近的球很多、走整批重疊判斷時，結果也要和物件版本相同."""
+    world = _World(seed=4)
+    batches = _count_batches(world, monkeypatch)
+    _scatter(world, BRICK_BATCH_MIN_BALLS * 4, random.Random(40))
+
+    for _ in range(200):
+        world.step()
+    world.check_end()
+    assert len(world.object_hits) > len(world.brick_list) // 2
+    # 有同時命中最近另一塊磚的情況（最近鄰表）
+    assert any(len(hit) == 2 for hit in world.object_hits)
+    assert batches
+
+
+def test_reset_and_idle_launches_match_objects():
+    """重開一局、從底板上的待發射球依序發射時，結果也要和物件版本相同."""
+    world = _World(seed=5)
+    launch_rng = random.Random(50)
+    for round_balls in (30, 45):
+        world.reset(round_balls)
+        for frame in range(360):
+            if frame % 6 == 0 and frame < round_balls * 6:
+                world.launch(BALL_SPEED * 0.5 + launch_rng.uniform(-1, 1), -BALL_SPEED)
+            world.step()
+    world.check_end()
+    assert world.object_hits
@@ -0,0 +1,48 @@
+"""批次模擬的測試."""
+
+import pytest
+
+from batch_runner import BATCH_GAMES_PER_TASK, build_tasks, run_task
+
+
+def test_tasks_give_every_game_its_own_seed():
+    """每組設定的每一局都有自己的種子，從 --seed 開始連續編號."""
+    games = BATCH_GAMES_PER_TASK * 2 + 3
+    tasks = build_tasks([{}, {"BALL_SPEED": 4}], games, 50, "autopilot", None, 100)
+
+    for config_index in range(2):
+        seeds = [
+            task[2] + n
+            for task in tasks
+            if task[0] == config_index
+            for n in range(task[3])
+        ]
+        assert seeds == list(range(50, 50 + games))
+
+
+@pytest.mark.parametrize(
+    "policy, max_frames", [("autopilot", 20000), ("sweep", 20000), ("sweep", 150)]
+)
+def test_each_row_replays_from_its_seed(policy, max_frames):
+    """結果中的每一局都能單獨用它的種子重現（包含逾時的局）."""
+    rows = run_task((0, {}, 100, 4, policy, None, max_frames))
+
+    assert [row[1] for row in rows] == [100, 101, 102, 103]
+    for row in rows:
+        assert run_task((0, {}, row[1], 1, policy, None, max_frames)) == [row]
+
+
+def test_row_matches_a_new_game(make_game):
+    """自動控制的局和 `main.py --headless --seed` 新建的遊戲結果相同."""
+    row = run_task((0, {}, 100, 3, "autopilot", None, 20000))[-1]
+    game = make_game(seed=row[1])
+    while game.games_played == 0:
+        game.step()
+
+    last = game.last_game
+    assert row[3:] == (
+        last["score"],
+        last["frames"],
+        last["bricks_left"],
+        last["total_balls"],
+    )
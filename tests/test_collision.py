@@ -0,0 +1,113 @@
+"""連續碰撞（`BallEngine.sweep`）的測試."""
+
+import random
+
+import pytest
+
+import game_logic
+from ball_engine import BallEngine
+from brick_field import BrickField
+from config import SWEPT_MAX_CONTACTS
+from utils import create_paddle
+
+# 窄窄的場地，球一步內會在左右牆之間來回反彈好幾次
+FIELD_WIDTH = 40
+RADIUS = 8
+SPAN = FIELD_WIDTH - 2 * RADIUS
+
+
+def _fold(x, vx):
+    """回傳球在左右牆之間反彈、水平移動 vx 之後的 x 座標與速度."""
+    offset = (x - RADIUS + vx) % (2 * SPAN)
+    if offset <= SPAN:
+        return RADIUS + offset, vx
+    return FIELD_WIDTH - RADIUS - (offset - SPAN), -vx
+
+
+def test_motion_after_last_contact_is_kept():
+    """接觸次數剛好用完時，最後一次反彈之後的移動不能丟掉."""
+    # 從中間往右，SWEPT_MAX_CONTACTS 次碰牆後再多走 16
+    vx = SPAN / 2 + SPAN * (SWEPT_MAX_CONTACTS - 1) + 16
+    engine = BallEngine(radius=RADIUS)
+    engine.add(FIELD_WIDTH / 2, 300.0, vx, 0.0, launched=True)
+
+    engine.sweep(FIELD_WIDTH, [], create_paddle(), list, random.Random(0))
+
+    expected_x, expected_vx = _fold(FIELD_WIDTH / 2, vx)
+    assert engine.x[0] == pytest.approx(expected_x)
+    assert engine.vx[0] == expected_vx
+
+
+def test_wall_after_last_contact_still_bounces():
+    """接觸次數用完後碰到的牆照樣反彈，球停在牆上、速度離開牆壁."""
+    # SWEPT_MAX_CONTACTS 次碰牆之後再走到下一面牆為止
+    vx = SPAN / 2 + SPAN * SWEPT_MAX_CONTACTS + 10
+    engine = BallEngine(radius=RADIUS)
+    engine.add(FIELD_WIDTH / 2, 300.0, vx, 0.0, launched=True)
+
+    engine.sweep(FIELD_WIDTH, [], create_paddle(), list, random.Random(0))
+
+    wall_x, _ = _fold(FIELD_WIDTH / 2, vx - 10)
+    assert engine.x[0] == pytest.approx(wall_x)
+    # 最後碰到的牆在哪一邊，速度就要朝另一邊
+    assert (engine.vx[0] > 0) == (wall_x < FIELD_WIDTH / 2)
+
+
+def test_fast_ball_stops_at_thin_brick_row():
+    """接觸次數用完後才碰到的薄磚塊不能穿過去，下一步要打到它."""
+    bricks = BrickField([0, 20], [60, 60], 20, 2, [(200, 40, 40)] * 2)
+    row_bottom = 62
+    start_y = 200.0
+    vy = -150.0
+    # 碰到磚塊前剛好先撞 SWEPT_MAX_CONTACTS 次牆，一步的位移遠大於磚塊的厚度
+    contact_x = SPAN / 2 + SPAN * (SWEPT_MAX_CONTACTS - 1) + SPAN / 3
+    vx = contact_x * vy / (row_bottom + RADIUS - start_y)
+    engine = BallEngine(radius=RADIUS)
+    engine.add(FIELD_WIDTH / 2, start_y, vx, vy, launched=True)
+    paddle = create_paddle()
+    rng = random.Random(0)
+    hits = []
+
+    engine.sweep(FIELD_WIDTH, bricks, paddle, hits.extend, rng)
+    # 停在磚塊下方的接觸點：沒有穿過去，也沒有停在最後一次撞牆的地方
+    assert engine.y[0] == pytest.approx(row_bottom + RADIUS)
+    assert engine.vy[0] == vy
+    assert hits == []
+
+    engine.sweep(FIELD_WIDTH, bricks, paddle, hits.extend, rng)
+    assert hits
+    assert engine.vy[0] == -vy
+    assert engine.y[0] > row_bottom + RADIUS
+
+
+@pytest.mark.parametrize(
+    "x, y, vx, vy",
+    [
+        (RADIUS + 2, 300.0, -2.0, 0.0),
+        (FIELD_WIDTH - RADIUS - 2, 300.0, 2.0, 0.0),
+        (FIELD_WIDTH / 2, RADIUS + 2, 0.0, -2.0),
+    ],
+)
+def test_path_ending_on_wall_bounces_once(x, y, vx, vy):
+    """路徑剛好停在牆上的球只反彈一次，速度要離開牆壁."""
+    engine = BallEngine(radius=RADIUS)
+    engine.add(x, y, vx, vy, launched=True)
+
+    engine.sweep(FIELD_WIDTH, [], create_paddle(), list, random.Random(0))
+
+    assert (engine.x[0], engine.y[0]) == pytest.approx((x + vx, y + vy))
+    assert (engine.vx[0], engine.vy[0]) == (-vx, -vy)
+
+
+def test_game_does_not_bounce_swept_ball_twice(make_game, monkeypatch):
+    """開啟連續碰撞時，遊戲不能把連續碰撞已經反彈的球再反彈回牆裡."""
+    monkeypatch.setattr(game_logic, "SWEPT_COLLISION", True)
+    game = make_game(seed=1)
+    radius = game.balls.radius
+    game.balls.clear()
+    game.balls.add(radius + 2, 300.0, -2.0, 0.0, launched=True)
+
+    game._update_balls()
+    assert (game.balls.x[0], game.balls.vx[0]) == (radius, 2.0)
+    game._update_balls()
+    assert (game.balls.x[0], game.balls.vx[0]) == (radius + 2, 2.0)
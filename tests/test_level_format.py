@@ -0,0 +1,60 @@
+"""關卡檔（BBLV）的測試."""
+
+import numpy as np
+import pytest
+
+from level_format import LEVEL_HEADER, load_level, save_level
+from utils import create_bricks
+
+
+def _field_state(bricks):
+    """回傳可以直接比較的磚塊內容."""
+    return (
+        bricks.x.tolist(),
+        bricks.y.tolist(),
+        np.asarray(bricks.width).tolist(),
+        np.asarray(bricks.height).tolist(),
+        bricks.color.tolist(),
+        bricks.hit.tolist(),
+        bricks.shape,
+    )
+
+
+@pytest.mark.parametrize("include_index", [True, False])
+def test_round_trip(tmp_path, include_index):
+    """存檔再載入後磚塊、命中狀態與碰撞索引都要和原本相同."""
+    bricks = create_bricks(rows=4, cols=6)
+    bricks.set_hit(3)
+    bricks.set_hit(17)
+    path = str(tmp_path / "level.bblv")
+    save_level(path, bricks, include_index=include_index)
+
+    loaded = load_level(path)
+    assert _field_state(loaded) == _field_state(bricks)
+    assert loaded.live_count == bricks.live_count
+    assert loaded.grid.to_csr()[1].tolist() == bricks.grid.to_csr()[1].tolist()
+    assert [loaded.nearest_live(loaded[i]).index for i in range(len(loaded))] == [
+        bricks.nearest_live(bricks[i]).index for i in range(len(bricks))
+    ]
+
+
+def test_truncated_file_is_rejected(tmp_path):
+    """少了一部分內容的關卡檔要拒絕載入，不能讀到檔案外面."""
+    path = tmp_path / "level.bblv"
+    save_level(str(path), create_bricks(rows=2, cols=3))
+    data = path.read_bytes()
+
+    for size in (LEVEL_HEADER.size - 1, LEVEL_HEADER.size + 5, len(data) - 1):
+        path.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            load_level(str(path))
+
+
+def test_bad_magic_is_rejected(tmp_path):
+    """魔術字不對的檔案不能當成關卡檔."""
+    path = tmp_path / "level.bblv"
+    save_level(str(path), create_bricks(rows=2, cols=3))
+    path.write_bytes(b"BBRP" + path.read_bytes()[4:])
+
+    with pytest.raises(ValueError):
+        load_level(str(path))
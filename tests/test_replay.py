@@ -0,0 +1,72 @@
+"""錄製檔（BBRP）與重播的測試."""
+
+import pytest
+
+from replay import REPLAY_HEADER, FRAME_RECORD, InputRecorder, InputReplay
+
+
+def test_round_trip(tmp_path):
+    """錄下的種子、底板位置與發射旗標讀回來要完全相同."""
+    path = tmp_path / "input.bbrp"
+    recorder = InputRecorder(str(path), seed=2**40 + 7, flush_frames=4)
+    inputs = [(100.7, False), (-3, True), (32767, False), (0, True), (412, False)]
+    for paddle_x, launch in inputs:
+        recorder.record(paddle_x, launch)
+    recorder.close()
+
+    replay = InputReplay(str(path))
+    assert replay.seed == 2**40 + 7
+    assert len(replay) == len(inputs)
+    assert replay.paddle_x.tolist() == [int(x) for x, _ in inputs]
+    assert replay.launch.tolist() == [launch for _, launch in inputs]
+
+
+def test_partial_last_record_is_dropped(tmp_path):
+    """錄製時被強制結束、只寫了一半的最後一筆要捨去."""
+    path = tmp_path / "input.bbrp"
+    recorder = InputRecorder(str(path), seed=1)
+    for x in range(3):
+        recorder.record(x, False)
+    recorder.close()
+    data = path.read_bytes()
+    path.write_bytes(data[: REPLAY_HEADER.size + 2 * FRAME_RECORD.itemsize + 1])
+
+    assert InputReplay(str(path)).paddle_x.tolist() == [0, 1]
+
+
+def test_truncated_header_is_rejected(tmp_path):
+    """連檔頭都不完整的檔案不能當成錄製檔."""
+    path = tmp_path / "input.bbrp"
+    InputRecorder(str(path), seed=1).close()
+    path.write_bytes(path.read_bytes()[: REPLAY_HEADER.size - 1])
+
+    with pytest.raises(ValueError):
+        InputReplay(str(path))
+
+
+def test_bad_magic_is_rejected(tmp_path):
+    """魔術字不對的檔案不能當成錄製檔."""
+    path = tmp_path / "input.bbrp"
+    InputRecorder(str(path), seed=1).close()
+    path.write_bytes(b"XXXX" + path.read_bytes()[4:])
+
+    with pytest.raises(ValueError):
+        InputReplay(str(path))
+
+
+def test_replay_reproduces_recorded_game(tmp_path, make_game):
+    """重播錄製檔要得到和錄製時相同的種子、分數與結果."""
+    path = str(tmp_path / "game.bbrp")
+    recorded = make_game(seed=20240601, record=path)
+    recorded.run_headless(max_frames=900)
+    recorded.close()
+
+    replayed = make_game(replay=path)
+    replayed.run_headless()
+
+    assert replayed.seed == recorded.seed == 20240601
+    assert replayed.frame_count == recorded.frame_count == 900
+    assert replayed.score == recorded.score
+    assert replayed.games_played == recorded.games_played
+    assert replayed.last_game == recorded.last_game
+    assert replayed.bricks.hit.tolist() == recorded.bricks.hit.tolist()
@@ -0,0 +1,93 @@
+"""多場遊戲主機客戶端協定的測試."""
+
+import asyncio
+
+import pytest
+
+from session_host import (
+    CLIENT_COMMANDS,
+    HELLO,
+    INPUT_RECORD,
+    SessionHost,
+    decode_hello,
+    decode_input,
+    encode_hello,
+    encode_input,
+)
+from split_mode import COMMAND_INPUT
+
+
+def test_input_round_trip():
+    """每一種命令編碼後解碼回來要相同."""
+    assert decode_input(encode_input(COMMAND_INPUT, -40, left=True)) == (
+        COMMAND_INPUT,
+        -40,
+        True,
+        False,
+    )
+    assert decode_input(encode_input(COMMAND_INPUT, 799, right=True)) == (
+        COMMAND_INPUT,
+        799,
+        False,
+        True,
+    )
+    for command in CLIENT_COMMANDS[1:]:
+        assert decode_input(encode_input(command)) == (command,)
+
+
+def test_truncated_input_is_rejected():
+    """長度不對的輸入記錄要拒絕."""
+    record = encode_input(COMMAND_INPUT, 100)
+    with pytest.raises(ValueError):
+        decode_input(record[:-1])
+    with pytest.raises(ValueError):
+        decode_input(record + b"\0")
+
+
+def test_unknown_command_is_rejected():
+    """不存在的命令編號要拒絕."""
+    with pytest.raises(ValueError):
+        decode_input(INPUT_RECORD.pack(len(CLIENT_COMMANDS), 0, 0))
+
+
+def test_hello_round_trip():
+    """HELLO 編碼後解碼回來要相同."""
+    assert decode_hello(encode_hello(12, 2**63 - 1, 50)) == (12, 2**63 - 1, 50)
+
+
+def test_bad_hello_is_rejected():
+    """魔術字不對或長度不對的 HELLO 要拒絕."""
+    hello = encode_hello(1, 2, 3)
+    with pytest.raises(ValueError):
+        decode_hello(b"BBRP" + hello[4:])
+    with pytest.raises(ValueError):
+        decode_hello(hello[: HELLO.size - 1])
+
+
+def test_unknown_command_drops_client(tmp_path, capsys):
+    """客戶端送來不存在的命令時，主機要自己處理錯誤、結束場次並關閉連線."""
+    path = str(tmp_path / "host.sock")
+    unhandled = []
+
+    async def scenario():
+        # 錯誤沒有被處理、漏到事件迴圈時會交給這個處理函式
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: unhandled.append(context)
+        )
+        host = SessionHost()
+        server = await asyncio.start_unix_server(host.serve_client, path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        session_id = decode_hello(await reader.readexactly(HELLO.size))[0]
+        session = host.sessions[session_id]
+        writer.write(INPUT_RECORD.pack(len(CLIENT_COMMANDS), 0, 0))
+        await writer.drain()
+        # 主機關閉連線後這裡會讀到檔尾
+        remaining = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        server.close()
+        await host.close()
+        return remaining, session.closed
+
+    assert asyncio.run(scenario()) == (b"", True)
+    assert unhandled == []
+    assert "無法解碼" in capsys.readouterr().out
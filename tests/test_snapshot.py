@@ -0,0 +1,48 @@
+"""遊戲快照（BBSS）的測試."""
+
+import pytest
+
+from snapshot import SNAPSHOT_HEADER, load_snapshot, save_snapshot
+
+
+def _run(game, frames):
+    """模擬 frames 步."""
+    for _ in range(frames):
+        game.step()
+
+
+def test_round_trip(make_game):
+    """還原快照後再存一次要得到相同的資料，之後的模擬也要完全一樣."""
+    game = make_game(seed=99)
+    _run(game, 240)
+    data = save_snapshot(game)
+    _run(game, 120)
+    expected = (game.score, game.frame_count, save_snapshot(game))
+
+    load_snapshot(game, data)
+    assert save_snapshot(game) == data
+    _run(game, 120)
+    assert (game.score, game.frame_count, save_snapshot(game)) == expected
+
+
+def test_truncated_snapshot_is_rejected(make_game):
+    """不完整的快照要在改動遊戲之前就拒絕."""
+    game = make_game(seed=5)
+    _run(game, 200)
+    data = save_snapshot(game)
+    _run(game, 30)
+    before = save_snapshot(game)
+
+    for size in (SNAPSHOT_HEADER.size - 1, SNAPSHOT_HEADER.size + 8, len(data) - 1):
+        with pytest.raises(ValueError):
+            load_snapshot(game, data[:size])
+        assert save_snapshot(game) == before
+
+
+def test_bad_magic_is_rejected(make_game):
+    """魔術字不對的資料不能當成快照."""
+    game = make_game(seed=5)
+    data = save_snapshot(game)
+
+    with pytest.raises(ValueError):
+        load_snapshot(game, b"BBLV" + data[4:])
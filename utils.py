@@ -3,35 +3,66 @@
 包含遊戲初始化和輔助函式。
 """
 
+import numpy as np
 import pygame
 
+from ball_engine import BallEngine
+from brick_field import BrickField
 from config import *
-from game_objects import Ball, Brick
+from game_objects import Brick
+from particles import ParticlePool
 
 
-def create_bricks():
-    """建立並回傳磚塊清單.
+def create_bricks(
+    rows=BRICK_ROWS,
+    cols=BRICK_COLS,
+    width=BRICK_WIDTH,
+    height=BRICK_HEIGHT,
+    padding=BRICK_PADDING,
+):
+    """建立並回傳磚塊場地.
+
+    磚塊依 `rows × cols` 的格狀排列並水平置中，包裝成附有空間索引的
+    `BrickField`，碰撞檢查時只需查看球附近的格子。預設使用 config 的版面，
+    其他參數主要給效能測試建立大型磚塊場地使用。
+
+    Args:
+        rows (int, optional): 行數 (y 方向). Defaults to BRICK_ROWS.
+        cols (int, optional): 列數 (x 方向). Defaults to BRICK_COLS.
+        width (int, optional): 磚塊寬度. Defaults to BRICK_WIDTH.
+        height (int, optional): 磚塊高度. Defaults to BRICK_HEIGHT.
+        padding (int, optional): 磚塊間隔. Defaults to BRICK_PADDING.
 
     Returns:
-        list: 磚塊物件清單
+        BrickField: 磚塊場地（可像清單一樣迭代）
     """
-    total_bricks_width = BRICK_COLS * BRICK_WIDTH + (BRICK_COLS - 1) * BRICK_PADDING
+    total_bricks_width = cols * width + (cols - 1) * padding
     brick_offset_x = (WINDOW_WIDTH - total_bricks_width) // 2
-    bricks = []
 
-    for row in range(BRICK_ROWS):
-        for col in range(BRICK_COLS):
-            x = brick_offset_x + col * (BRICK_WIDTH + BRICK_PADDING)
-            y = BRICK_OFFSET_Y + row * (BRICK_HEIGHT + BRICK_PADDING)
-            # 根據行列位置生成不同顏色
-            color = (
-                200 - row * 20 if 200 - row * 20 >= 0 else 0,
-                50 + row * 30 if 50 + row * 30 <= 255 else 255,
-                50 + col * 10 if 50 + col * 10 <= 255 else 255,
-            )
-            bricks.append(Brick(BRICK_WIDTH, BRICK_HEIGHT, x, y, color))
+    # 依行列順序（先 row 後 col）排列，和命中狀態陣列的順序相同
+    row, col = np.divmod(np.arange(rows * cols), cols)
+    x = brick_offset_x + col * (width + padding)
+    y = BRICK_OFFSET_Y + row * (height + padding)
+    # 根據行列位置生成不同顏色
+    color = np.stack(
+        (
+            np.maximum(200 - row * 20, 0),
+            np.minimum(50 + row * 30, 255),
+            np.minimum(50 + col * 10, 255),
+        ),
+        axis=1,
+    )
 
-    return bricks
+    return BrickField(
+        x,
+        y,
+        width,
+        height,
+        color,
+        shape=(rows, cols),
+        cell_width=width + padding,
+        cell_height=height + padding,
+    )
 
 
 def create_paddle():
@@ -44,44 +75,70 @@ def create_paddle():
     return Brick(PADDLE_WIDTH, PADDLE_HEIGHT, paddle_x, PADDLE_Y, PADDLE_COLOR)
 
 
-def create_initial_balls(paddle):
+def create_particle_pool(capacity=PARTICLE_POOL_CAPACITY):
+    """建立並回傳爆炸效果共用的粒子池.
+
+    Args:
+        capacity (int, optional): 粒子池容量. Defaults to PARTICLE_POOL_CAPACITY.
+
+    Returns:
+        ParticlePool: 依容量與設定的滿載處理方式建立的粒子池
+    """
+    return ParticlePool(capacity, PARTICLE_OVERFLOW_POLICY)
+
+
+def create_initial_balls(paddle, balls=None):
     """建立初始球群.
 
     Args:
         paddle: 底板物件
+        balls (BallEngine, optional): 要清空後重複使用的球引擎（保留已配置的陣列）.
+            Defaults to 建立新的球引擎.
 
     Returns:
-        list: 初始球物件清單
+        BallEngine: 存放初始球群的球引擎
     """
-    balls = []
-    for i in range(INITIAL_BALL_COUNT):
-        ball = Ball(
-            BALL_RADIUS,
-            BALL_COLOR,
-            paddle.x + paddle.width / 2,
-            paddle.y - BALL_RADIUS - 1,
-            launched=False,
-        )
-        balls.append(ball)
+    if balls is None:
+        balls = BallEngine(BALL_RADIUS, BALL_COLOR)
+    else:
+        balls.clear()
+    balls.add_idle(
+        INITIAL_BALL_COUNT,
+        paddle.x + paddle.width / 2,
+        paddle.y - BALL_RADIUS - 1,
+    )
     return balls
 
 
-def init_game():
+def init_game(current_time=None, bricks=None, balls=None):
     """初始化或重置遊戲物件，回傳所有遊戲狀態.
 
+    重開一局時可以傳入上一局的磚塊場地與球引擎，讓它們重設後繼續使用，
+    不必重新配置陣列與重建碰撞索引。
+
+    Args:
+        current_time (int, optional): 目前時間（毫秒）. Defaults to pygame 時鐘.
+        bricks (BrickField, optional): 要重設後重複使用的磚塊場地.
+            Defaults to 建立新的磚塊場地.
+        balls (BallEngine, optional): 要清空後重複使用的球引擎.
+            Defaults to 建立新的球引擎.
+
     Returns:
         tuple: 包含所有遊戲狀態的元組
             (bricks, paddle, balls, score, total_balls,
              last_add_time, balls_to_launch, launch_timer)
     """
     paddle = create_paddle()
-    balls = create_initial_balls(paddle)
-    bricks = create_bricks()
+    balls = create_initial_balls(paddle, balls)
+    if bricks is None:
+        bricks = create_bricks()
+    else:
+        bricks.reset()
 
     # 遊戲狀態變數
     score = 0
     total_balls = INITIAL_BALL_COUNT
-    last_add_time = pygame.time.get_ticks()
+    last_add_time = pygame.time.get_ticks() if current_time is None else current_time
     balls_to_launch = 0
     launch_timer = 0
 
@@ -97,53 +154,65 @@ def init_game():
     )
 
 
-def show_end_screen(screen, message, final_score):
-    """顯示遊戲結束畫面.
+class EndScreen:
+    """遊戲結束畫面.
 
-    Args:
-        screen: pygame 畫面物件
-        message (str): 結束訊息
-        final_score (int): 最終分數
+    建立時把當下的遊戲畫面、半透明遮罩和所有文字一次合成成一張圖，之後
+    只有剛顯示或視窗重新露出時才把這張圖貼到螢幕。事件由呼叫方的迴圈
+    交給它處理；等待事件時不會佔用 CPU。
 
-    Returns:
-        str: 使用者選擇 ('restart' 或 'quit')
+    Attributes:
+        screen (pygame.Surface): 要顯示的畫面
+        image (pygame.Surface): 預先合成好的結束畫面
+        choice (str): 使用者的選擇（'restart' 或 'quit'），尚未選擇時為 None
     """
-    font = pygame.font.SysFont(None, LARGE_FONT_SIZE)
-    small_font = pygame.font.SysFont(None, FONT_SIZE)
-
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return "quit"
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    return "restart"
-                if event.key == pygame.K_q:
-                    return "quit"
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # 左鍵重開，右鍵離開
-                if event.button == 1:
-                    return "restart"
-                if event.button == 3:
-                    return "quit"
+
+    def __init__(self, screen, message, final_score):
+        """建立結束畫面並預先合成好要顯示的圖.
+
+        Args:
+            screen: pygame 畫面物件
+            message (str): 結束訊息
+            final_score (int): 最終分數
+        """
+        self.screen = screen
+        self.choice = None
+        self.image = self._compose(screen, message, final_score)
+        self._needs_draw = True
+
+    @staticmethod
+    def _compose(screen, message, final_score):
+        """把目前的畫面、半透明遮罩與文字合成成一張圖.
+
+        Args:
+            screen: pygame 畫面物件
+            message (str): 結束訊息
+            final_score (int): 最終分數
+
+        Returns:
+            pygame.Surface: 合成好的結束畫面
+        """
+        font = pygame.font.SysFont(None, LARGE_FONT_SIZE)
+        small_font = pygame.font.SysFont(None, FONT_SIZE)
+        image = screen.copy()
 
         # 半透明遮罩
         overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(180)
+        overlay.set_alpha(END_SCREEN_OVERLAY_ALPHA)
         overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
+        image.blit(overlay, (0, 0))
 
         # 主要訊息
         text = font.render(message, True, WHITE)
         rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 60))
-        screen.blit(text, rect)
+        image.blit(text, rect)
 
         # 顯示分數
         score_text = small_font.render(f"Score: {final_score}", True, WHITE)
         score_rect = score_text.get_rect(
             center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 10)
         )
-        screen.blit(score_text, score_rect)
+        image.blit(score_text, score_rect)
 
         # 次要指示
         tip = small_font.render(
@@ -152,9 +221,109 @@ def show_end_screen(screen, message, final_score):
             GRAY,
         )
         tip_rect = tip.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 30))
-        screen.blit(tip, tip_rect)
-
+        image.blit(tip, tip_rect)
+        return image
+
+    def handle_event(self, event):
+        """處理一個事件.
+
+        Args:
+            event (pygame.event.Event): 事件
+
+        Returns:
+            str: 使用者的選擇（'restart' 或 'quit'），尚未選擇時為 None
+        """
+        if event.type == pygame.QUIT:
+            self.choice = "quit"
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_r:
+                self.choice = "restart"
+            elif event.key == pygame.K_q:
+                self.choice = "quit"
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            # 左鍵重開，右鍵離開
+            if event.button == 1:
+                self.choice = "restart"
+            elif event.button == 3:
+                self.choice = "quit"
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            # 視窗被遮住後重新露出，需要重畫
+            self._needs_draw = True
+        return self.choice
+
+    def draw(self):
+        """需要時把預先合成好的結束畫面貼到螢幕."""
+        if not self._needs_draw:
+            return
+        self.screen.blit(self.image, (0, 0))
         pygame.display.update()
+        self._needs_draw = False
+
+    def update(self, clock):
+        """重畫（若需要）並處理事件；沒有事件時最多等待一幀的時間.
+
+        Args:
+            clock (pygame.time.Clock): 用來限制每秒處理次數的時鐘
+
+        Returns:
+            str: 使用者的選擇（'restart' 或 'quit'），尚未選擇時為 None
+        """
+        self.draw()
+        events = [pygame.event.wait(1000 // END_SCREEN_FPS)] + pygame.event.get()
+        for event in events:
+            self.handle_event(event)
+        clock.tick(END_SCREEN_FPS)
+        return self.choice
+
+
+def show_end_screen(screen, message, final_score):
+    """顯示遊戲結束畫面，直到使用者做出選擇.
+
+    Args:
+        screen: pygame 畫面物件
+        message (str): 結束訊息
+        final_score (int): 最終分數
+
+    Returns:
+        str: 使用者選擇 ('restart' 或 'quit')
+    """
+    end_screen = EndScreen(screen, message, final_score)
+    clock = pygame.time.Clock()
+    while end_screen.update(clock) is None:
+        pass
+    return end_screen.choice
+
+
+class _NoKeys:
+    """沒有任何按鍵被按下的按鍵狀態（給無頭模式使用）."""
+
+    def __getitem__(self, key):
+        return False
+
+
+NO_KEYS = _NoKeys()
+
+
+def autopilot_mouse_pos(paddle, balls):
+    """自動駕駛：算出一個讓底板去接球的假滑鼠位置.
+
+    會挑選正在往下掉、而且最接近底板的已發射球，把底板中心移到它的 x；
+    沒有往下掉的球時底板維持不動。
+
+    Args:
+        paddle: 底板物件
+        balls (BallEngine): 所有球
+
+    Returns:
+        tuple: 假的滑鼠位置 (x, y)
+    """
+    n = balls.count
+    falling = np.flatnonzero(balls.launched[:n] & (balls.vy[:n] > 0))
+    if len(falling) == 0:
+        return (paddle.x + paddle.width // 2, paddle.y)
+    # y 越大代表越接近底板，先去接最危險的那顆
+    target = falling[np.argmax(balls.y[:n][falling])]
+    return (int(balls.x[target]), paddle.y)
 
 
 def update_paddle_position(paddle, keys, mouse_pos):